@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+
+# Benchmark of DigitalPin toggles per second
+#
+# Usage:
+#   python3 -m benchmarks.pin_toggle
+#   python3 -m benchmarks.pin_toggle --backend rpi --pin 17
+#   python3 -m benchmarks.pin_toggle --backend mmio --gpiomem /tmp/gpiomem
+#
+# Compares the backend write alone with the bound `write`/`pulse` of
+# DigitalPin, its keyword API, and the pydantic model DigitalPin used to
+# be, so the overhead a pin adds on top of the backend stays visible.
+
+
+from __future__ import annotations
+
+import argparse
+import os
+
+from benchmarks.toggle_rate import toggles_per_sec
+from src.backends.mmio_backend import MMIOGPIOBackend, BLOCK_SIZE
+from src.backends.pin_backend import PinBackend
+from src.entities.digitalpin import DigitalPin
+from src.parsers.config_parser import select_backend
+from typing import Any, Callable, Dict, Optional
+
+
+def pydantic_pin(*, pinNo: int, backend: PinBackend) -> Optional[Any]:
+    """Builds the previous pydantic DigitalPin, trimmed to its hot path.
+
+    :param pinNo: BCM pin number (type integer).
+    :param backend: Backend driving the pin (type PinBackend).
+    :return: pin model, None if pydantic is not installed (type BaseModel).
+    """
+
+    try:
+        from pydantic import BaseModel
+    except ImportError:
+        return None
+
+    class PydanticPin(BaseModel):
+        pinNo: int
+        mode: bool
+        initialValue: Optional[int]=0
+        backend: Optional[Any]=None
+
+        def trigger(self, *, transition: Optional[str]="1", time_period: Optional[int]=.05) -> None:
+            self.backend.pulse(self.pinNo, transition=="1", time_period)
+
+        def set_value(self, *, value: int) -> None:
+            self.backend.output(self.pinNo, value)
+
+    return PydanticPin(pinNo=pinNo, mode=False, backend=backend)
+
+
+def bench_pin(*, backend: PinBackend, pin: int, count: int) -> None:
+    """Prints toggles per second of each way of driving a pin.
+
+    :param backend: Backend to benchmark (type PinBackend).
+    :param pin: BCM pin number (type integer).
+    :param count: Number of toggles per measurement (type integer).
+    :return: None.
+    """
+
+    digital_pin = DigitalPin(pinNo=pin, mode=backend.OUT, initialValue=0, backend=backend)
+
+    toggles: Dict[str, Callable[[int], None]] = {
+        "backend.output": lambda v: backend.output(pin, v),
+        "DigitalPin.write": digital_pin.write,
+        "DigitalPin.set_value": lambda v: digital_pin.set_value(value=v),
+        "DigitalPin.pulse": lambda v: digital_pin.pulse(1, 0),
+        "DigitalPin.trigger": lambda v: digital_pin.trigger(transition="1", time_period=0),
+    }
+
+    model = pydantic_pin(pinNo=pin, backend=backend)
+    if model is not None:
+        toggles["pydantic set_value"] = lambda v: model.set_value(value=v)
+        toggles["pydantic trigger"] = lambda v: model.trigger(transition="1", time_period=0)
+
+    for label, toggle in toggles.items():
+        rate: float = toggles_per_sec(toggle=toggle, count=count)
+        print(f"{backend.name:>5} {label:<22} {rate:>14,.0f} toggles/s")
+
+    backend.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DigitalPin toggles per second")
+    parser.add_argument("--backend", default="sim")
+    parser.add_argument("--gpiomem", default="/dev/gpiomem")
+    parser.add_argument("--pin", type=int, default=17)
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    if args.backend == "mmio":
+        if not os.path.exists(args.gpiomem):
+            with open(args.gpiomem, "wb") as gpiomem:
+                gpiomem.write(bytes(BLOCK_SIZE))
+        backend: PinBackend = MMIOGPIOBackend(path=args.gpiomem)
+    else:
+        backend = select_backend(name=args.backend)
+
+    bench_pin(backend=backend, pin=args.pin, count=args.count)
@@ -0,0 +1,384 @@
+#!/usr/bin/python3
+
+# Benchmark suite of the RAM tool against the simulated board
+#
+# Usage:
+#   python3 -m benchmarks.suite
+#   python3 -m benchmarks.suite --sizes 256 32768 --save
+#   python3 -m benchmarks.suite --case dump_intel_hexfile verify_checksum
+#
+# Every case runs at each image size, in words. For each run the suite
+# reports host CPU time (the fastest of a few runs for short cases), the
+# peak of memory allocated while it ran (traced in a separate run, so
+# tracing does not inflate the CPU time), and the pin edges and modeled bus
+# time counted by the simulated backend. Each case first puts the simulated
+# board in a known state, untimed, and its result is checked against the
+# image afterwards: words read must match and words written must be on the
+# board, otherwise the suite stops.
+# With --save the results are written to the baseline file; when a
+# baseline exists, any run that got slower than its tolerance allows, or
+# that now takes more edges or bus time, fails the suite. The committed
+# baseline.json is taken on the simulated backend; edges and bus time are
+# exact anywhere, CPU time and memory are only compared on the host that
+# saved the baseline.
+
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from dataclasses import dataclass, asdict
+from src.backends.sim_backend import BusStats, SimulatedBackend
+from src.parsers import config_parser, ihexfile_parser
+from src.ram.ram_operations import RAM_Interface
+from src.utilities.memory_image import MemoryImage, record_checksum
+from src.utilities.pb224_utilities import Hex
+from typing import Any, Callable, Dict, List, Optional
+
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+SIZES = (256, 4096, 32768)
+
+
+def host_id() -> str:
+    """Host and Python the CPU times and memory peaks were measured with.
+
+    :return: Host description (type string).
+    """
+
+    return f"{platform.node()} {platform.machine()} {platform.python_implementation()} {platform.python_version()}"
+
+
+@dataclass(kw_only=True)
+class Case:
+    run: Callable[[], Any]
+    check: Callable[[Any], Optional[str]]  # what is wrong with a result of `run`, None if it is correct
+    prepare: Callable[[], None]  # puts the board in the state `run` expects, untimed
+
+
+@dataclass(kw_only=True)
+class Result:
+    case: str
+    words: int
+    cpu_ns: int
+    wall_ns: int
+    peak_bytes: int
+    edges: int
+    bus_time_ns: int
+
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}/{self.words}"
+
+
+    def __str__(self) -> str:
+        return (
+            f"{self.case:<30} {self.words:>6} {self.cpu_ns / 1e6:>10.1f} {self.cpu_ns / self.words / 1e3:>9.2f}"
+            f" {self.peak_bytes / 1024:>10.1f} {self.edges:>11} {self.bus_time_ns / 1e6:>11.2f}"
+        )
+
+
+HEADER = (
+    f"{'case':<30} {'words':>6} {'cpu ms':>10} {'us/word':>9} {'peak KiB':>10} {'edges':>11} {'bus ms':>11}"
+)
+
+
+def make_image(*, words: int, seed: int=224) -> MemoryImage:
+    """Random image of `words` words from address 0.
+
+    :param words: Number of words (type integer).
+    :param seed: Random seed, the same image for the same seed (type integer).
+    :return: Memory image (type MemoryImage).
+    """
+
+    rng = random.Random(seed)
+    image = MemoryImage()
+    image.update((address, rng.getrandbits(24)) for address in range(words))
+    return image
+
+
+def cases(*, ram_OP: RAM_Interface, image: MemoryImage, hexfile: str) -> Dict[str, Case]:
+    """Builds the operations to measure for one image, with the check of
+    their results. Inputs are prepared here, so only the operation itself
+    is measured.
+
+    :param ram_OP: RAM interface on the simulated backend (type RAM_Interface).
+    :param image: Image of the run size (type MemoryImage).
+    :param hexfile: The image written as an ihex file (type string).
+    :return: Case name to case (type Dict[str, Case]).
+    """
+
+    words: int = len(image)
+    addresses: List[str] = [f"0x{address:04x}" for address in image]
+    data: List[str] = [f"0x{image[address]:06x}" for address in image]
+    records: List[Hex] = [Hex(hexString=f"0x03{address:04x}00{image[address]:06x}") for address in image]
+    shifts: List[Hex] = [Hex(hexString=word) for word in data]
+    upper: str = f"0x{words - 1:04x}"
+    expected: List[int] = [image[address] for address in image]
+    board = ram_OP.backend.board
+
+    def set_board(*, loaded: bool) -> None:
+        # SRAM holding the image, or cleared so writes have to put it there
+        for address in image:
+            board.sram.write(address=address, word=image[address] if loaded else 0)
+        if ram_OP.mirror is not None:
+            ram_OP.mirror.invalidate()
+
+    def load_board() -> None:
+        set_board(loaded=True)
+
+    def clear_board() -> None:
+        set_board(loaded=False)
+
+    def differs(got: List[int], what: str) -> Optional[str]:
+        if len(got) != len(expected):
+            return f"{len(got)} {what} for {len(expected)} words"
+        wrong: List[int] = [inx for inx, (a, b) in enumerate(zip(got, expected)) if a != b]
+        if wrong:
+            return f"{len(wrong)} {what} differ from the image, first at index {wrong[0]}"
+        return None
+
+    def board_differs(_: Any) -> Optional[str]:
+        return differs([board.sram.read(address=address) for address in image], "words on the board")
+
+    def parse() -> Any:
+        return ihexfile_parser.parse_intel_hexfile(filename=hexfile)
+
+    def checksum() -> Any:
+        return [record.checksum for record in records]
+
+    def shift() -> Any:
+        for word in shifts:
+            ram_OP.data_shifter.shift(shiftHex=word)
+
+    def read_single() -> Any:
+        return [ram_OP.read_single_address(hex_address=address) for address in addresses]
+
+    def write_single() -> None:
+        for address, word in zip(addresses, data):
+            ram_OP.write_single_address(hex_address=address, hex_data=word)
+
+    def bulk_read() -> Any:
+        return ram_OP.bulk_read(lower_addr="0x0000", upper_addr=upper)
+
+    def dump() -> None:
+        ram_OP.dump_intel_hexfile(record_list=image)
+
+    def dump_pipelined() -> None:
+        ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+
+    def verify() -> Any:
+        return ram_OP.verify_checksum(addr_checksum_mappings=image)
+
+    def checksums_match(result: List[str]) -> Optional[str]:
+        wrong: int = sum(
+            int(cs, 16) != record_checksum(address=address, word=image[address])
+            for cs, address in zip(result, image)
+        )
+        return f"{wrong} checksums differ from record_checksum" if wrong else None
+
+    def latched_last(_: Any) -> Optional[str]:
+        latched: int = board.data_chain.storage
+        return None if latched == expected[-1] else f"data shifter latched 0x{latched:06x}, not 0x{expected[-1]:06x}"
+
+    def verify_passed(log: str) -> Optional[str]:
+        failed: int = log.count("verification failed")
+        verified: int = log.count("verified") - failed
+        return None if verified == words and not failed else f"{verified} words verified, {failed} failed"
+
+    return {
+        "parse_intel_hexfile": Case(
+            run=parse, prepare=load_board,
+            check=lambda result: differs([int(record.data_field, 16) for record in result], "parsed words"),
+        ),
+        "Hex.checksum": Case(run=checksum, prepare=load_board, check=checksums_match),
+        "Shifter.shift": Case(run=shift, prepare=load_board, check=latched_last),
+        "read_single_address": Case(
+            run=read_single, prepare=load_board,
+            check=lambda result: differs([int(word, 16) for word in result], "words read"),
+        ),
+        "write_single_address": Case(run=write_single, prepare=clear_board, check=board_differs),
+        "bulk_read": Case(
+            run=bulk_read, prepare=load_board,
+            check=lambda result: differs([int(word, 16) for word in re.findall(r"0x([0-9a-f]{6})\b", result)], "words read"),
+        ),
+        "dump_intel_hexfile": Case(run=dump, prepare=clear_board, check=board_differs),
+        "dump_intel_hexfile[pipelined]": Case(run=dump_pipelined, prepare=clear_board, check=board_differs),
+        "verify_checksum": Case(run=verify, prepare=load_board, check=verify_passed),
+    }
+
+
+def measure(
+    *,
+    case: str,
+    words: int,
+    bench: Case,
+    backend: SimulatedBackend,
+    repeat: int,
+    trace: bool,
+) -> Result:
+    """Runs one case and keeps its fastest CPU time. Short cases are repeated
+    up to `repeat` times or about a second of CPU time, whichever comes
+    first. Peak memory is taken from one more run under tracemalloc. The
+    board is prepared before and the result checked after every run, both
+    untimed; a wrong result fails an assertion.
+
+    :param case: Case name (type string).
+    :param words: Image size in words (type integer).
+    :param bench: The operation with its preparation and check (type Case).
+    :param backend: Simulated backend of the RAM interface (type SimulatedBackend).
+    :param repeat: Most runs to time (type integer).
+    :param trace: Trace allocations in a separate run (type bool).
+    :return: Measurement (type Result).
+    """
+
+    timings = []
+    bus: Optional[BusStats] = None
+
+    while len(timings) < repeat and sum(cpu for cpu, _ in timings) < 1e9:
+        bench.prepare()
+        with backend.measure() as stats:
+            wall: int = time.perf_counter_ns()
+            cpu: int = time.process_time_ns()
+            result: Any = bench.run()
+            cpu = time.process_time_ns() - cpu
+            wall = time.perf_counter_ns() - wall
+        timings.append((cpu, wall))
+        bus = stats if bus is None else bus
+
+        problem: Optional[str] = bench.check(result)
+        assert problem is None, f"{case}/{words} gave a wrong result: {problem}"
+
+    peak: int = 0
+    if trace:
+        bench.prepare()
+        tracemalloc.start()
+        bench.run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    cpu, wall = min(timings)
+    return Result(
+        case=case, words=words, cpu_ns=cpu, wall_ns=wall, peak_bytes=peak,
+        edges=bus.edges, bus_time_ns=bus.bus_time_ns,
+    )
+
+
+def regressions(
+    *,
+    results: List[Result],
+    baseline: Dict[str, Dict[str, int]],
+    cpu_tolerance: float,
+    memory_tolerance: float,
+    same_host: bool=True,
+) -> List[str]:
+    """Compares results with a saved baseline. CPU time and peak memory may
+    grow by their tolerance, edges and bus time are exact on the simulated
+    board and may not grow at all. CPU time and peak memory are only
+    compared with a baseline taken on the same host.
+
+    :param results: Results of this run (type List[Result]).
+    :param baseline: Saved results by key (type Dict[str, Dict[str, int]]).
+    :param cpu_tolerance: Allowed CPU time growth, 0.25 for 25% (type float).
+    :param memory_tolerance: Allowed peak memory growth (type float).
+    :param same_host: The baseline was taken on this host, see host_id (type bool).
+    :return: One line per regression (type List[str]).
+    """
+
+    failed = []
+
+    for result in results:
+        saved: Optional[Dict[str, int]] = baseline.get(result.key)
+        if saved is None:
+            continue
+
+        limits = {
+            "cpu_ns": saved["cpu_ns"] * (1 + cpu_tolerance) if same_host else None,
+            "peak_bytes": saved["peak_bytes"] * (1 + memory_tolerance) if saved["peak_bytes"] and same_host else None,
+            "edges": saved["edges"],
+            "bus_time_ns": saved["bus_time_ns"],
+        }
+        for metric, limit in limits.items():
+            value: int = getattr(result, metric)
+            if limit is not None and value > limit:
+                failed.append(f"{result.key} {metric}: {value} > baseline {saved[metric]}")
+
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PB224 benchmark suite on the simulated board")
+    parser.add_argument("--config", default="src/configs/pb224_config.yaml", help="pb224 config file")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES), help="image sizes in words")
+    parser.add_argument("--case", nargs="+", default=None, help="cases to run, all if not given")
+    parser.add_argument("--repeat", type=int, default=5, help="most timed runs of a short case")
+    parser.add_argument("--no-trace", action="store_true", help="skip the allocation tracing runs")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--cpu-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    ram_OP: RAM_Interface = config_parser.parse_config(conf_file=args.config, backend="sim", cache_dir=None)
+    backend: SimulatedBackend = ram_OP.backend
+    results: List[Result] = []
+
+    print(HEADER)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for words in args.sizes:
+            assert 0 < words <= MemoryImage.WORDS, f"image sizes should be between `1` and `{MemoryImage.WORDS}`."
+
+            image: MemoryImage = make_image(words=words)
+            hexfile: str = os.path.join(tmp_dir, f"image_{words}.hex")
+            image.to_intel_hex(filename=hexfile)
+
+            for case, bench in cases(ram_OP=ram_OP, image=image, hexfile=hexfile).items():
+                if args.case is not None and case not in args.case:
+                    continue
+                result: Result = measure(
+                    case=case, words=words, bench=bench, backend=backend, repeat=args.repeat, trace=not args.no_trace
+                )
+                results.append(result)
+                print(result, flush=True)
+
+    if args.save:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(
+                {"host": host_id(), "results": {result.key: asdict(result) for result in results}},
+                baseline_file, indent=2,
+            )
+            baseline_file.write("\n")
+        print(f"Baseline written to {args.baseline}")
+
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            saved: Dict[str, Any] = json.load(baseline_file)
+
+        same_host: bool = saved["host"] == host_id()
+        if not same_host:
+            print(f"Baseline taken on `{saved['host']}`, comparing edges and bus time only")
+
+        failed: List[str] = regressions(
+            results=results,
+            baseline=saved["results"],
+            cpu_tolerance=args.cpu_tolerance,
+            memory_tolerance=args.memory_tolerance,
+            same_host=same_host,
+        )
+
+        for line in failed:
+            print(f"REGRESSION {line}")
+        print(f"{len(failed)} regressions against {args.baseline}")
+        sys.exit(1 if failed else 0)
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+
+# Benchmark of pin toggles per second for each pin backend
+#
+# Usage:
+#   python3 -m benchmarks.toggle_rate --backend rpi mmio
+#   python3 -m benchmarks.toggle_rate --backend mmio --gpiomem /tmp/gpiomem
+#
+# A --gpiomem path that does not exist is created as a plain one page file,
+# so the register backend can be timed on any Linux box.
+
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from src.backends.pin_backend import PinBackend
+from src.parsers.config_parser import select_backend
+from src.backends.mmio_backend import MMIOGPIOBackend, BLOCK_SIZE
+from typing import Callable
+
+
+def toggles_per_sec(*, toggle: Callable[[int], None], count: int) -> float:
+    """Times `count` calls of `toggle` with alternating levels.
+
+    :param toggle: Function taking the level to drive (type Callable).
+    :param count: Number of toggles (type integer).
+    :return: Toggles per second (type float).
+    """
+
+    start: int = time.perf_counter_ns()
+    for n in range(count):
+        toggle(n & 1)
+    return count / ((time.perf_counter_ns() - start) / 1e9)
+
+
+def bench_backend(*, backend: PinBackend, pins: tuple, count: int) -> None:
+    """Prints toggles per second for single pin and two pin writes.
+
+    :param backend: Backend to benchmark (type PinBackend).
+    :param pins: Two BCM pin numbers, e.g. SER and SRCLK (type tuple).
+    :param count: Number of toggles per measurement (type integer).
+    :return: None.
+    """
+
+    a, b = pins
+    for pin in pins:
+        backend.setup(pin, backend.OUT, initial=0)
+
+    both: int = (1 << a) | (1 << b)
+
+    results = {
+        "output(pin)": toggles_per_sec(toggle=lambda v: backend.output(a, v), count=count),
+        "write_masks(1 pin)": toggles_per_sec(
+            toggle=lambda v: backend.write_masks(v << a, (v ^ 1) << a), count=count
+        ),
+        "write_masks(2 pins)": toggles_per_sec(
+            toggle=lambda v: backend.write_masks(both if v else 0, 0 if v else both), count=count
+        ),
+    }
+
+    for label, rate in results.items():
+        print(f"{backend.name:>5} {label:<20} {rate:>14,.0f} toggles/s")
+
+    backend.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pin toggles per second per backend")
+    parser.add_argument("--backend", nargs="+", default=["rpi", "mmio"])
+    parser.add_argument("--gpiomem", default="/dev/gpiomem")
+    parser.add_argument("--pins", nargs=2, type=int, default=(17, 27))
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    for name in args.backend:
+        if name == "mmio":
+            if not os.path.exists(args.gpiomem):
+                with open(args.gpiomem, "wb") as gpiomem:
+                    gpiomem.write(bytes(BLOCK_SIZE))
+            backend: PinBackend = MMIOGPIOBackend(path=args.gpiomem)
+        else:
+            backend = select_backend(name=name)
+
+        bench_backend(backend=backend, pins=tuple(args.pins), count=args.count)
@@ -1,23 +1,35 @@
 #!/usr/bin/python3
 
-import time
-import RPi.GPIO as GPIO
+from src.utilities.startup_profile import StartupProfile
+
+import argparse
 import os
+import sys
 
-from src.parsers import ihexfile_parser
-from src.parsers import config_parser
-from src.configs.logging_config import setup_logger
+from src.daemon.client import DEFAULT_SOCKET
 
 
-if __name__ == "__main__":
-    os.system("python3 --version")
-    setup_logger()
+profile = StartupProfile()
 
-    # Parse pb224 config file
-    config_file_path = "src/configs/pb224_config.yaml"
-    ram_OP = config_parser.parse_config(conf_file=config_file_path)
-    print(ram_OP)
+# Everything else is imported by the command that needs it, so a short
+# command does not pay for the imports of the others
+
+# Commands that only read the board do not need its manifest
+READ_ONLY_COMMANDS = ("hexdump", "snapshot")
+
+
+def load_manifest(ram_OP, args) -> None:
+    from src.ram.image_manifest import ImageManifest
+
+    # The simulated board starts empty in every process, so its manifest is
+    # kept in memory only and never replaces that of the real board
+    simulated = getattr(ram_OP.backend, "board", None) is not None
+    ram_OP.manifest = ImageManifest.load(
+        directory=None if simulated else args.manifest_dir, board_id=ram_OP.board_id
+    )
 
+
+def demo(ram_OP) -> None:
     # Parse ihex file
     #ihex_file_path = "ihexfile.hex"
     #hex_record_list = ihexfile_parser.parse_intel_hexfile(filename=ihex_file_path)
@@ -32,32 +44,234 @@ if __name__ == "__main__":
     #)
     #print(checksum_status_log)
 
-    time.sleep(0.05)
     ram_OP.write_single_address(hex_address="0x1003", hex_data="0x37cca2")
-    time.sleep(0.05)
     ram_OP.write_single_address(hex_address="0x1004", hex_data="0xc28155")
-    time.sleep(0.05)
     ram_OP.write_single_address(hex_address="0x1005", hex_data="0xe80065")
-    time.sleep(0.05)
     ram_OP.write_single_address(hex_address="0x1006", hex_data="0xa1b9d3")
-    time.sleep(0.05)
     ram_OP.write_single_address(hex_address="0x1007", hex_data="0xf62011")
 
-    time.sleep(0.05)
     print(ram_OP.read_single_address(hex_address="0x0015"))
-    time.sleep(0.05)
     print(ram_OP.read_single_address(hex_address="0x0016"))
-    time.sleep(0.05)
     print(ram_OP.read_single_address(hex_address="0x1003"))
-    time.sleep(0.05)
     print(ram_OP.read_single_address(hex_address="0x1004"))
-    time.sleep(0.05)
     print(ram_OP.read_single_address(hex_address="0x1004"))
 
     bulk_read_log = ram_OP.bulk_read(lower_addr="0x1001", upper_addr="0x100b")
     print(bulk_read_log)
 
+
+def flash(ram_OP, args) -> None:
+    from src.ram.flash_journal import FlashJournal
+    from src.utilities.memory_image import MemoryImage
+    from src.utilities.progress import tqdm_progress
+
+    image = MemoryImage.from_intel_hex(source=args.hexfile)
+
+    # Journalled next to the manifest, so not at all for the simulated board
+    journal = None
+    if ram_OP.manifest.directory is not None:
+        journal = FlashJournal(directory=ram_OP.manifest.directory, board_id=ram_OP.board_id, every=args.checkpoint)
+
+    if args.full:
+        with tqdm_progress(desc="Dumping Intel Hex File", total=len(image)) as progress:
+            image = ram_OP.dump_intel_hexfile(record_list=image, pipelined=True, journal=journal, progress=progress)
+    else:
+        image = ram_OP.flash_differential(record_list=image, manifest=ram_OP.manifest, journal=journal)
+
+    if args.repair:
+        result = ram_OP.verify_and_repair(image=image, retries=args.retries, blink=True)
+        print(result)
+        if result.failing:
+            print(result.diff)
+    elif args.verify:
+        with tqdm_progress(desc="Checksum Verification Status", total=len(image)) as progress:
+            print(ram_OP.verify_checksum(addr_checksum_mappings=image, progress=progress))
+
+
+def calibrate(ram_OP, args) -> None:
+    from src.parsers import config_parser
+    from src.ram import calibration
+
+    results = calibration.calibrate(ram_OP, safety=args.safety, rounds=args.rounds)
+    for result in results:
+        print(result)
+
+    if not args.dry_run:
+        config_parser.write_timings(
+            conf_file=args.config, timing={result.signal: result.setting for result in results}
+        )
+        print(f"Calibrated timings written to {args.config}")
+
+
+def hexdump(ram_OP, args) -> None:
+    if args.output == "-":
+        ram_OP.hexdump(out=sys.stdout, lower_addr=args.lower, upper_addr=args.upper)
+    else:
+        with open(file=args.output, mode="w") as out:
+            ram_OP.hexdump(out=out, lower_addr=args.lower, upper_addr=args.upper)
+
+
+def snapshot(ram_OP, args) -> None:
+    from src.ram.snapshot import Snapshot, SnapshotError
+    from src.utilities.progress import tqdm_progress
+
+    try:
+        snap = Snapshot(path=args.snapshot, board_id=ram_OP.board_id, restart=args.restart)
+    except SnapshotError as e:
+        sys.exit(f"snapshot: {e}")
+
+    with snap:
+        if snap.complete:
+            print(f"{snap} is already complete, pass --restart to take it again")
+        with tqdm_progress(desc="Snapshot", total=snap.size) as progress:
+            ram_OP.snapshot(snapshot=snap, progress=progress)
+        if args.hex:
+            snap.to_image().to_intel_hex(filename=args.hex)
+
+
+def snapshot_hex(args) -> None:
+    from src.ram.snapshot import Snapshot, SnapshotError
+
+    if not os.path.exists(args.snapshot):
+        sys.exit(f"snapshot-hex: no snapshot at `{args.snapshot}`")
+
+    try:
+        snap = Snapshot(path=args.snapshot)
+    except SnapshotError as e:
+        sys.exit(f"snapshot-hex: {e}")
+
+    with snap:
+        if not snap.complete:
+            print(f"{snap} is incomplete, writing the blocks read so far")
+        snap.to_image().to_intel_hex(filename=args.hexfile)
+
+
+def daemon(ram_OP, args) -> None:
+    import asyncio
+    from src.daemon.server import PB224Daemon
+
+    try:
+        asyncio.run(
+            PB224Daemon(
+                ram_OP=ram_OP,
+                socket_path=args.socket,
+                socket_group=args.socket_group,
+                snapshot_dir=args.snapshot_dir,
+            ).serve()
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+def revalidate(ram_OP, args) -> None:
+    differed = ram_OP.revalidate_manifest(manifest=ram_OP.manifest)
+    print(f"{differed} words differed from the manifest of {ram_OP.board_id}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PB224 RAM tool")
+    parser.add_argument("--config", default="src/configs/pb224_config.yaml", help="pb224 config file")
+    parser.add_argument("--backend", default=None, help="pin backend, overrides the config file")
+    parser.add_argument("--manifest-dir", default=".pb224/manifests", help="flashed-image manifests")
+    parser.add_argument("--no-cache", action="store_true", help="compile the config file again, do not cache it")
+    parser.add_argument("--profile-startup", action="store_true", help="print import and init times of startup")
+    parser.add_argument("--metrics", default=None, help="write operation metrics to this file, JSON if it ends in .json")
+    commands = parser.add_subparsers(dest="command")
+
+    flash_parser = commands.add_parser("flash", help="write an intel hex file, only the words that changed")
+    flash_parser.add_argument("hexfile")
+    flash_parser.add_argument("--full", action="store_true", help="write every word, ignore the manifest")
+    flash_parser.add_argument("--verify", action="store_true", help="verify checksums after writing")
+    flash_parser.add_argument("--checkpoint", type=int, default=256, help="journal progress every N words")
+    flash_parser.add_argument("--repair", action="store_true", help="verify and re-write the words that fail")
+    flash_parser.add_argument("--retries", type=int, default=3, help="re-writes per failing word with --repair")
+
+    commands.add_parser("revalidate", help="read back the board and correct its manifest")
+
+    hexdump_parser = commands.add_parser("hexdump", help="stream an address range as hexdump rows")
+    hexdump_parser.add_argument("--lower", default="0x0000", help="first address in hex")
+    hexdump_parser.add_argument("--upper", default="0x7fff", help="last address in hex")
+    hexdump_parser.add_argument("--output", default="-", help="output file, '-' for stdout")
+
+    snapshot_parser = commands.add_parser("snapshot", help="read the whole RAM to a file, resuming a previous run")
+    snapshot_parser.add_argument("snapshot", help="snapshot file, progress is kept next to it")
+    snapshot_parser.add_argument("--restart", action="store_true", help="read every block again, overwriting a file that is not a snapshot of this board")
+    snapshot_parser.add_argument("--hex", default=None, help="also write the snapshot as an intel hex file")
+
+    snapshot_hex_parser = commands.add_parser("snapshot-hex", help="write a snapshot as an intel hex file, no hardware")
+    snapshot_hex_parser.add_argument("snapshot")
+    snapshot_hex_parser.add_argument("hexfile")
+
+    calibrate_parser = commands.add_parser("calibrate", help="find the fastest reliable timings of this board")
+    calibrate_parser.add_argument("--safety", type=float, default=1.5, help="factor applied to the fastest timings")
+    calibrate_parser.add_argument("--rounds", type=int, default=3, help="stress pattern rounds per trial")
+    calibrate_parser.add_argument("--dry-run", action="store_true", help="do not write the config file")
+
+    daemon_parser = commands.add_parser("daemon", help="keep the board set up and serve pb224ctl.py clients")
+    daemon_parser.add_argument("--socket", default=DEFAULT_SOCKET, help="unix socket to listen on")
+    daemon_parser.add_argument("--socket-group", default=None, help="group allowed to use the socket, owner only if not given")
+    daemon_parser.add_argument("--snapshot-dir", default=".pb224/snapshots", help="directory of snapshots taken by clients")
+
+    args = parser.parse_args()
+
+    if args.command == "snapshot-hex":
+        snapshot_hex(args)
+        sys.exit(0)
+
+    with profile.phase("setup logger"):
+        from src.configs.logging_config import setup_logger
+        setup_logger()
+
+    with profile.phase("import config parser"):
+        from src.parsers import config_parser
+        from src.parsers.pin_map import load_pin_map, PIN_MAP_CACHE
+
+    # Parse pb224 config file
+    with profile.phase("load pin map"):
+        pin_map = load_pin_map(conf_file=args.config, cache_dir=None if args.no_cache else PIN_MAP_CACHE)
+
+    metrics = None
+    if args.metrics is not None:
+        from src.utilities.metrics import Metrics
+        metrics = Metrics(board_id=pin_map["boardId"])
+
+    with profile.phase("set up pins"):
+        ram_OP = config_parser.build_ram_interface(pin_map=pin_map, backend=args.backend, metrics=metrics)
+
+    if args.profile_startup:
+        print(profile.report(), file=sys.stderr)
+
+    print(ram_OP)
+
+    if args.command not in READ_ONLY_COMMANDS:
+        load_manifest(ram_OP, args)
+
+    try:
+        if args.command == "flash":
+            flash(ram_OP, args)
+        elif args.command == "revalidate":
+            revalidate(ram_OP, args)
+        elif args.command == "hexdump":
+            hexdump(ram_OP, args)
+        elif args.command == "snapshot":
+            snapshot(ram_OP, args)
+        elif args.command == "calibrate":
+            calibrate(ram_OP, args)
+        elif args.command == "daemon":
+            daemon(ram_OP, args)
+        else:
+            demo(ram_OP)
+    finally:
+        # Also the words written before an error, which are on the board too
+        if ram_OP.manifest is not None:
+            ram_OP.manifest.save()
+
     ram_OP.clear_addr_reg()
     ram_OP.clear_data_reg()
 
-    GPIO.cleanup()
+    print(ram_OP.backend.pulse_report())
+    ram_OP.backend.cleanup()
+
+    if metrics is not None:
+        metrics.write(filename=args.metrics)
+        print(f"Metrics written to {args.metrics}: {metrics}")
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+
+# Thin client of the pb224 daemon, started with `main.py daemon`
+
+import argparse
+import sys
+
+from src.daemon.client import PB224Client, DEFAULT_SOCKET
+from src.daemon.protocol import ProtocolError
+from src.utilities.memory_image import MemoryImage
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PB224 daemon client")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="daemon socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status")
+
+    read_parser = commands.add_parser("read", help="read one word")
+    read_parser.add_argument("address")
+
+    write_parser = commands.add_parser("write", help="write one word")
+    write_parser.add_argument("address")
+    write_parser.add_argument("data")
+
+    range_parser = commands.add_parser("range", help="read an address range as hexdump rows")
+    range_parser.add_argument("lower")
+    range_parser.add_argument("upper")
+
+    flash_parser = commands.add_parser("flash", help="write an intel hex file")
+    flash_parser.add_argument("hexfile")
+    flash_parser.add_argument("--verify", action="store_true")
+
+    verify_parser = commands.add_parser("verify", help="verify an intel hex file")
+    verify_parser.add_argument("hexfile")
+
+    snapshot_parser = commands.add_parser("snapshot", help="read the whole RAM to a snapshot file")
+    snapshot_parser.add_argument("snapshot", help="snapshot name in the daemon's snapshot directory")
+    snapshot_parser.add_argument("--restart", action="store_true", help="read every block again")
+
+    args = parser.parse_args()
+
+    try:
+        with PB224Client(socket_path=args.socket) as client:
+            if args.command == "status":
+                print(client.status())
+
+            elif args.command == "read":
+                print(f"0x{client.read_word(address=int(args.address, 16)):06x}")
+
+            elif args.command == "write":
+                client.write_word(address=int(args.address, 16), value=int(args.data, 16))
+
+            elif args.command == "range":
+                from src.utilities.hexdump import render_hexdump
+                lower = int(args.lower, 16)
+                render_hexdump(start=lower, words=client.read_range(lower=lower, upper=int(args.upper, 16)), out=sys.stdout)
+
+            elif args.command in ("flash", "verify"):
+                image = MemoryImage.from_intel_hex(source=args.hexfile)
+                if args.command == "flash":
+                    client.dump(image=image)
+                if args.command == "verify" or args.verify:
+                    mismatch = client.verify(image=image)
+                    print(f"{len(image) - len(mismatch)} of {len(image)} words verified")
+                    for address in mismatch:
+                        print(f"verification failed for address: 0x{address:04x}")
+
+            elif args.command == "snapshot":
+                print(f"{client.snapshot(name=args.snapshot, restart=args.restart)} blocks read")
+    except ProtocolError as e:
+        sys.exit(f"pb224ctl: {e}")
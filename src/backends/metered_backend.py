@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+
+# Module for the metered pin backend
+#
+# MeteredBackend wraps another backend and adds up, into a Metrics object,
+# the edges driven on each pin and the host time spent in delays and in pin
+# writes and reads. It keeps the last level written to each output pin, so
+# only writes that change a level count as edges, the same as on the
+# simulated board. Pins are set up on the wrapper, so their bound backend
+# functions go through it; without metrics the wrapper is not used and
+# costs nothing. Pulses are handed to the wrapped backend as they are, to
+# keep their timing: the pulse width counts as sleeping and the rest of the
+# call as bit-banging.
+
+
+from __future__ import annotations
+
+from time import perf_counter_ns
+from src.backends.pin_backend import PinBackend
+from src.utilities.metrics import Metrics
+from typing import Dict
+
+
+class MeteredBackend(PinBackend):
+    """Pin backend adding up edges and time of another backend."""
+
+    def __init__(self, *, backend: PinBackend, metrics: Metrics) -> None:
+        self.inner = backend
+        self.metrics = metrics
+        self.name = f"{backend.name}+metered"
+        self.OUT = backend.OUT
+        self.IN = backend.IN
+        self.levels: Dict[int, int] = {}
+
+
+    def _count_edge(self, pin: int, value: int) -> None:
+        # One edge if the pin was at the other level
+        value = int(bool(value))
+        if self.levels.get(pin, 0) != value:
+            self.levels[pin] = value
+            self.metrics.edges[pin] = self.metrics.edges.get(pin, 0) + 1
+
+
+    def __getattr__(self, name: str):
+        # Backend specific members, e.g. the board and measure() of the simulated backend
+        return getattr(self.inner, name)
+
+
+    def setup(self, pin: int, mode: int, *, initial: int=0) -> None:
+        self.inner.setup(pin, mode, initial=initial)
+        if mode == self.OUT:
+            self.levels[pin] = int(bool(initial))
+
+
+    def output(self, pin: int, value: int) -> None:
+        start: int = perf_counter_ns()
+        self.inner.output(pin, value)
+        self.metrics.bitbang_ns += perf_counter_ns() - start
+        self._count_edge(pin, value)
+
+
+    def input(self, pin: int) -> int:
+        start: int = perf_counter_ns()
+        value: int = self.inner.input(pin)
+        self.metrics.bitbang_ns += perf_counter_ns() - start
+        return value
+
+
+    def write_masks(self, set_mask: int, clear_mask: int) -> None:
+        start: int = perf_counter_ns()
+        self.inner.write_masks(set_mask, clear_mask)
+        self.metrics.bitbang_ns += perf_counter_ns() - start
+
+        for mask, value in ((set_mask, 1), (clear_mask, 0)):
+            pin = 0
+            while mask:
+                if mask & 1:
+                    self._count_edge(pin, value)
+                mask >>= 1
+                pin += 1
+
+
+    def pulse(self, pin: int, value: int, seconds: float) -> None:
+        start: int = perf_counter_ns()
+        self.inner.pulse(pin, value, seconds)
+        elapsed: int = perf_counter_ns() - start
+        sleep: int = min(elapsed, round(seconds * 1e9))
+        metrics: Metrics = self.metrics
+        metrics.sleep_ns += sleep
+        metrics.bitbang_ns += elapsed - sleep
+        self._count_edge(pin, value)
+        self._count_edge(pin, not value)
+
+
+    def delay(self, seconds: float) -> None:
+        start: int = perf_counter_ns()
+        self.inner.delay(seconds)
+        self.metrics.sleep_ns += perf_counter_ns() - start
+
+
+    def delay_until(self, deadline_ns: int) -> None:
+        start: int = perf_counter_ns()
+        self.inner.delay_until(deadline_ns)
+        self.metrics.sleep_ns += perf_counter_ns() - start
+
+
+    def clock_ns(self) -> int:
+        return self.inner.clock_ns()
+
+
+    def begin(self) -> None:
+        self.inner.begin()
+
+
+    def pulse_report(self) -> str:
+        return self.inner.pulse_report()
+
+
+    def cleanup(self) -> None:
+        self.inner.cleanup()
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+
+# Module for the direct register GPIO backend
+#
+# Maps the BCM283x GPIO register block through /dev/gpiomem and drives the
+# pins by storing masks into GPSET0/GPCLR0, so any number of pins going the
+# same way change in one store and there is no per-call channel validation.
+# The register file can be any file of at least one page, which lets the
+# backend run against a plain file standing in for /dev/gpiomem.
+
+
+from __future__ import annotations
+
+import mmap
+import os
+
+from src.backends.pin_backend import ScheduledBackend
+from src.utilities.pulse_scheduler import PulseScheduler
+from typing import Optional, Set
+
+
+# Register word offsets in the GPIO block (BCM2835 ARM Peripherals, 6.1)
+GPFSEL0 = 0x00 // 4
+GPSET0 = 0x1c // 4
+GPCLR0 = 0x28 // 4
+GPLEV0 = 0x34 // 4
+
+FSEL_INPUT = 0b000
+FSEL_OUTPUT = 0b001
+
+BLOCK_SIZE = 4096
+
+
+class MMIOGPIOBackend(ScheduledBackend):
+    """Drives the pins by writing the GPIO registers directly."""
+
+    name: str = "mmio"
+
+
+    def __init__(
+        self,
+        *,
+        path: str="/dev/gpiomem",
+        scheduler: Optional[PulseScheduler]=None,
+    ) -> None:
+        super().__init__(scheduler=scheduler)
+        self.path = path
+        self._pins: Set[int] = set()
+
+        fd: int = os.open(path, os.O_RDWR | os.O_SYNC)
+        try:
+            self._map = mmap.mmap(fd, BLOCK_SIZE, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(fd)
+
+        self._regs = memoryview(self._map).cast("I")
+
+
+    def setup(self, pin: int, mode: int, *, initial: int=0) -> None:
+        if mode == self.OUT:
+            self.output(pin, initial)
+
+        reg: int = GPFSEL0 + pin // 10
+        shift: int = (pin % 10) * 3
+        fsel: int = FSEL_OUTPUT if mode == self.OUT else FSEL_INPUT
+        self._regs[reg] = (self._regs[reg] & ~(0b111 << shift)) | (fsel << shift)
+        self._pins.add(pin)
+
+
+    def output(self, pin: int, value: int) -> None:
+        self._regs[GPSET0 if value else GPCLR0] = 1 << pin
+
+
+    def input(self, pin: int) -> int:
+        return (self._regs[GPLEV0] >> pin) & 1
+
+
+    def write_masks(self, set_mask: int, clear_mask: int) -> None:
+        if clear_mask:
+            self._regs[GPCLR0] = clear_mask
+        if set_mask:
+            self._regs[GPSET0] = set_mask
+
+
+    def cleanup(self) -> None:
+        for pin in list(self._pins):
+            self.setup(pin, self.IN)
+        self._pins.clear()
+        self._regs.release()
+        self._map.close()
@@ -0,0 +1,197 @@
+#!/usr/bin/python3
+
+# Module defining the pin backend interface
+#
+# A pin backend is whatever actually drives the GPIO lines. DigitalPin,
+# Shifter and RAM_Interface only talk to a backend, so the same code can
+# drive the breadboard through RPi.GPIO or run against the simulated board.
+
+
+from __future__ import annotations
+
+import time
+
+from src.utilities.pulse_scheduler import PulseScheduler
+from typing import Optional
+
+
+class PinBackend:
+    """Base class for all pin backends. Pin numbers are in BCM mode."""
+
+    OUT: int = 0
+    IN: int = 1
+
+    name: str = "base"
+
+
+    def setup(self, pin: int, mode: int, *, initial: int=0) -> None:
+        """Configures a pin as output or input.
+
+        :param pin: BCM pin number (type integer).
+        :param mode: OUT or IN of this backend (type integer).
+        :param initial: Initial level for output pins (type integer).
+        :return: None.
+        """
+
+        raise NotImplementedError
+
+
+    def output(self, pin: int, value: int) -> None:
+        """Drives an output pin high or low.
+
+        :param pin: BCM pin number (type integer).
+        :param value: 0 for low, 1 for high (type integer).
+        :return: None.
+        """
+
+        raise NotImplementedError
+
+
+    def input(self, pin: int) -> int:
+        """Reads the level at an input pin.
+
+        :param pin: BCM pin number (type integer).
+        :return: 0 for low, 1 for high (type integer).
+        """
+
+        raise NotImplementedError
+
+
+    def delay(self, seconds: float) -> None:
+        """Waits for the given time between pin operations.
+
+        :param seconds: Time to wait in secs (type float).
+        :return: None.
+        """
+
+        raise NotImplementedError
+
+
+    def clock_ns(self) -> int:
+        """Current time on the clock used by `delay`.
+
+        :return: Time in ns (type integer).
+        """
+
+        raise NotImplementedError
+
+
+    def delay_until(self, deadline_ns: int) -> None:
+        """Waits until `clock_ns` reaches the given time. Returns at once if
+        it already has.
+
+        :param deadline_ns: Time on the backend clock in ns (type integer).
+        :return: None.
+        """
+
+        raise NotImplementedError
+
+
+    def write_masks(self, set_mask: int, clear_mask: int) -> None:
+        """Drives several pins at once. Bit n of a mask is BCM pin n.
+        Backends that can, change all of them in a single store.
+
+        :param set_mask: Pins to drive high (type integer).
+        :param clear_mask: Pins to drive low (type integer).
+        :return: None.
+        """
+
+        pin = 0
+        while clear_mask:
+            if clear_mask & 1:
+                self.output(pin, 0)
+            clear_mask >>= 1
+            pin += 1
+
+        pin = 0
+        while set_mask:
+            if set_mask & 1:
+                self.output(pin, 1)
+            set_mask >>= 1
+            pin += 1
+
+
+    def begin(self) -> None:
+        """Marks the start of a pin sequence. Delays that follow are timed
+        from here.
+
+        :return: None.
+        """
+
+
+    def pulse(self, pin: int, value: int, seconds: float) -> None:
+        """Drives a pin to `value` for the given time, then back.
+
+        :param pin: BCM pin number (type integer).
+        :param value: Level during the pulse (type integer).
+        :param seconds: Pulse width in secs (type float).
+        :return: None.
+        """
+
+        self.output(pin, value)
+        self.delay(seconds)
+        self.output(pin, not value)
+
+
+    def pulse_report(self) -> str:
+        """Reports observed versus requested pulse widths, where measured.
+
+        :return: Report text, empty if the backend does not measure pulses (type string).
+        """
+
+        return ""
+
+
+    def cleanup(self) -> None:
+        """Releases the pins used by this backend.
+
+        :return: None.
+        """
+
+        raise NotImplementedError
+
+
+    def __repr__(self) -> str:
+        """Returns representation of a pin backend instance.
+
+        :return: Representation of the backend (type string).
+        """
+
+        return f'{self.__class__.__name__}(name={self.name})'
+
+
+class ScheduledBackend(PinBackend):
+    """Base class for backends driving real pins, timed by a PulseScheduler."""
+
+    def __init__(self, *, scheduler: Optional[PulseScheduler]=None) -> None:
+        self.scheduler = scheduler if scheduler is not None else PulseScheduler()
+
+
+    def delay(self, seconds: float) -> None:
+        self.scheduler.wait(seconds)
+
+
+    def clock_ns(self) -> int:
+        return self.scheduler.clock()
+
+
+    def delay_until(self, deadline_ns: int) -> None:
+        self.scheduler.wait_until(deadline_ns)
+
+
+    def begin(self) -> None:
+        self.scheduler.begin()
+
+
+    def pulse(self, pin: int, value: int, seconds: float) -> None:
+        self.output(pin, value)
+        start: int = time.perf_counter_ns()
+        self.scheduler.wait(seconds)
+        self.output(pin, not value)
+        self.scheduler.record_pulse(
+            pin=pin, requested_ns=round(seconds * 1e9), observed_ns=time.perf_counter_ns() - start
+        )
+
+
+    def pulse_report(self) -> str:
+        return self.scheduler.report()
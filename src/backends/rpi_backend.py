@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+
+# Module for the RPi.GPIO pin backend
+#
+# This is the backend used on the Raspberry Pi Zero 2W. RPi.GPIO is only
+# imported when the backend is created, so the rest of the package can be
+# imported on machines without it. Delays and pulses are timed by the
+# PulseScheduler.
+
+
+from __future__ import annotations
+
+from src.backends.pin_backend import ScheduledBackend
+from src.utilities.pulse_scheduler import PulseScheduler
+from typing import Optional
+
+
+class RPiGPIOBackend(ScheduledBackend):
+    """Drives the pins through RPi.GPIO in BCM mode."""
+
+    name: str = "rpi"
+
+
+    def __init__(self, *, scheduler: Optional[PulseScheduler]=None) -> None:
+        import RPi.GPIO as GPIO
+
+        super().__init__(scheduler=scheduler)
+        self._GPIO = GPIO
+        self.OUT = GPIO.OUT
+        self.IN = GPIO.IN
+
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+
+
+    def setup(self, pin: int, mode: int, *, initial: int=0) -> None:
+        if mode == self.OUT:
+            self._GPIO.setup(pin, mode, initial=initial)
+        else:
+            self._GPIO.setup(pin, mode)
+
+
+    def output(self, pin: int, value: int) -> None:
+        self._GPIO.output(pin, value)
+
+
+    def input(self, pin: int) -> int:
+        return self._GPIO.input(pin)
+
+
+    def write_masks(self, set_mask: int, clear_mask: int) -> None:
+        channels = []
+        values = []
+        for mask, value in ((clear_mask, 0), (set_mask, 1)):
+            pin = 0
+            while mask:
+                if mask & 1:
+                    channels.append(pin)
+                    values.append(value)
+                mask >>= 1
+                pin += 1
+        self._GPIO.output(channels, values)
+
+
+    def cleanup(self) -> None:
+        self._GPIO.cleanup()
+
+
+_default_backend: Optional[RPiGPIOBackend] = None
+
+
+def default_backend() -> RPiGPIOBackend:
+    """Returns the shared RPi.GPIO backend, creating it on first use.
+
+    :return: RPi.GPIO backend (type RPiGPIOBackend).
+    """
+
+    global _default_backend
+
+    if _default_backend is None:
+        _default_backend = RPiGPIOBackend()
+    return _default_backend
@@ -0,0 +1,304 @@
+#!/usr/bin/python3
+
+# Module for the simulated pin backend
+#
+# Software model of the PB224 memory board: the cascaded 74HC595 address
+# and data chains, the 74HC165 read chain and the three MS62256A SRAMs.
+# Pin levels drive the chip models, delays advance a virtual clock instead
+# of sleeping, and every level change is counted as a clock edge. This lets
+# the RAM operations run at full speed on any Linux box while reporting
+# what they would cost on the breadboard.
+
+
+from __future__ import annotations
+
+import threading
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from src.backends.pin_backend import PinBackend
+from typing import Dict, Iterator, Optional
+
+
+@dataclass(kw_only=True)
+class BusStats:
+    """Edge count and virtual bus time, either absolute or for one operation."""
+    edges: int=0
+    bus_time_ns: int=0
+    pin_edges: Dict[int, int]=field(default_factory=dict)
+
+
+    def __sub__(self, other: BusStats) -> BusStats:
+        return BusStats(
+            edges=self.edges - other.edges,
+            bus_time_ns=self.bus_time_ns - other.bus_time_ns,
+            pin_edges={
+                pin: count - other.pin_edges.get(pin, 0)
+                for pin, count in self.pin_edges.items()
+                if count != other.pin_edges.get(pin, 0)
+            },
+        )
+
+
+    def __repr__(self) -> str:
+        return (f'{self.__class__.__name__}(edges={self.edges}, bus_time_ns={self.bus_time_ns})')
+
+
+class HC595Chain:
+    """Cascaded 74HC595 shift registers, shifted in LSB first.
+
+    A value shifted in with its LSB first ends up with bit 0 at output 0
+    after `width` clocks, matching how Shifter.shift drives the chain.
+    """
+
+    def __init__(self, *, width: int) -> None:
+        self.width = width
+        self.shift_stage = 0
+        self.storage = 0
+        self.ser = 0
+        self.cleared = False
+
+
+    def srclk_rise(self) -> None:
+        if not self.cleared:
+            self.shift_stage = (self.shift_stage >> 1) | (self.ser << (self.width - 1))
+
+
+    def rclk_rise(self) -> None:
+        self.storage = self.shift_stage
+
+
+    def set_clear(self, *, active: bool) -> None:
+        self.cleared = active
+        if active:
+            self.shift_stage = 0
+
+
+class HC165Chain:
+    """Cascaded 74HC165 shift registers, shifted out MSB first."""
+
+    def __init__(self, *, width: int) -> None:
+        self.width = width
+        self.register = 0
+        self.loading = False
+
+
+    def clk_rise(self) -> None:
+        if not self.loading:
+            self.register = (self.register << 1) & ((1 << self.width) - 1)
+
+
+    def load(self, *, word: int) -> None:
+        self.register = word
+
+
+    @property
+    def serial_out(self) -> int:
+        return (self.register >> (self.width - 1)) & 1
+
+
+class SRAMBank:
+    """The three MS62256A 32K*8 SRAMs, one per byte lane of a 24 bit word."""
+
+    WORDS: int = 32768
+
+    def __init__(self, *, chips: int=3) -> None:
+        self.chips = [bytearray(self.WORDS) for _ in range(chips)]
+
+
+    def read(self, *, address: int) -> int:
+        address &= self.WORDS - 1
+        word = 0
+        for lane, chip in enumerate(self.chips):
+            word |= chip[address] << (8 * lane)
+        return word
+
+
+    def write(self, *, address: int, word: int) -> None:
+        address &= self.WORDS - 1
+        for lane, chip in enumerate(self.chips):
+            chip[address] = (word >> (8 * lane)) & 0xff
+
+
+class PB224Board:
+    """Wiring of the chip models to BCM pin numbers.
+
+    The keyword arguments of `wire` are the pin names used in
+    pb224_config.yaml.
+    """
+
+    def __init__(self, *, address_width: int=16, data_width: int=24) -> None:
+        self.address_chain = HC595Chain(width=address_width)
+        self.data_chain = HC595Chain(width=data_width)
+        self.read_chain = HC165Chain(width=data_width)
+        self.sram = SRAMBank(chips=data_width // 8)
+        self.ram_in = 0
+        self.roles: Dict[int, str] = {}
+
+
+    def wire(self, **pins: int) -> None:
+        """Assigns a config pin name to each BCM pin number.
+
+        :param pins: Mapping of config pin name to BCM pin number (type integer).
+        :return: None.
+        """
+
+        self.roles.update({pin: role for role, pin in pins.items()})
+
+
+    def on_level(self, *, pin: int, value: int, rising: bool) -> None:
+        """Propagates a level change on an output pin into the chip models.
+
+        :param pin: BCM pin number (type integer).
+        :param value: New level (type integer).
+        :param rising: True for a low to high edge (type bool).
+        :return: None.
+        """
+
+        role: Optional[str] = self.roles.get(pin)
+
+        if role is None:
+            return
+
+        if role in ("addressSER", "dataSER"):
+            self._chain(role).ser = value
+        elif role in ("addressSRCLK", "dataSRCLK"):
+            if rising:
+                self._chain(role).srclk_rise()
+        elif role in ("addressRCLK", "dataRCLK"):
+            if rising:
+                self._chain(role).rclk_rise()
+        elif role in ("addressSRCLR", "dataSRCLR"):
+            self._chain(role).set_clear(active=not value)
+        elif role == "shifterLatch":
+            self.read_chain.loading = not value
+            if not value:
+                self.read_chain.load(word=self.sram.read(address=self.address_chain.storage))
+        elif role == "shiftCLK":
+            if rising:
+                self.read_chain.clk_rise()
+        elif role == "ramIn":
+            self.ram_in = value
+        elif role == "ramInCLK":
+            if rising and self.ram_in:
+                self.sram.write(address=self.address_chain.storage, word=self.data_chain.storage)
+
+
+    def read(self, *, pin: int) -> int:
+        """Returns the level the board drives onto an input pin.
+
+        :param pin: BCM pin number (type integer).
+        :return: 0 for low, 1 for high (type integer).
+        """
+
+        if self.roles.get(pin) == "serialDataIn":
+            if self.read_chain.loading:
+                self.read_chain.load(word=self.sram.read(address=self.address_chain.storage))
+            return self.read_chain.serial_out
+        return 0
+
+
+    def _chain(self, role: str) -> HC595Chain:
+        return self.address_chain if role.startswith("address") else self.data_chain
+
+
+class SimulatedBackend(PinBackend):
+    """Pin backend that drives a PB224Board model on a virtual clock.
+
+    Delays advance the virtual clock instead of sleeping. Every level change
+    on an output pin counts as one edge. State is guarded by a lock so the
+    backend can be shared between threads; their delays add up on the one
+    virtual clock.
+    """
+
+    name: str = "sim"
+
+
+    def __init__(self, *, board: Optional[PB224Board]=None) -> None:
+        self.board = board if board is not None else PB224Board()
+        self.levels: Dict[int, int] = {}
+        self.modes: Dict[int, int] = {}
+        self.now_ns = 0
+        self.edges = 0
+        self.pin_edges: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+
+    def setup(self, pin: int, mode: int, *, initial: int=0) -> None:
+        with self._lock:
+            self.modes[pin] = mode
+            if mode == self.OUT:
+                self.levels[pin] = int(initial)
+
+
+    def output(self, pin: int, value: int) -> None:
+        value = int(bool(value))
+
+        with self._lock:
+            previous = self.levels.get(pin, 0)
+            self.levels[pin] = value
+            if previous == value:
+                return
+            self.edges += 1
+            self.pin_edges[pin] = self.pin_edges.get(pin, 0) + 1
+            self.board.on_level(pin=pin, value=value, rising=bool(value))
+
+
+    def input(self, pin: int) -> int:
+        with self._lock:
+            return self.board.read(pin=pin)
+
+
+    def delay(self, seconds: float) -> None:
+        with self._lock:
+            self.now_ns += round(seconds * 1e9)
+
+
+    def clock_ns(self) -> int:
+        return self.now_ns
+
+
+    def delay_until(self, deadline_ns: int) -> None:
+        with self._lock:
+            self.now_ns = max(self.now_ns, deadline_ns)
+
+
+    def cleanup(self) -> None:
+        with self._lock:
+            self.modes.clear()
+
+
+    def snapshot(self) -> BusStats:
+        """Returns the edge count and virtual time so far.
+
+        :return: Current totals (type BusStats).
+        """
+
+        with self._lock:
+            return BusStats(
+                edges=self.edges,
+                bus_time_ns=self.now_ns,
+                pin_edges=dict(self.pin_edges),
+            )
+
+
+    @contextmanager
+    def measure(self) -> Iterator[BusStats]:
+        """Measures the edges and bus time spent inside the with block.
+        Example:
+            with backend.measure() as cost:
+                ram_OP.write_single_address(hex_address="0x1003", hex_data="0x37cca2")
+            print(cost.edges, cost.bus_time_ns)
+
+        :return: Stats object filled in when the block exits (type BusStats).
+        """
+
+        cost = BusStats()
+        start: BusStats = self.snapshot()
+        try:
+            yield cost
+        finally:
+            delta: BusStats = self.snapshot() - start
+            cost.edges = delta.edges
+            cost.bus_time_ns = delta.bus_time_ns
+            cost.pin_edges = delta.pin_edges
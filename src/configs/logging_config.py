@@ -1,33 +1,19 @@
 #!/usr/bin/python3
 
 # Module to setup logger
+#
+# The root logger is set up directly instead of through logging.config,
+# which imports logging.handlers and socketserver on every start.
 
-import logging.config
+import logging
 
 def setup_logger() -> None:
-    LOGGING_CONFIG = {
-        'version': 1,
-        'disable_existing_loggers': False,
-        'formatters': {
-            'standard': {
-                'format': "%(asctime)s %(levelname)s %(message)s",
-                'datefmt': "%Y-%m-%d %H:%M:%S",
-            }
-        },
-        'handlers': {
-            'console': {
-                'class': 'logging.StreamHandler',
-                'formatter': 'standard',
-                'level': 'INFO',
-            }
-        },
-        'loggers': {
-            '': {
-                'handlers': ['console'],
-                'level': 'INFO',
-                'propagate': False,
-            }
-        },
-    }
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter(fmt="%(asctime)s %(levelname)s %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+    )
+    handler.setLevel(logging.INFO)
 
-    logging.config.dictConfig(LOGGING_CONFIG)
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(logging.INFO)
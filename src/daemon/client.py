@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+
+# Module for the client of the pb224 daemon
+#
+# Only the standard library and the protocol module are imported, so a
+# client process starts in milliseconds and leaves the board setup to the
+# daemon.
+
+
+from __future__ import annotations
+
+import os
+import socket
+
+from array import array
+from src.daemon import protocol
+from src.utilities.memory_image import MemoryImage
+from typing import List
+
+
+DEFAULT_SOCKET = os.path.join("/run", "pb224", "pb224.sock")
+
+
+class PB224Client:
+    """Blocking connection to the pb224 daemon."""
+
+    def __init__(self, *, socket_path: str=DEFAULT_SOCKET) -> None:
+        self.socket_path = socket_path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(socket_path)
+
+
+    def __enter__(self) -> PB224Client:
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def _request(self, opcode: int, body: bytes=b"") -> bytes:
+        protocol.send_frame(self._sock, bytes([opcode]) + body)
+        response: bytes = protocol.recv_frame(self._sock)
+        if response[0] != protocol.OK:
+            raise protocol.ProtocolError(response[1:].decode())
+        return response[1:]
+
+
+    def status(self) -> str:
+        return self._request(protocol.STATUS).decode()
+
+
+    def read_word(self, *, address: int) -> int:
+        return protocol.WORD.unpack(self._request(protocol.READ, protocol.ADDRESS.pack(address)))[0]
+
+
+    def write_word(self, *, address: int, value: int) -> None:
+        self._request(protocol.WRITE, protocol.ADDRESS_WORD.pack(address, value))
+
+
+    def read_range(self, *, lower: int, upper: int) -> array:
+        """Words of an address range, both ends inclusive.
+
+        :param lower: First address (type integer).
+        :param upper: Last address (type integer).
+        :return: Data words (type array('I')).
+        """
+
+        return protocol.unpack_array("I", self._request(protocol.READ_RANGE, protocol.ADDRESS_RANGE.pack(lower, upper)))
+
+
+    def dump(self, *, image: MemoryImage, pipelined: bool=True) -> None:
+        self._request(protocol.DUMP, bytes([pipelined]) + protocol.pack_image(image))
+
+
+    def verify(self, *, image: MemoryImage) -> List[int]:
+        """Addresses of the image that read back differently.
+
+        :param image: Image that was written (type MemoryImage).
+        :return: Mismatching addresses (type List[int]).
+        """
+
+        return list(protocol.unpack_array("H", self._request(protocol.VERIFY, protocol.pack_image(image))))
+
+
+    def snapshot(self, *, name: str, restart: bool=False) -> int:
+        """Reads the RAM into a snapshot file in the daemon's snapshot
+        directory, resuming it.
+        Example name: 'before_flash.bin'
+
+        :param name: Snapshot name, relative to the snapshot directory (type string).
+        :param restart: Read every block again, see `Snapshot` (type bool).
+        :return: Number of blocks read (type integer).
+        """
+
+        return protocol.WORD.unpack(self._request(protocol.SNAPSHOT, bytes([restart]) + name.encode()))[0]
+
+
+    def close(self) -> None:
+        self._sock.close()
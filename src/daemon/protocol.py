@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+
+# Module for the wire protocol of the pb224 daemon
+#
+# Every message is a frame: a 4 byte big endian length, then that many
+# payload bytes. A request payload is a 1 byte opcode and its arguments; a
+# response payload is a 1 byte status and its result, or a UTF-8 error
+# message if the status is ERROR. Addresses are u16, words u32, and runs of
+# them are packed arrays in little endian order, so bulk transfers are
+# copied as they are instead of being encoded as text.
+#
+#   opcode      request arguments                 response result
+#   STATUS      -                                 UTF-8 description
+#   READ        address                           word
+#   WRITE       address, word                     -
+#   READ_RANGE  lower, upper                      words
+#   DUMP        pipelined u8, image               -
+#   VERIFY      image                             mismatching addresses
+#   SNAPSHOT    restart u8, UTF-8 snapshot name   blocks read u32
+
+
+from __future__ import annotations
+
+import socket
+import struct
+import sys
+
+from array import array
+from src.utilities.memory_image import MemoryImage
+
+
+# Opcodes
+STATUS = 0x00
+READ = 0x01
+WRITE = 0x02
+READ_RANGE = 0x03
+DUMP = 0x04
+VERIFY = 0x05
+SNAPSHOT = 0x06
+
+# Response status
+OK = 0x00
+ERROR = 0x01
+
+FRAME_HEADER = struct.Struct(">I")
+ADDRESS = struct.Struct("<H")
+ADDRESS_WORD = struct.Struct("<HI")
+ADDRESS_RANGE = struct.Struct("<HH")
+WORD = struct.Struct("<I")
+
+
+class ProtocolError(RuntimeError):
+    """Raised for an ERROR response or a malformed frame."""
+
+
+def frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def pack_array(values: array) -> bytes:
+    """Little endian bytes of an array('H') or array('I')."""
+
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def unpack_array(typecode: str, data: bytes) -> array:
+    """Array of the given typecode from little endian bytes."""
+
+    values = array(typecode, data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def pack_image(image: MemoryImage) -> bytes:
+    """Image as a u32 word count, the addresses as u16 and the words as u32.
+
+    :param image: Memory image (type MemoryImage).
+    :return: Packed image (type bytes).
+    """
+
+    addresses = array("H", image)
+    words = array("I", (image.words[address] for address in addresses))
+    return WORD.pack(len(addresses)) + pack_array(addresses) + pack_array(words)
+
+
+def unpack_image(data: bytes) -> MemoryImage:
+    """Inverse of `pack_image`.
+
+    :param data: Packed image (type bytes).
+    :return: Memory image (type MemoryImage).
+    """
+
+    if len(data) < WORD.size or len(data) != WORD.size + 6 * WORD.unpack_from(data)[0]:
+        raise ProtocolError("image length does not match its word count")
+
+    count: int = WORD.unpack_from(data)[0]
+    addresses: array = unpack_array("H", data[4:4 + 2 * count])
+    words: array = unpack_array("I", data[4 + 2 * count:])
+
+    image = MemoryImage()
+    image.update(zip(addresses, words))
+    return image
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(frame(payload))
+
+
+def recv_frame(sock: socket.socket) -> bytes:
+    """Reads one frame from a blocking socket.
+
+    :param sock: Connected socket (type socket.socket).
+    :return: Frame payload (type bytes).
+    """
+
+    length: int = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))[0]
+    return _recv_exactly(sock, length)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk: bytes = sock.recv(size - len(data))
+        if not chunk:
+            raise ProtocolError("connection closed mid frame")
+        data += chunk
+    return bytes(data)
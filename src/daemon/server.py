@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+
+# Module for the pb224 daemon
+#
+# The daemon sets the board up once and keeps the RAM_Interface alive,
+# serving requests from any number of clients over a Unix socket. Hardware
+# work goes through AsyncRAMInterface, so requests of different clients
+# queue on its single worker while the socket stays responsive.
+#
+# The daemon usually runs as root for the GPIO, so what a client can reach
+# is kept narrow: the socket is only accessible to its owner, or to one
+# group if given, and snapshots are files named by the client inside the
+# daemon's own snapshot directory, never arbitrary paths.
+
+
+from __future__ import annotations
+
+import asyncio
+import grp
+import logging
+import os
+
+from array import array
+from src.daemon import protocol
+from src.ram.async_ram import AsyncRAMInterface
+from src.ram.ram_operations import RAM_Interface
+from src.ram.snapshot import Snapshot
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(".pb224", "snapshots")
+
+
+def snapshot_path(*, snapshot_dir: str, name: str) -> str:
+    """Resolves a snapshot name sent by a client inside the snapshot directory.
+    Example name: 'before_flash.bin'
+
+    :param snapshot_dir: Directory the daemon keeps snapshots in (type string).
+    :param name: Relative snapshot name (type string).
+    :return: Path of the snapshot file (type string).
+    """
+
+    if not name or os.path.isabs(name) or ".." in name.split("/") or "\0" in name:
+        raise protocol.ProtocolError(f"bad snapshot name `{name}`, expected a relative name without `..`")
+
+    root: str = os.path.realpath(snapshot_dir)
+    path: str = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise protocol.ProtocolError(f"snapshot name `{name}` leaves the snapshot directory")
+
+    return path
+
+
+class PB224Daemon:
+    """Unix socket server around one RAM_Interface."""
+
+    def __init__(
+        self,
+        *,
+        ram_OP: RAM_Interface,
+        socket_path: str,
+        socket_group: Optional[str]=None,
+        snapshot_dir: str=DEFAULT_SNAPSHOT_DIR,
+    ) -> None:
+        self.ram_OP = ram_OP
+        self.socket_path = socket_path
+        self.socket_group = socket_group
+        self.snapshot_dir = snapshot_dir
+        self.aram = AsyncRAMInterface(ram_OP=ram_OP)
+        self.requests = 0
+
+
+    async def _save_manifest(self) -> None:
+        # Saved on the worker, after the write and before any other request
+        if self.ram_OP.manifest is not None:
+            await self.aram.run(lambda ram_OP: ram_OP.manifest.save())
+
+
+    async def _dispatch(self, payload: bytes) -> bytes:
+        """Runs one request.
+
+        :param payload: Request payload (type bytes).
+        :return: Result bytes of the response (type bytes).
+        """
+
+        if not payload:
+            raise protocol.ProtocolError("empty request")
+
+        opcode, body = payload[0], payload[1:]
+
+        if opcode == protocol.STATUS:
+            return f"{self.ram_OP.board_id} {self.ram_OP.backend.name} requests={self.requests}".encode()
+
+        if opcode == protocol.READ:
+            address: int = protocol.ADDRESS.unpack(body)[0]
+            return protocol.WORD.pack(await self.aram.read_word(address=address))
+
+        if opcode == protocol.WRITE:
+            address, word = protocol.ADDRESS_WORD.unpack(body)
+            await self.aram.write_word(address=address, value=word)
+            await self._save_manifest()
+            return b""
+
+        if opcode == protocol.READ_RANGE:
+            lower, upper = protocol.ADDRESS_RANGE.unpack(body)
+            words = array("I")
+            async for word in self.aram.read_range(lower=lower, upper=upper):
+                words.append(word)
+            return protocol.pack_array(words)
+
+        if opcode == protocol.DUMP:
+            try:
+                await self.aram.dump(image=protocol.unpack_image(body[1:]), pipelined=bool(body[0]))
+            finally:
+                await self._save_manifest()
+            return b""
+
+        if opcode == protocol.VERIFY:
+            mismatch, _ = await self.aram.verify(image=protocol.unpack_image(body))
+            return protocol.pack_array(array("H", mismatch))
+
+        if opcode == protocol.SNAPSHOT:
+            restart: bool = body[:1] == b"\x01"
+            path: str = snapshot_path(snapshot_dir=self.snapshot_dir, name=body[1:].decode())
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+
+            def snapshot(ram_OP: RAM_Interface) -> int:
+                with Snapshot(path=path, board_id=ram_OP.board_id, restart=restart) as snap:
+                    return ram_OP.snapshot(snapshot=snap)
+            return protocol.WORD.pack(await self.aram.run(snapshot))
+
+        raise protocol.ProtocolError(f"unknown opcode {opcode:#04x}")
+
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    header: bytes = await reader.readexactly(protocol.FRAME_HEADER.size)
+                    payload: bytes = await reader.readexactly(protocol.FRAME_HEADER.unpack(header)[0])
+                except asyncio.IncompleteReadError as e:
+                    # Client gone, or it hung up in the middle of a frame
+                    if e.partial:
+                        logger.warning(f"dropped truncated request of {len(e.partial)} bytes")
+                    break
+                except ConnectionError:
+                    break
+                self.requests += 1
+
+                try:
+                    response: bytes = bytes([protocol.OK]) + await self._dispatch(payload)
+                except Exception as e:
+                    logger.error(f"request {payload[:1].hex()} failed: {e}")
+                    response = bytes([protocol.ERROR]) + str(e).encode()
+
+                writer.write(protocol.frame(response))
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    break
+        finally:
+            writer.close()
+
+
+    async def serve(self) -> None:
+        """Serves until cancelled, e.g. by Ctrl-C.
+
+        :return: None.
+        """
+
+        socket_dir: str = os.path.dirname(self.socket_path) or "."
+        os.makedirs(socket_dir, mode=0o750 if self.socket_group else 0o700, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        # Created without group and other permissions, so no client can
+        # connect before the permissions below are set
+        umask: int = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        finally:
+            os.umask(umask)
+
+        if self.socket_group is not None:
+            os.chown(self.socket_path, -1, grp.getgrnam(self.socket_group).gr_gid)
+            os.chmod(self.socket_path, 0o660)
+
+        logger.info(f"PB224 DAEMON LISTENING ON {self.socket_path}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.aram.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
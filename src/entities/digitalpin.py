@@ -4,45 +4,50 @@
 #
 # DigitalPins are the GPIO pins on the Raspberry Pi Zero 2W SBC.
 # This module holds all the functionality to manage this pins.
-# The pin mode is [GPIO.BCM]
-
+# The pin mode is [GPIO.BCM]. The pins are driven through a pin backend,
+# RPi.GPIO by default.
+#
+# DigitalPin sits on the bit-bang hot path, so it is a plain slotted class
+# with the backend functions bound to its pin number once, when the pin is
+# set up. `write`, `pulse` and `read` go straight to the backend. Pin
+# numbers, modes and initial values are validated when the config file is
+# compiled, see src.parsers.pin_map.
 
-import time
-import RPi.GPIO as GPIO
 
-from pydantic import BaseModel, field_validator
-from typing import Optional, Any
+from __future__ import annotations
 
+from functools import partial
+from src.backends.pin_backend import PinBackend
+from src.backends.rpi_backend import default_backend
+from typing import Callable, Optional
 
-class DigitalPin(BaseModel):
-    pinNo: int
-    mode: bool
-    initialValue: Optional[int]=0
 
-    # Attribute validations
-    @field_validator("pinNo")
-    @classmethod
-    def validate_pinNo_attr(cls, value: int) -> int:
-        assert (
-            isinstance(value, int) and value in range(0, 28)
-        ), "`pinNo` attribute should be a integer value between `0` and `27`, both inclusive."
-        return value
+class DigitalPin:
+    """One GPIO pin, set up on its backend when created."""
 
+    __slots__ = ("pinNo", "mode", "initialValue", "backend", "write", "pulse", "read")
 
-    @field_validator("mode")
-    @classmethod
-    def validate_mode_attr(cls, value: bool) -> bool:
-        assert isinstance(value, bool), "`mode` attribute should be a `boolean`."
-        return value
+    def __init__(
+        self,
+        *,
+        pinNo: int,
+        mode: int,
+        initialValue: Optional[int]=0,
+        backend: Optional[PinBackend]=None,
+    ) -> None:
+        self.pinNo = pinNo
+        self.mode = mode
+        self.initialValue = initialValue
+        self.backend: PinBackend = default_backend() if backend is None else backend
 
+        # Drives the pin, e.g. write(1)
+        self.write: Callable[[int], None] = partial(self.backend.output, pinNo)
+        # Drives the pin to a level for a time in secs, then back, e.g. pulse(1, 20e-9)
+        self.pulse: Callable[[int, float], None] = partial(self.backend.pulse, pinNo)
+        # Reads the level at the pin, 0 or 1
+        self.read: Callable[[], int] = partial(self.backend.input, pinNo)
 
-    @field_validator("initialValue")
-    @classmethod
-    def validate_initialValue_attr(cls, value: int) -> int:
-        assert(
-            isinstance(value, int) and value in range(0, 2)
-        ), "`initialValue` attribute should be a integer value, either `0` or `1`."
-        return value
+        self.backend.setup(pinNo, mode, initial=initialValue)
 
 
     def trigger(self, *, transition: Optional[str]="1", time_period: Optional[int]=.05) -> None:
@@ -53,9 +58,7 @@ class DigitalPin(BaseModel):
         :return: None.
         """
 
-        GPIO.output(self.pinNo, transition=="1")
-        time.sleep(time_period)
-        GPIO.output(self.pinNo, transition!="1")
+        self.pulse(transition == "1", time_period)
 
 
     def set_value(self, *, value: int) -> None:
@@ -65,7 +68,7 @@ class DigitalPin(BaseModel):
         :return: None.
         """
 
-        GPIO.output(self.pinNo, value)
+        self.write(value)
 
 
     def read_value(self) -> bool:
@@ -74,19 +77,7 @@ class DigitalPin(BaseModel):
         :return: True for 1, False for 0 (type bool).
         """
 
-        return GPIO.input(self.pinNo)
-
-
-    def model_post_init(self, *args) -> None:
-        """Sets the pin initial configuration.
-
-        :return: None.
-        """
-
-        if self.mode == GPIO.OUT:
-            GPIO.setup(self.pinNo, self.mode, initial=self.initialValue)
-        else:
-            GPIO.setup(self.pinNo, self.mode)
+        return self.read()
 
 
     def __repr__(self) -> str:
@@ -9,20 +9,34 @@
 
 from __future__ import annotations
 
-import time
-
+from src.backends.pin_backend import PinBackend
 from src.entities.digitalpin import DigitalPin
 from src.utilities.pb224_utilities import Hex
-from dataclasses import dataclass, field
-from typing import Optional, List
+from src.utilities.timing_profile import SIPOTiming
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.utilities.metrics import Metrics
 
 
 @dataclass(kw_only=True)
 class Shifter:
     shifterDigitalPins: List[DigitalPin]
-    shifterDelay: Optional[int]=field(
-        default=.1
-    )
+    shifterTiming: SIPOTiming
+    shifterWidth: int  # bits in the cascaded chain
+    shifterName: str="shifter"  # label of its metrics, e.g. 'data'
+    metrics: Optional[Metrics]=None
+
+
+    @property
+    def backend(self) -> PinBackend:
+        """Pin backend driving this shifter's pins.
+
+        :return: The pin backend (type PinBackend).
+        """
+
+        return self.shifterDigitalPins[0].backend
 
 
     def clear_register(self) -> None:
@@ -32,7 +46,8 @@ class Shifter:
         """
 
         SRCLR: DigitalPin = self.shifterDigitalPins[-1]
-        SRCLR.trigger(transition="0")
+        self.backend.begin()
+        SRCLR.pulse(0, self.shifterTiming.srclrPulseWidth)
 
 
     def shift(self, *, shiftHex: Hex) -> None:
@@ -42,20 +57,70 @@ class Shifter:
         :return: None.
         """
 
-        SER, SRCLK, RCLK = self.shifterDigitalPins[0:3]
-        counter = 0
-        shift_num: int = shiftHex.hex_to_dec
+        self.shift_word(word=shiftHex.hex_to_dec)
+
+
+    def shift_word(self, *, word: int) -> None:
+        """Shifts the given word into the whole chain and latches it.
+        Example word: 0x1003
+
+        :param word: Value to be shifted (type integer).
+        :return: None.
+        """
+
+        self.load_word(word=word)
+        self.latch()
+
+
+    def load(self, *, shiftHex: Hex) -> None:
+        """Shifts the given data into the shift stage only. The outputs keep
+        the previously latched value until `latch` is called.
+
+        :param shiftHex: Hexadecimal representation of data to be shifted (type Hex).
+        :return: None.
+        """
 
-        while counter < shiftHex.bit_size:
-            SER.set_value(value=shift_num % 2)
-            time.sleep(self.shifterDelay)
-            SRCLK.trigger(transition="1")
-            shift_num >>= 1
-            counter += 1
+        self.load_word(word=shiftHex.hex_to_dec)
 
-        time.sleep(self.shifterDelay)
-        RCLK.trigger(transition="1")
-        SER.set_value(value=0)
+
+    def load_word(self, *, word: int) -> None:
+        """Shifts the given word into the shift stage only, see `load`.
+
+        :param word: Value to be shifted (type integer).
+        :return: None.
+        """
+
+        load_together(loads=[(self, word)])
+
+
+    def latch(self) -> None:
+        """Copies the shift stage to the outputs.
+
+        :return: None.
+        """
+
+        RCLK: DigitalPin = self.shifterDigitalPins[2]
+        self.backend.delay(self.shifterTiming.rclkSetup)
+        RCLK.pulse(1, self.shifterTiming.rclkPulseWidth)
+
+
+    def step(self, *, bit: int) -> None:
+        """Shifts a single bit into the register and latches the outputs.
+        The latched value becomes (previous >> 1) | (bit << (width - 1)).
+
+        :param bit: Bit to shift in, 0 or 1 (type integer).
+        :return: None.
+        """
+
+        SER, SRCLK, RCLK = self.shifterDigitalPins[0:3]
+        timing: SIPOTiming = self.shifterTiming
+
+        self.backend.begin()
+        SER.write(bit)
+        self.backend.delay(timing.serSetup)
+        SRCLK.pulse(1, max(timing.srclkPulseWidth, timing.serHold))
+        self.backend.delay(timing.rclkSetup)
+        RCLK.pulse(1, timing.rclkPulseWidth)
 
 
     def __repr__(self) -> str:
@@ -64,4 +129,71 @@ class Shifter:
         :return: Representation of Shifter data class instance (type string).
         """
 
-        return (f'{self.__class__.__name__}(shifterDigitalPins={self.shifterDigitalPins}, shifterDelay={self.shifterDelay})')
+        return (f'{self.__class__.__name__}(shifterDigitalPins={self.shifterDigitalPins}, shifterTiming={self.shifterTiming}, shifterWidth={self.shifterWidth})')
+
+
+def load_together(*, loads: List[Tuple[Shifter, int]]) -> None:
+    """Shifts words into several shifters from one loop. The SER lines change
+    together on each falling SRCLK edge and the SRCLK rising edges are paired,
+    so the chains are clocked in lock-step. A chain with fewer bits stops
+    clocking once its bits are in. All shifters should share one backend.
+
+    :param loads: Shifter and the word to shift into its whole chain (type List[Tuple[Shifter, int]]).
+    :return: None.
+    """
+
+    backend: PinBackend = loads[0][0].backend
+    write_masks = backend.write_masks
+    delay = backend.delay
+
+    chains = []
+    for shifter, word in loads:
+        SER, SRCLK = shifter.shifterDigitalPins[0:2]
+        chains.append((1 << SER.pinNo, 1 << SRCLK.pinNo, word, shifter.shifterWidth))
+        if shifter.metrics is not None:
+            shifter.metrics.shifted[shifter.shifterName] = shifter.metrics.shifted.get(shifter.shifterName, 0) + 1
+
+    setup: float = max(shifter.shifterTiming.serSetup for shifter, _ in loads)
+    clock_high: float = max(
+        max(shifter.shifterTiming.srclkPulseWidth, shifter.shifterTiming.serHold) for shifter, _ in loads
+    )
+    all_masks: int = 0
+    for ser_mask, srclk_mask, _, _ in chains:
+        all_masks |= ser_mask | srclk_mask
+
+    backend.begin()
+    for counter in range(max(bit_size for _, _, _, bit_size in chains)):
+        # SRCLKs fall and every SER takes its next bit on the same edge
+        set_mask = clear_mask = rise_mask = 0
+        for ser_mask, srclk_mask, shift_num, bit_size in chains:
+            if counter < bit_size:
+                clear_mask |= srclk_mask
+                rise_mask |= srclk_mask
+                if (shift_num >> counter) & 1:
+                    set_mask |= ser_mask
+                else:
+                    clear_mask |= ser_mask
+        write_masks(set_mask, clear_mask)
+        delay(setup)
+        write_masks(rise_mask, 0)
+        delay(clock_high)
+
+    write_masks(0, all_masks)
+
+
+def latch_together(*, shifters: List[Shifter]) -> None:
+    """Pulses the RCLK lines of several shifters with one pair of writes.
+
+    :param shifters: Shifters to latch, sharing one backend (type List[Shifter]).
+    :return: None.
+    """
+
+    backend: PinBackend = shifters[0].backend
+    rclk_mask: int = 0
+    for shifter in shifters:
+        rclk_mask |= 1 << shifter.shifterDigitalPins[2].pinNo
+
+    backend.delay(max(shifter.shifterTiming.rclkSetup for shifter in shifters))
+    backend.write_masks(rclk_mask, 0)
+    backend.delay(max(shifter.shifterTiming.rclkPulseWidth for shifter in shifters))
+    backend.write_masks(0, rclk_mask)
@@ -1,164 +1,197 @@
 #!/usr/bin/python3
 
 # Module to parse the pb224 assembler config file
+#
+# Only the backend a run selects is imported, as are the RAM interface,
+# the mirror and the metrics, when the pins are set up.
 
 from __future__ import annotations
 
-import RPi.GPIO as GPIO
-import yaml
+import importlib
+import os
 
-from typing import List
-from src.entities.shifter import Shifter
-from src.entities.digitalpin import DigitalPin
-from src.ram import ram_operations
+from typing import Any, Dict, List, Optional, Union, TYPE_CHECKING
+from src.parsers.pin_map import load_pin_map, PROFILE_SIGNALS, PIN_MAP_CACHE
 
+if TYPE_CHECKING:
+    from src.backends.pin_backend import PinBackend
+    from src.ram.ram_operations import RAM_Interface
+    from src.utilities.metrics import Metrics
 
-def parse_config(*, conf_file: str) -> ram_operations.RAM_Interface:
-    """Parses the pb224 config file and returns back the ram operations object.
 
-    :param config_file: The path of pb224 config yaml file (type string).
-    :return: ram operations object (type ram_operations.RAM_Interface).
-    """
+# Pin backends selectable through the `backend` config key, as module:class
+BACKENDS = {
+    "rpi": "src.backends.rpi_backend:RPiGPIOBackend",
+    "mmio": "src.backends.mmio_backend:MMIOGPIOBackend",
+    "sim": "src.backends.sim_backend:SimulatedBackend",
+}
 
-    GPIO.setmode(GPIO.BCM)
-    GPIO.setwarnings(False)
 
-    mode_selecter = (GPIO.OUT, GPIO.IN)
+def select_backend(*, name: str) -> PinBackend:
+    """Creates the pin backend registered under the given name.
+    Example name: 'sim'
 
-    with open(file=conf_file, mode="r") as config_file:
-        configs = yaml.safe_load(config_file)
-        config_file.close()
+    :param name: Name of the backend in BACKENDS (type string).
+    :return: pin backend object (type PinBackend).
+    """
 
+    assert name in BACKENDS, f"Unknown pin backend `{name}`, expected one of {sorted(BACKENDS)}."
+    module_name, class_name = BACKENDS[name].split(":")
+    return getattr(importlib.import_module(module_name), class_name)()
 
-    # Parse data shifter profile
-    data_shifter_profile_pins: List = (
-        configs["config"]["profiles"][0]["sipoShifterProfiles"][0]["dataShifterProfile"]["pins"]
-    )
 
-    # DATA_SER
-    data_ser_pin, data_ser_mode, data_ser_initval = data_shifter_profile_pins[0]["dataSER"].values()
-    DATA_SER = DigitalPin(
-        pinNo=data_ser_pin, mode=mode_selecter[data_ser_mode], initialValue=data_ser_initval
-    )
+def parse_config(
+    *,
+    conf_file: str,
+    backend: Optional[Union[str, PinBackend]]=None,
+    cache_dir: Optional[str]=PIN_MAP_CACHE,
+    metrics: Optional[Metrics]=None,
+) -> RAM_Interface:
+    """Parses the pb224 config file and returns back the ram operations object.
 
-    # DATA_SRCLK
-    data_srclk_pin, data_srclk_mode, data_srclk_initval = data_shifter_profile_pins[1]["dataSRCLK"].values()
-    DATA_SRCLK = DigitalPin(
-        pinNo=data_srclk_pin, mode=mode_selecter[data_srclk_mode], initialValue=data_srclk_initval
-    )
+    :param config_file: The path of pb224 config yaml file (type string).
+    :param backend: Pin backend object or name, overrides the `backend` config key (type PinBackend or string).
+    :param cache_dir: Directory of compiled pin maps, no caching if None (type string).
+    :param metrics: Metrics to count operations into, none if None (type Metrics).
+    :return: ram operations object (type RAM_Interface).
+    """
 
-    # DATA_RCLK
-    data_rclk_pin, data_rclk_mode, data_rclk_initval = data_shifter_profile_pins[2]["dataRCLK"].values()
-    DATA_RCLK = DigitalPin(
-        pinNo=data_rclk_pin, mode=mode_selecter[data_rclk_mode], initialValue=data_rclk_initval
+    return build_ram_interface(
+        pin_map=load_pin_map(conf_file=conf_file, cache_dir=cache_dir), backend=backend, metrics=metrics
     )
 
-    # DATA_SRCLR
-    data_srclr_pin, data_srclr_mode, data_srclr_initval = data_shifter_profile_pins[3]["dataSRCLR"].values()
-    DATA_SRCLR = DigitalPin(
-        pinNo=data_srclr_pin, mode=mode_selecter[data_srclr_mode], initialValue=data_srclr_initval
-    )
 
-    data_shifter = Shifter(
-        shifterDigitalPins=[DATA_SER, DATA_SRCLK, DATA_RCLK, DATA_SRCLR],
-        shifterDelay=.05
-    )
+def build_ram_interface(
+    *,
+    pin_map: Dict[str, Any],
+    backend: Optional[Union[str, PinBackend]]=None,
+    metrics: Optional[Metrics]=None,
+) -> RAM_Interface:
+    """Sets up the pins of a compiled pin map and returns back the ram operations object.
 
-    data_shifter.clear_register()
+    :param pin_map: Pin map of the config file, see pin_map.load_pin_map (type Dict[str, Any]).
+    :param backend: Pin backend object or name, overrides the `backend` config key (type PinBackend or string).
+    :param metrics: Metrics to count operations into, none if None (type Metrics).
+    :return: ram operations object (type RAM_Interface).
+    """
 
+    if backend is None:
+        backend = pin_map["backend"]
 
-    # Parse address shifter profile
-    addr_shifter_profile_pins: List = (
-        configs["config"]["profiles"][0]["sipoShifterProfiles"][1]["addressShifterProfile"]["pins"]
-    )
+    if isinstance(backend, str):
+        backend = select_backend(name=backend)
 
-    # ADDR_SER
-    addr_ser_pin, addr_ser_mode, addr_ser_initval = addr_shifter_profile_pins[0]["addressSER"].values()
-    ADDR_SER = DigitalPin(
-        pinNo=addr_ser_pin, mode=mode_selecter[addr_ser_mode], initialValue=addr_ser_initval
-    )
+    from src.entities.digitalpin import DigitalPin
+    from src.entities.shifter import Shifter
+    from src.ram.ram_operations import RAM_Interface
+    from src.utilities.timing_profile import SIPOTiming, PISOTiming, SRAMTiming
 
-    # ADDR_SRCLK
-    addr_srclk_pin, addr_srclk_mode, addr_srclk_initval = addr_shifter_profile_pins[1]["addressSRCLK"].values()
-    ADDR_SRCLK = DigitalPin(
-        pinNo=addr_srclk_pin, mode=mode_selecter[addr_srclk_mode], initialValue=addr_srclk_initval
-    )
+    # Connect the simulated board to the configured pins, only it has a board
+    if getattr(backend, "board", None) is not None:
+        backend.board.wire(**{signal: pin["pin"] for signal, pin in pin_map["pins"].items()})
 
-    # ADDR_RCLK
-    addr_rclk_pin, addr_rclk_mode, addr_rclk_initval = addr_shifter_profile_pins[2]["addressRCLK"].values()
-    ADDR_RCLK = DigitalPin(
-        pinNo=addr_rclk_pin, mode=mode_selecter[addr_rclk_mode], initialValue=addr_rclk_initval
-    )
+    # Pins go through the metered backend only when metrics are wanted
+    if metrics is not None:
+        metrics.pin_names = {pin["pin"]: signal for signal, pin in pin_map["pins"].items()}
+        from src.backends.metered_backend import MeteredBackend
+        backend = MeteredBackend(backend=backend, metrics=metrics)
+
+    mode_selecter = (backend.OUT, backend.IN)
+    timing_margin: float = pin_map["timingMargin"]
+
+    pins: Dict[str, DigitalPin] = {
+        signal: DigitalPin(
+            pinNo=pin["pin"], mode=mode_selecter[pin["input"]], initialValue=pin["initValue"], backend=backend
+        )
+        for signal, pin in pin_map["pins"].items()
+    }
 
-    # ADDR_SRCLR
-    addr_srclr_pin, addr_srclr_mode, addr_srclr_initval = addr_shifter_profile_pins[3]["addressSRCLR"].values()
-    ADDR_SRCLR = DigitalPin(
-        pinNo=addr_srclr_pin, mode=mode_selecter[addr_srclr_mode], initialValue=addr_srclr_initval
+    data_shifter = Shifter(
+        shifterDigitalPins=[pins[signal] for signal in PROFILE_SIGNALS["dataShifterProfile"]],
+        shifterTiming=SIPOTiming.from_config(timing=pin_map["timing"]["dataShifter"], margin=timing_margin),
+        shifterWidth=pin_map["dataShifterWidth"],
+        shifterName="data",
+        metrics=metrics,
     )
 
     address_shifter = Shifter(
-        shifterDigitalPins=[ADDR_SER, ADDR_SRCLK, ADDR_RCLK, ADDR_SRCLR],
-        shifterDelay=.05
+        shifterDigitalPins=[pins[signal] for signal in PROFILE_SIGNALS["addressShifterProfile"]],
+        shifterTiming=SIPOTiming.from_config(timing=pin_map["timing"]["addressShifter"], margin=timing_margin),
+        shifterWidth=pin_map["addressShifterWidth"],
+        shifterName="address",
+        metrics=metrics,
     )
 
+    data_shifter.clear_register()
     address_shifter.clear_register()
 
+    # RAM mirror
+    mirror_config: Dict = pin_map["ramMirror"]
+    mirror = None
+    if mirror_config["enabled"]:
+        from src.ram.ram_mirror import RAMMirror
+        mirror = RAMMirror(trust=mirror_config["trust"])
 
-    # Parse RAM serial read profile
-    ram_serial_reader_profile_pins: List = (
-        configs["config"]["profiles"][1]["pisoShifterProfiles"][0]["ramSerialReaderProfile"]["pins"]
+    # Ram Operations Object
+    ram_OP = RAM_Interface(
+        R_Pins=[pins[signal] for signal in PROFILE_SIGNALS["ramSerialReaderProfile"]],
+        W_Pins=[pins[signal] for signal in PROFILE_SIGNALS["ramWriteProfile"]],
+        addr_shifter=address_shifter,
+        data_shifter=data_shifter,
+        checksum_notifier=pins["notify"],
+        reader_timing=PISOTiming.from_config(timing=pin_map["timing"]["ramSerialReader"], margin=timing_margin),
+        ram_timing=SRAMTiming.from_config(timing=pin_map["timing"]["ramDevice"], margin=timing_margin),
+        blink_period=pin_map["blinkPeriodMs"] / 1000,
+        mirror=mirror,
+        board_id=pin_map["boardId"],
+        address_width=pin_map["addressWidth"],
+        data_width=pin_map["dataWidth"],
+        timing_margin=timing_margin,
+        metrics=metrics,
     )
 
-    # RR_LATCH
-    rr_latch_pin, rr_latch_mode, rr_latch_initval = ram_serial_reader_profile_pins[0]["shifterLatch"].values()
-    RR_LATCH = DigitalPin(
-        pinNo=rr_latch_pin, mode=mode_selecter[rr_latch_mode], initialValue=rr_latch_initval
-    )
+    return ram_OP
 
-    # RR_SHIFT_CLK
-    rr_shiftclk_pin, rr_shiftclk_mode, rr_shiftclk_initval = ram_serial_reader_profile_pins[1]["shiftCLK"].values()
-    RR_SHIFTCLK = DigitalPin(
-        pinNo=rr_shiftclk_pin, mode=mode_selecter[rr_shiftclk_mode], initialValue=rr_shiftclk_initval
-    )
 
-    # RR_SER_DATA_IN
-    rr_serialin_pin, rr_serialin_mode = ram_serial_reader_profile_pins[2]["serialDataIn"].values()
-    RR_SER_DATAIN = DigitalPin(
-        pinNo=rr_serialin_pin, mode=mode_selecter[rr_serialin_mode]
-    )
+def write_timings(*, conf_file: str, timing: Dict[str, int]) -> None:
+    """Rewrites timing values in the `timing` blocks of the config file, keeping
+    comments, anchors and everything else as they are. Timing names are unique
+    across the devices, so each name identifies its device.
+    Example timing: {'srclkPulseWidth': 12, 'ldPulseWidth': 8}
 
+    :param conf_file: The path of pb224 config yaml file (type string).
+    :param timing: Mapping of timing name to nanoseconds (type Dict[str, int]).
+    :return: None.
+    """
 
-    # Parse RAM write profle
-    ram_write_profile_pins: List = configs["config"]["profiles"][2]["otherProfiles"][0]["ramWriteProfile"]["pins"]
+    with open(file=conf_file, mode="r") as config_file:
+        lines: List[str] = config_file.readlines()
 
-    # RW_RI
-    rw_ri_pin, rw_ri_mode, rw_ri_initval = ram_write_profile_pins[0]["ramIn"].values()
-    RW_RI = DigitalPin(
-        pinNo=rw_ri_pin, mode=mode_selecter[rw_ri_mode], initialValue=rw_ri_initval
-    )
+    timing_indent: Optional[int] = None
+    written = set()
 
-    # RW_RICLK
-    rw_riclk_pin, rw_riclk_mode, rw_riclk_initval = ram_write_profile_pins[1]["ramInCLK"].values()
-    RW_RICLK = DigitalPin(
-        pinNo=rw_riclk_pin, mode=mode_selecter[rw_riclk_mode], initialValue=rw_riclk_initval
-    )
+    for inx, line in enumerate(lines):
+        stripped: str = line.strip()
+        indent: int = len(line) - len(line.lstrip())
 
-    # Checksum Blinker
-    checksum_blinker_profile: List = configs["config"]["profiles"][2]["otherProfiles"][1]["checkSumBlinker"]["pins"]
+        if stripped == "timing:":
+            timing_indent = indent
+            continue
 
-    # CHE_BLI
-    ch_pin, ch_mode, ch_initval = checksum_blinker_profile[0]["notify"].values()
-    CHE_BLI = DigitalPin(
-        pinNo=ch_pin, mode=mode_selecter[ch_mode], initialValue=ch_initval
-    )
+        if timing_indent is None or not stripped or stripped.startswith("#"):
+            continue
 
-    # Ram Operations Object
-    ram_OP = ram_operations.RAM_Interface(
-        R_Pins=[RR_LATCH, RR_SHIFTCLK, RR_SER_DATAIN],
-        W_Pins=[RW_RI, RW_RICLK],
-        addr_shifter=address_shifter,
-        data_shifter=data_shifter,
-        checksum_notifier=CHE_BLI,
-    )
+        if indent <= timing_indent:
+            timing_indent = None
+            continue
 
-    return ram_OP
+        name: str = stripped.split(":")[0]
+        if name in timing:
+            lines[inx] = f"{line[:indent]}{name}: {timing[name]}\n"
+            written.add(name)
+
+    assert written == set(timing), f"timings {sorted(set(timing) - written)} not found in `{conf_file}`."
+
+    with open(file=conf_file + ".tmp", mode="w") as tmp_file:
+        tmp_file.writelines(lines)
+    os.replace(conf_file + ".tmp", conf_file)
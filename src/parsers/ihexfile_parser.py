@@ -1,31 +1,134 @@
 #!/usr/bin/python3
 
 # Module to parse the IntelHex File
+#
+# The parser streams the file line by line and yields plain tuples, so a
+# full 32K word image never has to be held as objects. Checksums are
+# checked as each record is read. All six record types are understood;
+# addresses in PB224 images are word addresses and every 3 data bytes of a
+# data record are one 24 bit word. Extended segment and linear address
+# records move the base in the same word units as the data record
+# addresses: segment << 4 and upper << 16 words. Bytes would put a single
+# address half in bytes and half in words.
+
 
 from __future__ import annotations
 
-from src.utilities.record import HexRecord
-from typing import List
+import sys
+
+from src.utilities.pb224_utilities import Hex
+from typing import Iterator, List, TextIO, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.utilities.record import HexRecord
+
+
+# Record types
+DATA = 0x00
+EOF = 0x01
+EXTENDED_SEGMENT_ADDRESS = 0x02
+START_SEGMENT_ADDRESS = 0x03
+EXTENDED_LINEAR_ADDRESS = 0x04
+START_LINEAR_ADDRESS = 0x05
+
+WORD_BYTES = 3
+
+RAM_WORDS = 32768
+
+
+class IntelHexError(ValueError):
+    """Raised for a malformed record, with the line number it was found on."""
+
+
+def iter_records(*, source: Union[str, TextIO]) -> Iterator[Tuple[int, int, bytes]]:
+    """Streams the records of an ihex file, checking each checksum.
+    Example record ':030015006a282135' yields (0, 21, b'j(!').
+
+    :param source: Path of ihex file, '-' for stdin, or an open text file (type string or TextIO).
+    :return: Iterator of (record_type, address_field, data) tuples up to the EOF record (type Iterator[Tuple[int, int, bytes]]).
+    """
+
+    if isinstance(source, str):
+        if source == "-":
+            yield from iter_records(source=sys.stdin)
+            return
+        with open(file=source, mode="r") as ihexfile:
+            yield from iter_records(source=ihexfile)
+        return
+
+    for line_no, line in enumerate(source, start=1):
+        line = line.strip()
+        if not line:
+            continue
+
+        if line[0] != ":":
+            raise IntelHexError(f"line {line_no}: record does not start with ':'")
+
+        try:
+            raw: bytes = bytes.fromhex(line[1:])
+        except ValueError:
+            raise IntelHexError(f"line {line_no}: record is not hexadecimal") from None
+
+        if len(raw) < 5 or len(raw) != raw[0] + 5:
+            raise IntelHexError(f"line {line_no}: byte count does not match record length")
+
+        if sum(raw) & 0xff:
+            raise IntelHexError(f"line {line_no}: checksum mismatch")
+
+        record_type: int = raw[3]
+        if record_type > START_LINEAR_ADDRESS:
+            raise IntelHexError(f"line {line_no}: unknown record type {record_type:#04x}")
+
+        if record_type == EOF:
+            return
+
+        yield record_type, (raw[1] << 8) | raw[2], raw[4:-1]
+
+
+def iter_words(*, source: Union[str, TextIO], words: int=RAM_WORDS) -> Iterator[Tuple[int, int]]:
+    """Streams the 24 bit words of an ihex file with their absolute addresses.
+    Extended segment and linear address records move the base address, in words.
+
+    :param source: Path of ihex file, '-' for stdin, or an open text file (type string or TextIO).
+    :param words: Words of the RAM, higher addresses are an error (type integer).
+    :return: Iterator of (address, word) tuples (type Iterator[Tuple[int, int]]).
+    """
+
+    base = 0
+
+    for record_type, address, data in iter_records(source=source):
+        if record_type == DATA:
+            if len(data) % WORD_BYTES:
+                raise IntelHexError(f"data record at {address:#06x} is not a whole number of 3 byte words")
+            last: int = base + address + len(data) // WORD_BYTES - 1
+            if last >= words:
+                raise IntelHexError(f"data record at {address:#06x} reaches word {last:#x}, beyond the {words} word RAM")
+            for offset in range(0, len(data), WORD_BYTES):
+                yield base + address + offset // WORD_BYTES, int.from_bytes(data[offset:offset + WORD_BYTES], "big")
+        elif record_type in (EXTENDED_SEGMENT_ADDRESS, EXTENDED_LINEAR_ADDRESS):
+            if len(data) != 2:
+                raise IntelHexError(f"extended address record holds {len(data)} bytes, expected 2")
+            shift: int = 4 if record_type == EXTENDED_SEGMENT_ADDRESS else 16
+            base = int.from_bytes(data, "big") << shift
 
 
 def parse_intel_hexfile(*, filename: str) -> List[HexRecord]:
     """Parse the given ihex file.
+    Data records holding several words are split into one record per word.
 
     :param filename: Path of ihex file (type string).
     :return: Returns list of HexRecord objects (type List[HexRecord]).
     """
 
-    dump_hex_records = []
+    # pydantic is only needed for HexRecord lists, not for streaming words
+    from src.utilities.record import HexRecord
 
-    with open(file=filename, mode="r") as ihexfile:
-        data: str = ihexfile.read()
-        for record in data.split("\n"):
-            dump_hex_records.append(
-                HexRecord(record_string=record)
-            )
-        ihexfile.close()
+    dump_hex_records = []
 
-    # Remove last element from list
-    dump_hex_records.pop()
+    for address, word in iter_words(source=filename):
+        record: str = f"{WORD_BYTES:02x}{address:04x}{DATA:02x}{word:06x}"
+        dump_hex_records.append(
+            HexRecord(record_string=":" + record + Hex(hexString="0x" + record).checksum[2:])
+        )
 
     return dump_hex_records
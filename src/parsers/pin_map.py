@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+
+# Module to compile the pb224 config file into a pin map
+#
+# The pin map is the flat, validated form of the config file that
+# parse_config builds the RAM interface from: the pins of every signal,
+# the timing blocks of the devices and the board settings. Profiles are
+# looked up by name, so their order in the file does not matter. Compiled
+# pin maps are cached as JSON keyed by a hash of the config file, so the
+# YAML parser is only imported when the file has changed.
+
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+
+from typing import Dict, Any, Optional
+
+
+PIN_MAP_CACHE = os.path.join(".pb224", "cache")
+
+# Bumped when the layout of the pin map changes, to invalidate cached pin maps
+PIN_MAP_FORMAT = 1
+
+# Signals of each profile, in the order parse_config wires them
+PROFILE_SIGNALS = {
+    "dataShifterProfile": ("dataSER", "dataSRCLK", "dataRCLK", "dataSRCLR"),
+    "addressShifterProfile": ("addressSER", "addressSRCLK", "addressRCLK", "addressSRCLR"),
+    "ramSerialReaderProfile": ("shifterLatch", "shiftCLK", "serialDataIn"),
+    "ramWriteProfile": ("ramIn", "ramInCLK"),
+    "checkSumBlinker": ("notify",),
+}
+
+
+def _profiles(*, configs: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Flattens the profile groups of the config file into profiles by name."""
+
+    profiles = {}
+    for group in configs["config"]["profiles"]:
+        for group_profiles in group.values():
+            for profile in group_profiles:
+                profiles.update(profile)
+    return profiles
+
+
+def _pin(*, name: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Validates one pin entry of a profile."""
+
+    assert (
+        isinstance(entry.get("pin"), int) and entry["pin"] in range(0, 28)
+    ), f"`{name}` pin should be a integer value between `0` and `27`, both inclusive."
+    assert isinstance(entry.get("input"), bool), f"`{name}` input should be a `boolean`."
+
+    if entry["input"]:
+        return {"pin": entry["pin"], "input": True, "initValue": 0}
+
+    assert entry.get("initValue") in (0, 1), f"`{name}` initValue should be either `0` or `1`."
+    return {"pin": entry["pin"], "input": False, "initValue": entry["initValue"]}
+
+
+def compile_pin_map(*, configs: Dict[str, Any]) -> Dict[str, Any]:
+    """Validates the parsed config file and flattens it into a pin map.
+
+    :param configs: The parsed pb224 config file (type Dict[str, Any]).
+    :return: pin map (type Dict[str, Any]).
+    """
+
+    from src.utilities.timing_profile import SIPOTiming, PISOTiming, SRAMTiming
+
+    profiles = _profiles(configs=configs)
+    pins: Dict[str, Dict[str, Any]] = {}
+
+    for profile_name, signals in PROFILE_SIGNALS.items():
+        assert profile_name in profiles, f"`{profile_name}` missing in config file."
+        entries = {}
+        for pin_entry in profiles[profile_name]["pins"]:
+            entries.update(pin_entry)
+        for signal in signals:
+            assert signal in entries, f"`{signal}` pin missing in `{profile_name}`."
+            pins[signal] = _pin(name=signal, entry=entries[signal])
+
+    pin_numbers = [pin["pin"] for pin in pins.values()]
+    assert len(set(pin_numbers)) == len(pin_numbers), "Every signal should have its own pin."
+
+    margin: float = configs["config"].get("timingMargin", 1)
+    timing = {
+        "dataShifter": profiles["dataShifterProfile"]["shifterDevice"]["timing"],
+        "addressShifter": profiles["addressShifterProfile"]["shifterDevice"]["timing"],
+        "ramSerialReader": profiles["ramSerialReaderProfile"]["shifterDevice"]["timing"],
+        "ramDevice": profiles["ramWriteProfile"]["ramDevice"]["timing"],
+    }
+
+    # Validated once here, the timing profiles are built from the cached pin map
+    SIPOTiming.from_config(timing=timing["dataShifter"], margin=margin)
+    SIPOTiming.from_config(timing=timing["addressShifter"], margin=margin)
+    PISOTiming.from_config(timing=timing["ramSerialReader"], margin=margin)
+    SRAMTiming.from_config(timing=timing["ramDevice"], margin=margin)
+
+    mirror_config: Dict = configs["config"].get("ramMirror", {})
+
+    return {
+        "format": PIN_MAP_FORMAT,
+        "boardId": configs["config"].get("boardId", "pb224"),
+        "backend": configs["config"].get("backend", "rpi"),
+        "timingMargin": margin,
+        "ramMirror": {
+            "enabled": mirror_config.get("enabled", False), "trust": mirror_config.get("trust", False)
+        },
+        "pins": pins,
+        "timing": timing,
+        "dataShifterWidth": profiles["dataShifterProfile"]["width"],
+        "addressShifterWidth": profiles["addressShifterProfile"]["width"],
+        "addressWidth": profiles["ramWriteProfile"]["ramDevice"]["addressWidth"],
+        "dataWidth": profiles["ramWriteProfile"]["ramDevice"]["dataWidth"],
+        "blinkPeriodMs": profiles["checkSumBlinker"]["blinkPeriodMs"],
+    }
+
+
+def load_pin_map(*, conf_file: str, cache_dir: Optional[str]=PIN_MAP_CACHE) -> Dict[str, Any]:
+    """Returns the pin map of the config file, compiling and caching it if the
+    file changed since it was last compiled.
+    Example cache file: '.pb224/cache/3f2a...9c.json'
+
+    :param conf_file: The path of pb224 config yaml file (type string).
+    :param cache_dir: Directory of compiled pin maps, no caching if None (type string).
+    :return: pin map (type Dict[str, Any]).
+    """
+
+    with open(file=conf_file, mode="rb") as config_file:
+        source: bytes = config_file.read()
+
+    digest: str = hashlib.sha256(source + bytes([PIN_MAP_FORMAT])).hexdigest()
+    cache_file: Optional[str] = os.path.join(cache_dir, f"{digest}.json") if cache_dir else None
+
+    if cache_file is not None and os.path.exists(cache_file):
+        with open(file=cache_file, mode="r") as cached:
+            return json.load(cached)
+
+    import yaml
+    pin_map = compile_pin_map(configs=yaml.safe_load(source))
+
+    if cache_file is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(file=cache_file + ".tmp", mode="w") as tmp_file:
+            json.dump(pin_map, tmp_file)
+        os.replace(cache_file + ".tmp", cache_file)
+
+    return pin_map
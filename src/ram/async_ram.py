@@ -0,0 +1,221 @@
+#!/usr/bin/python3
+
+# Module for the asyncio front end of the RAM interface
+#
+# All hardware work runs on one worker thread that owns the pins, so
+# operations started from any number of tasks queue up instead of
+# interleaving their pin writes. Long operations report progress through a
+# callback run on the event loop, and check between words whether they
+# were cancelled: cancelling the awaiting task stops the operation at the
+# next word boundary, with the pins in their idle state.
+
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from src.ram.flash_journal import FlashJournal
+from src.ram.ram_operations import RAM_Interface
+from src.utilities.memory_image import MemoryImage
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
+
+
+# Progress callback, called with (words done, words in total)
+ProgressCallback = Callable[[int, int], None]
+
+_END = object()
+
+
+class OperationCancelled(Exception):
+    """Raised on the worker thread to stop a cancelled operation."""
+
+
+class _Progress:
+    """Progress of one operation, its `update` is the progress callback
+    passed to RAM_Interface. It posts progress to the event loop and raises
+    OperationCancelled at the first word boundary after a cancel."""
+
+    def __init__(self, *, loop: asyncio.AbstractEventLoop, total: int, callback: Optional[ProgressCallback]) -> None:
+        self.loop = loop
+        self.total = total
+        self.callback = callback
+        self.done = 0
+        self.cancel = threading.Event()
+
+
+    def update(self, count: int=1) -> None:
+        self.done += count
+        if self.callback is not None:
+            self.loop.call_soon_threadsafe(self.callback, self.done, self.total)
+        if self.cancel.is_set():
+            raise OperationCancelled
+
+
+class AsyncRAMInterface:
+    """Awaitable operations on a RAM_Interface, run by one hardware worker."""
+
+    def __init__(self, *, ram_OP: RAM_Interface) -> None:
+        self.ram_OP = ram_OP
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pb224-hw")
+
+
+    async def __aenter__(self) -> AsyncRAMInterface:
+        return self
+
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+    async def _run(self, func: Callable, progress: Optional[_Progress]=None):
+        """Runs `func` on the worker and waits for it. If the waiting task is
+        cancelled, the operation is stopped at the next word boundary and
+        awaited before the cancellation propagates."""
+
+        future: Future = self._executor.submit(func)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if progress is not None:
+                progress.cancel.set()
+            try:
+                await asyncio.wrap_future(future)
+            except (OperationCancelled, asyncio.CancelledError):
+                pass
+            raise
+
+
+    async def read_word(self, *, address: int) -> int:
+        """Reads one word, see RAM_Interface.read_word.
+
+        :param address: RAM address (type integer).
+        :return: Data word from RAM (type integer).
+        """
+
+        return await self._run(lambda: self.ram_OP.read_word(address=address))
+
+
+    async def write_word(self, *, address: int, value: int) -> None:
+        """Writes one word, see RAM_Interface.write_word.
+
+        :param address: RAM address (type integer).
+        :param value: Data word (type integer).
+        :return: None.
+        """
+
+        await self._run(lambda: self.ram_OP.write_word(address=address, value=value))
+
+
+    async def read_range(
+        self,
+        *,
+        lower: int,
+        upper: int,
+        on_progress: Optional[ProgressCallback]=None,
+    ) -> AsyncIterator[int]:
+        """Reads an address range, both ends inclusive, yielding each word as the
+        worker reads it. Leaving the loop early stops the reads.
+
+        :param lower: First address (type integer).
+        :param upper: Last address (type integer).
+        :param on_progress: Called with (words done, words in total) (type ProgressCallback).
+        :return: Async iterator of data words in ascending address order (type AsyncIterator[int]).
+        """
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        progress = _Progress(loop=loop, total=upper - lower + 1, callback=on_progress)
+
+        def produce() -> None:
+            try:
+                for word in self.ram_OP.read_range(lower=lower, upper=upper, progress=progress.update):
+                    loop.call_soon_threadsafe(queue.put_nowait, word)
+                loop.call_soon_threadsafe(queue.put_nowait, _END)
+            except OperationCancelled:
+                pass
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+
+        future: Future = self._executor.submit(produce)
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            progress.cancel.set()
+            await asyncio.wrap_future(future)
+
+
+    async def dump(
+        self,
+        *,
+        image: MemoryImage,
+        pipelined: bool=True,
+        journal: Optional[FlashJournal]=None,
+        on_progress: Optional[ProgressCallback]=None,
+    ) -> MemoryImage:
+        """Writes an image, see RAM_Interface.dump_intel_hexfile. With a journal,
+        a cancelled dump resumes where it stopped when started again.
+
+        :param image: Image to write (type MemoryImage).
+        :param pipelined: Overlap each write strobe with shifting the next word (type bool).
+        :param journal: Progress journal of the board (type FlashJournal).
+        :param on_progress: Called with (words done, words in total) (type ProgressCallback).
+        :return: The image written (type MemoryImage).
+        """
+
+        progress = _Progress(loop=asyncio.get_running_loop(), total=len(image), callback=on_progress)
+
+        # A cancelled dump closes the journal itself, keeping its progress
+        def dump() -> MemoryImage:
+            return self.ram_OP.dump_intel_hexfile(
+                record_list=image, pipelined=pipelined, journal=journal, progress=progress.update
+            )
+
+        return await self._run(dump, progress)
+
+
+    async def verify(
+        self,
+        *,
+        image: MemoryImage,
+        on_progress: Optional[ProgressCallback]=None,
+    ) -> Tuple[array, str]:
+        """Reads back and compares an image, see RAM_Interface.verify_image.
+
+        :param image: Image that was written (type MemoryImage).
+        :param on_progress: Called with (words done, words in total) (type ProgressCallback).
+        :return: Mismatching addresses and the rendered diff of them (type Tuple[array('I'), str]).
+        """
+
+        progress = _Progress(loop=asyncio.get_running_loop(), total=len(image), callback=on_progress)
+        return await self._run(lambda: self.ram_OP.verify_image(image=image, progress=progress.update), progress)
+
+
+    async def run(self, func: Callable[[RAM_Interface], Any]) -> Any:
+        """Runs any function of the RAM interface on the worker.
+        Example func: lambda ram_OP: ram_OP.sweep_fill(hex_data='0x000000')
+
+        :param func: Called with the RAM_Interface (type Callable).
+        :return: What `func` returns (type Any).
+        """
+
+        return await self._run(lambda: func(self.ram_OP))
+
+
+    async def close(self) -> None:
+        """Waits for queued operations and stops the worker.
+
+        :return: None.
+        """
+
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+
+# Module for timing calibration against the attached board
+#
+# The datasheet timings are worst case figures for the chips alone; the
+# wiring of a particular board decides what actually works. Each signal's
+# delay is lowered, halving at first and then bisecting, for as long as a
+# set of stress patterns still writes and reads back correctly. Only one
+# signal is lowered at a time, the others stay at their configured values.
+# The fastest reliable delays, times a safety factor, can then be written
+# back into the config file. The board words the patterns go to are read
+# first and written back afterwards, so a flashed program and the manifest
+# recording it stay valid.
+
+
+from __future__ import annotations
+
+import logging
+import math
+
+from dataclasses import dataclass
+from src.ram.ram_operations import RAM_Interface
+from typing import Any, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Calibrated signals: timing name to the device whose profile holds it
+SIGNALS: Dict[str, str] = {
+    "serSetup": "sipo",         # SER setup before SRCLK
+    "srclkPulseWidth": "sipo",  # SRCLK pulse
+    "rclkPulseWidth": "sipo",   # RCLK pulse
+    "writePulseWidth": "sram",  # RI_CLK write strobe
+    "ldPulseWidth": "piso",     # 74HC165 SH/LD latch
+    "clkPulseWidth": "piso",    # 74HC165 clock
+}
+
+
+class CalibrationError(RuntimeError):
+    """Raised when the board fails the stress patterns at the configured timings."""
+
+
+@dataclass(kw_only=True)
+class CalibrationResult:
+    signal: str
+    configured: float  # secs, as configured (with timingMargin)
+    fastest: float     # secs, fastest delay that passed
+    setting: int       # ns to write to the config file
+
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(signal={self.signal}, configured={self.configured * 1e9:.1f}ns, '
+            f'fastest={self.fastest * 1e9:.1f}ns, setting={self.setting})'
+        )
+
+
+def stress_patterns(*, address_width: int, data_width: int) -> List[Tuple[int, int]]:
+    """(address, word) pairs exercising every address and data line: walking
+    ones and zeros and alternating bits on the data lines, each written to an
+    address that toggles a single address line against all the others.
+
+    :param address_width: RAM address bits (type integer).
+    :param data_width: RAM word bits (type integer).
+    :return: Pairs with distinct addresses (type List[Tuple[int, int]]).
+    """
+
+    top: int = (1 << address_width) - 1
+    full: int = (1 << data_width) - 1
+
+    addresses: List[int] = [0, top]
+    for line in range(address_width):
+        addresses += [1 << line, top ^ (1 << line)]
+
+    words: List[int] = [full & 0xaaaaaaaa, full & 0x55555555]
+    words += [1 << line for line in range(data_width)]
+    words += [full ^ (1 << line) for line in range(data_width)]
+
+    # More words than toggling addresses: the rest go to the lowest free ones
+    spare = (address for address in range(top + 1) if address not in set(addresses))
+    while len(addresses) < len(words):
+        addresses.append(next(spare))
+
+    return [(address, words[inx % len(words)]) for inx, address in enumerate(addresses)]
+
+
+def _profiles(ram_OP: RAM_Interface, *, device: str) -> List[Any]:
+    """Timing profile objects holding the signals of a device."""
+
+    return {
+        "sipo": [ram_OP.addr_shifter.shifterTiming, ram_OP.data_shifter.shifterTiming],
+        "piso": [ram_OP.reader_timing],
+        "sram": [ram_OP.ram_timing],
+    }[device]
+
+
+def _set(ram_OP: RAM_Interface, *, signal: str, value: float) -> None:
+    for profile in _profiles(ram_OP, device=SIGNALS[signal]):
+        setattr(profile, signal, value)
+
+
+def _passes(ram_OP: RAM_Interface, *, patterns: List[Tuple[int, int]], rounds: int) -> bool:
+    """Writes and reads back the patterns, inverted on every other round."""
+
+    full: int = (1 << ram_OP.data_width) - 1
+
+    for round_no in range(rounds):
+        flip: int = full if round_no % 2 else 0
+
+        for address, word in patterns:
+            ram_OP.write_word(address=address, value=word ^ flip)
+
+        for address, word in patterns:
+            if ram_OP.read_word(address=address) != word ^ flip:
+                return False
+
+    return True
+
+
+def _restore(ram_OP: RAM_Interface, *, saved: List[Tuple[int, int]]) -> None:
+    """Writes back the words the patterns overwrote and checks them."""
+
+    for address, word in saved:
+        ram_OP.write_word(address=address, value=word)
+
+    addresses: List[int] = [address for address, _ in saved]
+    changed: List[int] = [
+        address for (address, word), actual in zip(saved, ram_OP.read_words(addresses=addresses)) if word != actual
+    ]
+    if changed:
+        logger.error(
+            f"{len(changed)} words overwritten by calibration could not be restored, e.g. 0x{changed[0]:04x}; "
+            f"run `main.py revalidate` before the next differential flash"
+        )
+
+
+def calibrate_signal(
+    ram_OP: RAM_Interface,
+    *,
+    signal: str,
+    patterns: List[Tuple[int, int]],
+    rounds: int=3,
+    floor: float=1e-9,
+    steps: int=4,
+) -> float:
+    """Finds the fastest delay of one signal that passes the patterns. The
+    delay is halved until it fails or reaches `floor`, then the gap between
+    the last passing and first failing value is bisected `steps` times.
+    The signal is left at its configured value.
+
+    :param signal: Timing name, a key of SIGNALS (type string).
+    :param patterns: Stress patterns (type List[Tuple[int, int]]).
+    :param rounds: Write and read back rounds per trial (type integer).
+    :param floor: Smallest delay tried, in secs (type float).
+    :param steps: Bisection steps (type integer).
+    :return: Fastest passing delay in secs (type float).
+    """
+
+    configured: float = getattr(_profiles(ram_OP, device=SIGNALS[signal])[0], signal)
+    good: float = configured
+    bad = None
+
+    try:
+        trial: float = configured / 2
+        while trial >= floor:
+            _set(ram_OP, signal=signal, value=trial)
+            if not _passes(ram_OP, patterns=patterns, rounds=rounds):
+                bad = trial
+                break
+            good = trial
+            trial /= 2
+
+        if bad is not None:
+            for _ in range(steps):
+                trial = (good + bad) / 2
+                _set(ram_OP, signal=signal, value=trial)
+                if _passes(ram_OP, patterns=patterns, rounds=rounds):
+                    good = trial
+                else:
+                    bad = trial
+
+    finally:
+        _set(ram_OP, signal=signal, value=configured)
+
+    logger.info(f"{signal}: configured {configured * 1e9:.1f}ns, fastest passing {good * 1e9:.1f}ns")
+    return good
+
+
+def calibrate(
+    ram_OP: RAM_Interface,
+    *,
+    signals: Optional[List[str]]=None,
+    safety: float=1.5,
+    rounds: int=3,
+) -> List[CalibrationResult]:
+    """Calibrates each signal in turn, then applies the fastest delays times
+    `safety` to the running interface and checks the patterns once more.
+    The mirror is bypassed throughout so every access reaches the board,
+    and the words under the patterns are restored at the end.
+
+    :param signals: Timing names to calibrate, all of SIGNALS if None (type List[str]).
+    :param safety: Factor applied to the fastest passing delays (type float).
+    :param rounds: Write and read back rounds per trial (type integer).
+    :return: One result per signal (type List[CalibrationResult]).
+    """
+
+    assert safety >= 1, "`safety` should not be less than `1`."
+
+    if signals is None:
+        signals = list(SIGNALS)
+
+    patterns: List[Tuple[int, int]] = stress_patterns(address_width=ram_OP.address_width, data_width=ram_OP.data_width)
+    mirror, ram_OP.mirror = ram_OP.mirror, None
+    results: List[CalibrationResult] = []
+
+    # Read at the configured timings, before any pattern is written
+    addresses: List[int] = [address for address, _ in patterns]
+    saved: List[Tuple[int, int]] = list(zip(addresses, ram_OP.read_words(addresses=addresses)))
+
+    try:
+        if not _passes(ram_OP, patterns=patterns, rounds=rounds):
+            raise CalibrationError("the board fails the stress patterns at the configured timings")
+
+        for signal in signals:
+            configured: float = getattr(_profiles(ram_OP, device=SIGNALS[signal])[0], signal)
+            fastest: float = calibrate_signal(ram_OP, signal=signal, patterns=patterns, rounds=rounds)
+
+            # Config values are multiplied by timingMargin when loaded
+            setting: int = math.ceil(fastest * safety * 1e9 / ram_OP.timing_margin)
+            setting = min(setting, math.ceil(configured * 1e9 / ram_OP.timing_margin))
+            results.append(CalibrationResult(signal=signal, configured=configured, fastest=fastest, setting=setting))
+
+        for result in results:
+            _set(ram_OP, signal=result.signal, value=result.setting * 1e-9 * ram_OP.timing_margin)
+
+        if not _passes(ram_OP, patterns=patterns, rounds=rounds):
+            for result in results:
+                _set(ram_OP, signal=result.signal, value=result.configured)
+            raise CalibrationError("the calibrated timings fail together, try a larger safety factor")
+
+    finally:
+        _restore(ram_OP, saved=saved)
+        ram_OP.mirror = mirror
+        if mirror is not None:
+            mirror.invalidate()
+
+    logger.info("TIMING CALIBRATION SUCCESSFUL")
+    return results
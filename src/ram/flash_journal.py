@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+
+# Module for the journal of an image flash in progress
+#
+# The journal is a small append-only text file per board. Its first line
+# names the hash and word count of the image being flashed; every following
+# line is the number of words confirmed written so far, appended and
+# fsynced every `every` words. A flash of the same image after an
+# interruption continues after the last complete line. The file is removed
+# once the flash finishes.
+
+
+from __future__ import annotations
+
+import json
+import os
+
+from typing import Dict
+
+
+class FlashJournal:
+    """Durable progress record of one board's flash."""
+
+    def __init__(self, *, directory: str, board_id: str, every: int=256) -> None:
+        assert every > 0, "`every` should be a positive number of words."
+
+        self.directory = directory
+        self.board_id = board_id
+        self.every = every
+        self._file = None
+
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{self.board_id}.journal")
+
+
+    def resume_point(self, *, image_hash: str, words: int) -> int:
+        """Words of the image already confirmed by an earlier, interrupted flash.
+
+        :param image_hash: Hash of the image (type string).
+        :param words: Number of words in the image (type integer).
+        :return: Words to skip, 0 if the journal is of another image or absent (type integer).
+        """
+
+        if not os.path.exists(self.path):
+            return 0
+
+        with open(file=self.path, mode="r") as journal_file:
+            lines = journal_file.read().split("\n")
+
+        try:
+            header: Dict = json.loads(lines[0])
+        except ValueError:
+            return 0
+
+        if header.get("imageHash") != image_hash or header.get("words") != words:
+            return 0
+
+        # The last element is '' after a complete line, or a torn line
+        confirmed = [int(line) for line in lines[1:-1] if line.isdigit()]
+        return min(max(confirmed, default=0), words)
+
+
+    def start(self, *, image_hash: str, words: int) -> int:
+        """Opens the journal for a flash of an image, keeping the progress of an
+        interrupted flash of the same image.
+
+        :param image_hash: Hash of the image (type string).
+        :param words: Number of words in the image (type integer).
+        :return: Words to skip (type integer).
+        """
+
+        # A retry after a failed flash must not leak the previous handle
+        self.close()
+
+        done: int = self.resume_point(image_hash=image_hash, words=words)
+
+        if done:
+            self._file = open(file=self.path, mode="a")
+            return done
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._file = open(file=self.path, mode="w")
+        self._file.write(json.dumps({"boardId": self.board_id, "imageHash": image_hash, "words": words}) + "\n")
+        self._sync()
+        return 0
+
+
+    def confirm(self, *, count: int) -> None:
+        """Records that the first `count` words are written.
+
+        :param count: Words written so far (type integer).
+        :return: None.
+        """
+
+        self._file.write(f"{count}\n")
+        self._sync()
+
+
+    def finish(self) -> None:
+        """Removes the journal after a complete flash.
+
+        :return: None.
+        """
+
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(path={self.path}, every={self.every})'
@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+
+# Module for the record of the image last flashed to a board
+#
+# A manifest is kept per board as two files: `<boardId>.bin` holds the
+# 32K words last written (or read back) as little endian uint32, with
+# UNKNOWN for addresses never written, and `<boardId>.json` holds a SHA-256
+# per block of 256 words plus the hash of the last image. Block hashes
+# that do not match the .bin on load mark that block unknown, and let a
+# new image skip unchanged blocks without comparing word by word. Block
+# hashes are taken over the same little endian bytes, so both files read
+# the same on any host. A manifest without a directory is kept in memory
+# only, for a board that does not outlive the process.
+
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+
+from array import array
+from src.utilities.memory_image import MemoryImage
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+
+UNKNOWN = 0xffffffff
+BLOCK_WORDS = 256
+
+
+def _little_endian(words: array) -> bytes:
+    """Little endian bytes of an array('I'), whatever the host byte order."""
+
+    if sys.byteorder == "big":
+        words = array(words.typecode, words)
+        words.byteswap()
+    return words.tobytes()
+
+
+def image_hash(*, image: Union[Dict[int, int], MemoryImage]) -> str:
+    """Hash of an image given as address to word mappings.
+
+    :param image: Address to data word mappings or a memory image (type Dict[int, int] or MemoryImage).
+    :return: SHA-256 hex digest (type string).
+    """
+
+    digest = hashlib.sha256()
+    for address in sorted(image):
+        digest.update(address.to_bytes(2, "little") + image[address].to_bytes(3, "little"))
+    return digest.hexdigest()
+
+
+class ImageManifest:
+    """Known RAM contents of one board, persisted between runs."""
+
+    def __init__(self, *, directory: Optional[str], board_id: str, words: int=32768) -> None:
+        self.directory = directory
+        self.board_id = board_id
+        self.words = array("I", [UNKNOWN]) * words
+        self.block_hashes: List[str] = [self._block_hash(block=b) for b in range(words // BLOCK_WORDS)]
+        self.image_hash = ""
+
+
+    @property
+    def bin_path(self) -> str:
+        return os.path.join(self.directory, f"{self.board_id}.bin")
+
+
+    @property
+    def json_path(self) -> str:
+        return os.path.join(self.directory, f"{self.board_id}.json")
+
+
+    @classmethod
+    def load(cls, *, directory: Optional[str], board_id: str) -> ImageManifest:
+        """Loads the manifest of a board, or an empty one if there is none yet.
+
+        :param directory: Directory holding the manifests, None to keep it in memory only (type string).
+        :param board_id: Board identifier from the config (type string).
+        :return: manifest object (type ImageManifest).
+        """
+
+        manifest = cls(directory=directory, board_id=board_id)
+
+        if directory is None or not (os.path.exists(manifest.bin_path) and os.path.exists(manifest.json_path)):
+            return manifest
+
+        with open(file=manifest.json_path, mode="r") as json_file:
+            meta: Dict = json.load(json_file)
+
+        with open(file=manifest.bin_path, mode="rb") as bin_file:
+            words = array("I")
+            words.frombytes(bin_file.read())
+            if sys.byteorder == "big":
+                words.byteswap()
+
+        if len(words) != len(manifest.words) or meta.get("blockWords") != BLOCK_WORDS:
+            return manifest
+
+        manifest.words = words
+        manifest.image_hash = meta.get("imageHash", "")
+
+        # Blocks whose contents no longer match their hash are forgotten
+        for block, stored_hash in enumerate(meta["blockHashes"]):
+            if manifest._block_hash(block=block) != stored_hash:
+                manifest.words[block * BLOCK_WORDS:(block + 1) * BLOCK_WORDS] = array("I", [UNKNOWN]) * BLOCK_WORDS
+            manifest.block_hashes[block] = manifest._block_hash(block=block)
+
+        return manifest
+
+
+    def save(self) -> None:
+        """Writes the manifest files, replacing the previous ones atomically.
+
+        :return: None.
+        """
+
+        if self.directory is None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        for path, mode, content in (
+            (self.bin_path, "wb", _little_endian(self.words)),
+            (self.json_path, "w", json.dumps({
+                "boardId": self.board_id,
+                "blockWords": BLOCK_WORDS,
+                "imageHash": self.image_hash,
+                "blockHashes": self.block_hashes,
+            }, indent=1)),
+        ):
+            with open(file=path + ".tmp", mode=mode) as tmp_file:
+                tmp_file.write(content)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(path + ".tmp", path)
+
+
+    def diff(self, *, image: Union[Dict[int, int], MemoryImage]) -> List[Tuple[int, int]]:
+        """Finds the words of an image that the board does not already hold.
+
+        :param image: Address to data word mappings or a memory image (type Dict[int, int] or MemoryImage).
+        :return: (address, word) pairs to write, in image order (type List[Tuple[int, int]]).
+        """
+
+        by_block: Dict[int, List[int]] = {}
+        for address in image:
+            by_block.setdefault(address // BLOCK_WORDS, []).append(address)
+
+        unchanged = set()
+        for block, addresses in by_block.items():
+            merged: array = self.words[block * BLOCK_WORDS:(block + 1) * BLOCK_WORDS]
+            for address in addresses:
+                merged[address % BLOCK_WORDS] = image[address]
+            if hashlib.sha256(_little_endian(merged)).hexdigest() == self.block_hashes[block]:
+                unchanged.add(block)
+
+        return [
+            (address, word) for address, word in image.items()
+            if address // BLOCK_WORDS not in unchanged and self.words[address] != word
+        ]
+
+
+    def record(self, *, words: Iterable[Tuple[int, int]]) -> None:
+        """Stores words now held by the board and updates their block hashes.
+
+        :param words: (address, word) pairs (type Iterable[Tuple[int, int]]).
+        :return: None.
+        """
+
+        touched = set()
+        for address, word in words:
+            self.words[address] = word
+            touched.add(address // BLOCK_WORDS)
+
+        for block in touched:
+            self.block_hashes[block] = self._block_hash(block=block)
+
+
+    def known_addresses(self) -> List[int]:
+        """Addresses whose contents are recorded.
+
+        :return: Ascending addresses (type List[int]).
+        """
+
+        return [address for address, word in enumerate(self.words) if word != UNKNOWN]
+
+
+    def _block_hash(self, *, block: int) -> str:
+        return hashlib.sha256(_little_endian(self.words[block * BLOCK_WORDS:(block + 1) * BLOCK_WORDS])).hexdigest()
+
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(board_id={self.board_id}, '
+            f'known={len(self.known_addresses())}, image_hash={self.image_hash[:12]})'
+        )
@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+
+# Module for the in-process mirror of the RAM contents
+#
+# The mirror keeps the last word written to or read from every address in
+# a flat array('I') of 32K entries, with a bitmap marking which entries are
+# known. In trust mode RAM_Interface serves reads from it and skips writes
+# of a word the address already holds. When the PB224 CPU may have changed
+# memory, the affected range has to be invalidated or refreshed.
+
+
+from __future__ import annotations
+
+from array import array
+from typing import Optional
+
+
+class RAMMirror:
+    """Word array plus validity bitmap for the 32K word address space."""
+
+    def __init__(self, *, words: int=32768, trust: bool=False) -> None:
+        self.size = words
+        self.trust = trust
+        self.words = array("I", bytes(4 * words))
+        self.valid = bytearray((words + 7) // 8)
+        self.read_hits = 0
+        self.skipped_writes = 0
+
+
+    def get(self, *, address: int) -> Optional[int]:
+        """Returns the known word at an address.
+
+        :param address: RAM address (type integer).
+        :return: The word, None if not known (type integer).
+        """
+
+        if self.valid[address >> 3] & (1 << (address & 7)):
+            return self.words[address]
+        return None
+
+
+    def set(self, *, address: int, word: int) -> None:
+        """Records the word held at an address.
+
+        :param address: RAM address (type integer).
+        :param word: 24 bit data word (type integer).
+        :return: None.
+        """
+
+        self.words[address] = word
+        self.valid[address >> 3] |= 1 << (address & 7)
+
+
+    def cached(self, *, address: int) -> Optional[int]:
+        """Returns the word to serve a read from, only in trust mode.
+
+        :param address: RAM address (type integer).
+        :return: The word, None if the read has to go to hardware (type integer).
+        """
+
+        if not self.trust:
+            return None
+
+        word: Optional[int] = self.get(address=address)
+        if word is not None:
+            self.read_hits += 1
+        return word
+
+
+    def holds(self, *, address: int, word: int) -> bool:
+        """Tells whether a write can be skipped, only in trust mode.
+
+        :param address: RAM address (type integer).
+        :param word: 24 bit data word to be written (type integer).
+        :return: True if the address is known to hold the word already (type bool).
+        """
+
+        if self.trust and self.get(address=address) == word:
+            self.skipped_writes += 1
+            return True
+        return False
+
+
+    def invalidate(self, *, lower: int=0, upper: Optional[int]=None) -> None:
+        """Forgets the words in an address range, both ends inclusive.
+
+        :param lower: First address (type integer).
+        :param upper: Last address, the top of memory if not given (type integer).
+        :return: None.
+        """
+
+        upper = self.size - 1 if upper is None else upper
+        for address in range(lower, upper + 1):
+            self.valid[address >> 3] &= ~(1 << (address & 7)) & 0xff
+
+
+    @property
+    def known(self) -> int:
+        """Number of addresses with a known word.
+
+        :return: Count of valid entries (type integer).
+        """
+
+        return sum(bin(byte).count("1") for byte in self.valid)
+
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(trust={self.trust}, known={self.known}, '
+            f'read_hits={self.read_hits}, skipped_writes={self.skipped_writes})'
+        )
@@ -13,89 +13,69 @@
 
 from __future__ import annotations
 
-import threading
+import io
 import logging
-import time
 
 from typing import (
     List,
     Dict,
+    Set,
+    Iterator,
+    Iterable,
     Tuple,
     Union,
-    ContextManager,
-    Callable,
     Optional,
+    TextIO,
+    TYPE_CHECKING,
 )
 
-from src.utilities.pb224_utilities import Hex, bin_to_hex, dec_to_hex
+from src.utilities.pb224_utilities import Hex, dec_to_hex
+from src.utilities.timing_profile import SIPOTiming, PISOTiming, SRAMTiming
+from src.backends.pin_backend import PinBackend
+from src.ram.sweep import DeBruijnWalk, ADDRESS_BITS
+from src.ram.ram_mirror import RAMMirror
+from src.ram.image_manifest import ImageManifest, image_hash
+from src.ram.flash_journal import FlashJournal
+from src.ram.snapshot import Snapshot, BLOCK_WORDS as SNAPSHOT_BLOCK_WORDS
 from src.entities.digitalpin import DigitalPin
-from src.entities.shifter import Shifter
-from src.utilities.record import HexRecord
-from dataclasses import dataclass
-from termcolor import colored
-from tqdm import tqdm
+from src.entities.shifter import Shifter, load_together, latch_together
+from src.utilities.memory_image import MemoryImage
+from src.utilities.image_compare import mismatches, render_diff
+from src.utilities.hexdump import render_hexdump
+from src.utilities.progress import Progress
+from src.utilities.metrics import Metrics, UNMEASURED
+from array import array
+from dataclasses import dataclass, field
 
+if TYPE_CHECKING:
+    from src.utilities.record import HexRecord
 
-logger = logging.getLogger(__name__)
 
+logger = logging.getLogger(__name__)
 
-def checksum_status_pbar(func) -> Callable[..., str]:
-    """Status bar decorator for checksum verification."""
 
-    def wrapper(otherSelf, **kwargs) -> str:
-        addr_check_mappings: Dict[str, str] = kwargs["addr_checksum_mappings"]
+@dataclass(kw_only=True)
+class RepairResult:
+    """Outcome of `RAM_Interface.verify_and_repair`."""
 
-        with tqdm(
-            total=len(addr_check_mappings), desc="Checksum Verification Status"
-        ) as pbar:
-            kwargs["progress_bar"] = pbar
-            checksum_status_log: str = func(
-                otherSelf,
-                **kwargs,
-            )
-        return checksum_status_log
-    return wrapper
+    verified: int  # words that read back correctly the first time
+    repaired: List[int]  # addresses fixed by re-writing
+    failing: List[int]  # addresses still wrong after the retry budget
+    attempts: Dict[int, int]  # re-writes spent per address
+    diff: str  # rendered diff of the failing addresses
 
 
-def bulk_read_status_pbar(func) -> Callable[..., str]:
-    """Status bar decorator for RAM Bulk Reading."""
+    @property
+    def ok(self) -> bool:
+        return not self.failing
 
-    def wrapper(otherSelf, **kwargs) -> str:
-        l_addr: str = kwargs["lower_addr"]
-        u_addr: str = kwargs["upper_addr"]
 
-        l, u = RAM_Interface._get_addr_range(
-            start_addr=l_addr,
-            end_addr=u_addr,
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(verified={self.verified}, repaired={len(self.repaired)}, '
+            f'failing={len(self.failing)}, rewrites={sum(self.attempts.values())})'
         )
 
-        with tqdm(
-            total=(Hex(hexString=u).hex_to_dec - Hex(hexString=l).hex_to_dec + 1),
-            desc="Bulk Read Status",
-        ) as pbar:
-            kwargs["progress_bar"] = pbar
-            bulk_read_status_log: str = func(
-                otherSelf,
-                **kwargs,
-            )
-        return bulk_read_status_log
-    return wrapper
-
-
-def dump_intel_hexfile_pbar(func) -> Callable[..., Dict[str, str]]:
-    """Status bar decorator for Intel Hex File Dump."""
-
-    def wrapper(otherSelf, **kwargs) -> Dict[str, str]:
-        record_list: List[HexRecord] = kwargs["record_list"]
-        with tqdm(total=len(record_list), desc="Dumping Intel Hex File") as pbar:
-            kwargs["progress_bar"] = pbar
-            dump_log: Dict[str, str] = func(
-                otherSelf,
-                **kwargs,
-            )
-        return dump_log
-    return wrapper
-
 
 @dataclass(kw_only=True)
 class RAM_Interface:
@@ -104,106 +84,199 @@ class RAM_Interface:
     addr_shifter: Shifter
     data_shifter: Shifter
     checksum_notifier: DigitalPin
+    reader_timing: PISOTiming
+    ram_timing: SRAMTiming
+    blink_period: float=.5
+    mirror: Optional[RAMMirror]=None
+    manifest: Optional[ImageManifest]=None  # what the board holds, kept current by every write
+    board_id: str="pb224"
+    address_width: int=ADDRESS_BITS
+    data_width: int=24
+    timing_margin: float=1  # timingMargin the timing profiles were built with
+    metrics: Optional[Metrics]=None
+    write_throughput: float=field(default=0.0, init=False)  # words/s of the last dump
+
+
+    @property
+    def backend(self) -> PinBackend:
+        """Pin backend driving the RAM interface pins.
+
+        :return: The pin backend (type PinBackend).
+        """
+
+        return self.checksum_notifier.backend
+
+
+    def _operation(self, name: str):
+        # Times an operation into the metrics, a no-op without them
+        return UNMEASURED if self.metrics is None else self.metrics.operation(name)
 
 
-    @staticmethod
-    def _get_lower_addr(*, l_addr: str) -> str:
-        """Computes the lower margin address for bulk reading.
-        Example l_addr: '0x0002'
-        Example return address: '0x0000'
+    def _record_written(self, *, words: Iterable[Tuple[int, int]]) -> None:
+        """Stores words now on the board in the manifest. The board no longer
+        holds just the last image flashed, so its image hash is cleared; a
+        dump of a whole image sets it again.
 
-        :param l_addr: Hexadecimal representation of address (type string).
-        :return: lower margin address (type string).
+        :param words: (address, word) pairs written (type Iterable[Tuple[int, int]]).
+        :return: None.
         """
 
-        dec_rep_lower: int = Hex(hexString=l_addr).hex_to_dec
-        if dec_rep_lower % 8 == 0:
-            return l_addr
-        else:
-            while True:
-                dec_rep_lower -= 1
-                if dec_rep_lower % 8 == 0:
-                    return dec_to_hex(dec=dec_rep_lower)
+        if self.manifest is not None:
+            self.manifest.record(words=words)
+            self.manifest.image_hash = ""
 
 
-    @staticmethod
-    def _get_higher_addr(*, h_addr: str) -> str:
-        """Computes the higher margin address for bulk reading.
-        Example h_addr: '0x0006'
-        Example retrun address: '0x0007'
+    def _read_latched(self) -> int:
+        """Reads the word at the address currently latched in the address shifter.
 
-        :param h_addr: Hexadecimal representation of address (type string).
-        :return: higher margin address (type string).
+        :return: Data word from RAM (type integer).
         """
 
-        dec_rep_higher: int = Hex(hexString=h_addr).hex_to_dec
-        while True:
-            dec_rep_higher += 1
-            if dec_rep_higher % 8 == 0:
-                return dec_to_hex(dec=dec_rep_higher - 1)
+        LD, R_CLK, SER_DATA = self.R_Pins
 
+        self.backend.begin()
+        self.backend.delay(self.ram_timing.accessTime)
 
-    @staticmethod
-    def _get_addr_range(*, start_addr: str, end_addr: str) -> Tuple[str, str]:
-        """Computes the address space for given addresses.
-        Example start_addr: '0x0001'
-        Example end_addr: '0x0005'
+        # Latch the RAM data in 74HC165
+        LD.pulse(0, self.reader_timing.ldPulseWidth)
 
-        :param start_addr: Hexadecimal representation of desired start address (type string).
-        :param end_addr: Hexadecimal representation of desired end address (type string).
-        return: tuple containing lower and upper address margins (type tuple).
-        """
+        self.backend.delay(self.reader_timing.ldToClk)
 
-        return (
-            RAM_Interface._get_lower_addr(l_addr=start_addr),
-            RAM_Interface._get_higher_addr(h_addr=end_addr),
-        )
+        # Shifting out and reading 3 bytes of data, MSB first
+        read, pulse, delay = SER_DATA.read, R_CLK.pulse, self.backend.delay
+        clk_width: float = self.reader_timing.clkPulseWidth
+        clk_to_output: float = self.reader_timing.clkToOutput
+        word: int = read()
 
+        for _ in range(self.data_width - 1):
+            pulse(1, clk_width)
+            delay(clk_to_output)
+            word = (word << 1) | read()
+            delay(clk_width)
 
-    def read_single_address(self, *, hex_address: str) -> str:
-        """Read single address from RAM.
-        Example hex_address: '0x3e01'
-        Example return data: '0x340024'
+        return word
 
-        :param hex_address: Hexadecimal representation of address (type string).
-        :return: Data from RAM (type string).
+
+    def _write_latched(self) -> None:
+        """Strobes the word latched in the data shifter into the address
+        latched in the address shifter.
+
+        :return: None.
         """
 
         RI, RI_CLK = self.W_Pins
-        LD, R_CLK, SER_DATA = self.R_Pins
 
-        try:
+        self.backend.begin()
+        self.backend.delay(self.ram_timing.addressSetup)
+        RI.write(1)
+        self.backend.delay(self.ram_timing.dataSetup)
+        RI_CLK.pulse(1, self.ram_timing.writePulseWidth)
+        self.backend.delay(self.ram_timing.dataHold)
+        RI.write(0)
+        self.backend.delay(self.ram_timing.writeRecovery)
 
-            # RI disabled
-            RI.set_value(value=0)
 
-            # RI_CLK disabled
-            # RI_CLK.set_value(value=0)
+    def _sweep(self, *, addresses: Union[range, Set[int]]) -> Iterator[int]:
+        """Latches each of the given addresses in the address shifter, yielding
+        each one once it is latched. Large sets are visited in De Bruijn
+        order at one shifter clock per address, small ones are shifted in
+        whole in ascending order, whichever needs fewer clocks.
+
+        :param addresses: Addresses to visit (type range or Set[int]).
+        :return: Iterator over the latched addresses (type Iterator[int]).
+        """
+
+        remaining: int = len(addresses)
+        walk = DeBruijnWalk(address_bits=self.address_width, chain_bits=self.addr_shifter.shifterWidth)
+
+        if remaining * walk.chain_bits < len(walk):
+            for address in sorted(addresses):
+                self.addr_shifter.shift_word(word=address)
+                yield address
+            return
 
+        self.addr_shifter.shift_word(word=walk.initial_chain)
+
+        for address, next_bit in walk:
+            if address in addresses:
+                yield address
+                remaining -= 1
+                if not remaining:
+                    return
+            self.addr_shifter.step(bit=next_bit)
+
+
+    def read_word(self, *, address: int) -> int:
+        """Reads one word from RAM.
+        Example address: 0x3e01
+        Example return data: 0x340024
+
+        :param address: RAM address (type integer).
+        :return: Data word from RAM (type integer).
+        """
+
+        with self._operation("read_word") as op:
+            op.words = 1
+            assert 0 <= address < 1 << self.address_width, f"address {address:#x} out of range"
+
+            if self.mirror is not None:
+                word: Optional[int] = self.mirror.cached(address=address)
+                if word is not None:
+                    return word
+
+            # RI disabled
+            self.W_Pins[0].write(0)
 
             # Set address
-            self.addr_shifter.shift(shiftHex=Hex(hexString=hex_address))
+            self.addr_shifter.shift_word(word=address)
 
-            time.sleep(.05)
+            word = self._read_latched()
 
-            # Latch the RAM data in 74HC165
-            LD.trigger(transition="0")
+            if self.mirror is not None:
+                self.mirror.set(address=address, word=word)
+            return word
+
+
+    def write_word(self, *, address: int, value: int) -> None:
+        """Writes one word to RAM.
+        Example address: 0x3e01
+        Example value: 0x3400aa
 
-            time.sleep(.05)
+        :param address: RAM address (type integer).
+        :param value: Data word (type integer).
+        :return: None.
+        """
+
+        with self._operation("write_word") as op:
+            op.words = 1
+            assert 0 <= address < 1 << self.address_width, f"address {address:#x} out of range"
+            assert 0 <= value < 1 << self.data_width, f"word {value:#x} wider than {self.data_width} bits"
+
+            if self.mirror is None or not self.mirror.holds(address=address, word=value):
+                # Shifting address & data in lock-step
+                load_together(loads=[(self.addr_shifter, address), (self.data_shifter, value)])
+                latch_together(shifters=[self.addr_shifter, self.data_shifter])
+
+                # Writing
+                self._write_latched()
 
-            # Shifting out and reading 3 bytes of data
-            data_bin_string = "0b"
+                if self.mirror is not None:
+                    self.mirror.set(address=address, word=value)
 
-            data_bin_string += ("0", "1")[SER_DATA.read_value()]
+            self._record_written(words=[(address, value)])
 
-            for _ in range(23):
-                R_CLK.trigger(transition="1")
-                time.sleep(.05)
-                data_bin_string += ("0", "1")[SER_DATA.read_value()]
-                time.sleep(.05)
 
-            #logger.info(colored(f"address read: {hex_address}", "yellow"))
-            return bin_to_hex(bin_data=data_bin_string)
+    def read_single_address(self, *, hex_address: str) -> str:
+        """Read single address from RAM.
+        Example hex_address: '0x3e01'
+        Example return data: '0x340024'
+
+        :param hex_address: Hexadecimal representation of address (type string).
+        :return: Data from RAM (type string).
+        """
+
+        try:
+            return f"0x{self.read_word(address=int(hex_address, 16)):06x}"
 
         except Exception as e:
             logger.info(e)
@@ -219,190 +292,880 @@ class RAM_Interface:
         :return: None.
         """
 
+        try:
+            self.write_word(address=int(hex_address, 16), value=int(hex_data, 16))
+
+            #logger.info(colored(f"data written: {hex_address}", "green"))
+
+        except Exception as e:
+            logger.error(e)
+
+
+    def _write_pipelined(
+        self,
+        *,
+        words: List[Tuple[int, int]],
+        progress: Optional[Progress]=None,
+    ) -> None:
+        """Writes (address, data) pairs, overlapping each write strobe with
+        the shifting of the next word. The 74HC595 outputs hold word N while
+        word N+1 goes into the shift stages, and are latched only once the
+        strobe of word N has finished.
+
+        :param words: Address and data word pairs (type List[Tuple[int, int]]).
+        :return: None.
+        """
+
         RI, RI_CLK = self.W_Pins
+        timing: SRAMTiming = self.ram_timing
 
-        # Threads list
-        threads_list: list[
-            threading.Thread,  # Address shifter thread
-            threading.Thread,  # Data shifter thread
-        ] = []
+        if not words:
+            return
 
-        try:
-            # Populating threads list
-            for inx in range(2):
-                threads_list.append(threading
-                    .Thread(
-                        target=(
-                            self.addr_shifter.shift, self.data_shifter.shift
-                        )[inx],
-                        kwargs={
-                            "shiftHex": Hex(
-                                hexString=(hex_address, hex_data)[inx]
-                            )
-                        },
-                        name=f"{'address_shifter_thread' if not inx else 'data_shifter_thread'}: {__name__}",
-                    )
-                )
+        address, word = words[0]
+        load_together(loads=[(self.addr_shifter, address), (self.data_shifter, word)])
 
-            # Thread execution for shifting data & address parallelly
-            for c in range(2):
-                for thread in threads_list:
-                    thread.start() if not c else thread.join()
+        for inx in range(len(words)):
+            latch_together(shifters=[self.addr_shifter, self.data_shifter])
 
-            # Writing
-            time.sleep(.05)
-            RI.set_value(value=1)
-            time.sleep(.05)
-            RI_CLK.trigger(transition="1")
-            time.sleep(.05)
-            RI.set_value(value=0)
-            time.sleep(.05)
+            self.backend.delay(timing.addressSetup)
+            RI.write(1)
+            self.backend.delay(timing.dataSetup)
+            RI_CLK.write(1)
+            strobe_end: int = self.backend.clock_ns() + round(timing.writePulseWidth * 1e9)
 
-            #logger.info(colored(f"data written: {hex_address}", "green"))
+            # Next word into the shift stages while the strobe is high
+            if inx + 1 < len(words):
+                address, word = words[inx + 1]
+                load_together(loads=[(self.addr_shifter, address), (self.data_shifter, word)])
 
-        except Exception as e:
-            logger.error(e)
+            self.backend.delay_until(strobe_end)
+            RI_CLK.write(0)
+            self.backend.delay(timing.dataHold)
+            RI.write(0)
+            self.backend.delay(timing.writeRecovery)
 
+            if progress is not None:
+                progress(1)
 
-    @dump_intel_hexfile_pbar
-    def dump_intel_hexfile(
+
+    def read_words(
         self,
         *,
-        record_list: List[HexRecord],
-        progress_bar: Union[ContextManager, None]=None,
-    ) -> Dict[str, str]:
-        """Writes the machine language in intel hex file to RAM.
+        addresses: List[int],
+        use_mirror: bool=True,
+        progress: Optional[Progress]=None,
+    ) -> List[int]:
+        """Reads several addresses on one timeline, see `_read_pipelined`.
+        Addresses the mirror can serve are not read from hardware unless
+        `use_mirror` is False.
+        Example addresses: [0x3e01, 0x0015]
+        Example return data: [0x340024, 0x6a2821]
+
+        :param addresses: RAM addresses (type List[int]).
+        :param use_mirror: Serve reads from the mirror when it is trusted (type bool).
+        :return: Data words in the order of the addresses (type List[int]).
+        """
+
+        with self._operation("read_words") as op:
+            op.words = len(addresses)
+            words: List[Optional[int]] = [None] * len(addresses)
+
+            if self.mirror is not None and use_mirror:
+                for inx, address in enumerate(addresses):
+                    words[inx] = self.mirror.cached(address=address)
+                    if words[inx] is not None and progress is not None:
+                        progress(1)
+
+            missing: List[int] = [inx for inx, word in enumerate(words) if word is None]
+            read_words: List[int] = self._read_pipelined(
+                addresses=[addresses[inx] for inx in missing], progress=progress
+            )
+
+            for inx, word in zip(missing, read_words):
+                words[inx] = word
+                if self.mirror is not None:
+                    self.mirror.set(address=addresses[inx], word=word)
 
-        :param record_list: A list of HexRecord objects from the ihex file (type List[HexRecord]).
-        :return: Returns back dictionary containing address and corresponding checksum value mappings (type Dict[str:str]).
+            return words
+
+
+    def read_batch(
+        self,
+        *,
+        hex_addresses: List[str],
+        use_mirror: bool=True,
+        progress: Optional[Progress]=None,
+    ) -> List[str]:
+        """String form of `read_words`.
+        Example hex_addresses: ['0x3e01', '0x0015']
+        Example return data: ['0x340024', '0x6a2821']
+
+        :param hex_addresses: Hexadecimal representation of addresses (type List[str]).
+        :param use_mirror: Serve reads from the mirror when it is trusted (type bool).
+        :return: Data from RAM in the order of the addresses (type List[str]).
         """
 
-        # Address and corresponding data checksums for verification
-        address_checksum_mappings = {}
+        words: List[int] = self.read_words(
+            addresses=[int(hex_address, 16) for hex_address in hex_addresses],
+            use_mirror=use_mirror,
+            progress=progress,
+        )
+        return [f"0x{word:06x}" for word in words]
 
-        for ihex_record in record_list:
-            # Record details
-            # byte_count = ihex_record.byte_count()
-            addr_field: str = ihex_record.addr_field
-            # record_type = ihex_record.record_type()
-            data_field: str = ihex_record.data_field
-            checksum: str = ihex_record.checksum_field
 
-            self.write_single_address(hex_address=addr_field, hex_data=data_field)
-            address_checksum_mappings[addr_field] = checksum
-            time.sleep(.05)
+    def _read_pipelined(
+        self,
+        *,
+        addresses: List[int],
+        progress: Optional[Progress]=None,
+    ) -> List[int]:
+        """Reads addresses from hardware on one timeline, see `_read_stream`.
 
-            progress_bar.update(1)
+        :param addresses: RAM addresses (type List[int]).
+        :return: Data words in the order of the addresses (type List[int]).
+        """
 
-        logger.info(colored("INTEL HEX FILE DUMP SUCCESSFUL", "blue"))
-        return address_checksum_mappings
+        return list(self._read_stream(addresses=addresses, progress=progress))
+
+
+    def _read_stream(
+        self,
+        *,
+        addresses: Iterable[int],
+        progress: Optional[Progress]=None,
+    ) -> Iterator[int]:
+        """Reads addresses from hardware on one timeline, yielding each word as
+        it is read. While the 74HC165 chain is clocked out for one address,
+        the next address is shifted into the 74HC595 address chain on the
+        same edges (the two use disjoint pins), and latched once the read has
+        finished. Only one address is looked ahead, so `addresses` may be a
+        lazy iterator.
+
+        :param addresses: RAM addresses (type Iterable[int]).
+        :return: Iterator of data words in the order of the addresses (type Iterator[int]).
+        """
+
+        RI, RI_CLK = self.W_Pins
+        LD, R_CLK, SER_DATA = self.R_Pins
+        A_SER, A_SRCLK = self.addr_shifter.shifterDigitalPins[0:2]
+        addr_timing: SIPOTiming = self.addr_shifter.shifterTiming
+        reader: PISOTiming = self.reader_timing
+
+        clk_mask: int = 1 << R_CLK.pinNo
+        ser_mask: int = 1 << A_SER.pinNo
+        srclk_mask: int = 1 << A_SRCLK.pinNo
+        clock_high: float = max(reader.clkPulseWidth, addr_timing.srclkPulseWidth, addr_timing.serHold)
+        clock_low: float = max(reader.clkToOutput, addr_timing.serSetup)
+        write_masks = self.backend.write_masks
+        delay = self.backend.delay
+
+        remaining: Iterator[int] = iter(addresses)
+        current: Optional[int] = next(remaining, None)
+
+        if current is None:
+            return
+
+        RI.write(0)
+        self.addr_shifter.shift_word(word=current)
+
+        while current is not None:
+            following: Optional[int] = next(remaining, None)
+            pending: int = following if following is not None else 0
+            pending_bits: int = self.addr_shifter.shifterWidth if following is not None else 0
+
+            self.backend.begin()
+            delay(self.ram_timing.accessTime)
+
+            # Latch the RAM data in 74HC165
+            LD.pulse(0, reader.ldPulseWidth)
+            delay(reader.ldToClk)
+
+            if pending_bits:
+                write_masks(ser_mask, 0) if pending & 1 else write_masks(0, ser_mask)
+
+            word: int = SER_DATA.read()
+
+            for _ in range(self.data_width - 1):
+                shifting: bool = pending_bits > 0
+                write_masks(clk_mask | (srclk_mask if shifting else 0), 0)
+                delay(clock_high)
+
+                clear_mask: int = clk_mask | (srclk_mask if shifting else 0)
+                set_mask = 0
+                if shifting:
+                    pending >>= 1
+                    pending_bits -= 1
+                    if pending & 1 and pending_bits:
+                        set_mask = ser_mask
+                    else:
+                        clear_mask |= ser_mask
+                write_masks(set_mask, clear_mask)
+
+                delay(clock_low)
+                word = (word << 1) | SER_DATA.read()
+                delay(reader.clkPulseWidth)
+
+            if following is not None:
+                self.addr_shifter.latch()
+                # Shifted here on the reader clock, not through load_together
+                if self.metrics is not None:
+                    name: str = self.addr_shifter.shifterName
+                    self.metrics.shifted[name] = self.metrics.shifted.get(name, 0) + 1
+
+            if progress is not None:
+                progress(1)
+
+            yield word
+            current = following
+
+
+    def dump_intel_hexfile(
+        self,
+        *,
+        record_list: Union[List[HexRecord], MemoryImage],
+        pipelined: bool=False,
+        journal: Optional[FlashJournal]=None,
+        progress: Optional[Progress]=None,
+    ) -> MemoryImage:
+        """Writes the machine language in intel hex file to RAM.
+        The words per second achieved are kept in `write_throughput`.
+        With a journal, progress is checkpointed every `journal.every` words
+        and a flash of the same image interrupted earlier is resumed.
+
+        :param record_list: A list of HexRecord objects from the ihex file, or a memory image (type List[HexRecord] or MemoryImage).
+        :param pipelined: Overlap each write strobe with shifting the next word (type bool).
+        :param journal: Progress journal of the board (type FlashJournal).
+        :return: The image written, to pass on to verify_checksum (type MemoryImage).
+        """
+
+        with self._operation("dump_intel_hexfile") as op:
+            image: MemoryImage = MemoryImage.coerce(record_list)
+            items: List[Tuple[int, int]] = list(image.items())
+            start: int = self.backend.clock_ns()
+            op.words = len(items)
+
+            done = 0
+            if journal is not None:
+                done = journal.start(image_hash=image_hash(image=image), words=len(items))
+                if done:
+                    logger.info(f"Resuming flash after {done} of {len(items)} words")
+                    if progress is not None:
+                        progress(done)
+
+            step: int = journal.every if journal is not None else max(len(items), 1)
+
+            # Closed but kept on any error, so the next flash of the image resumes
+            try:
+                for offset in range(done, len(items), step):
+                    chunk: List[Tuple[int, int]] = items[offset:offset + step]
+
+                    if pipelined:
+                        words: List[Tuple[int, int]] = [
+                            (address, word) for address, word in chunk
+                            if self.mirror is None or not self.mirror.holds(address=address, word=word)
+                        ]
+                        if progress is not None:
+                            progress(len(chunk) - len(words))
+
+                        self.W_Pins[0].write(0)
+                        self._write_pipelined(words=words, progress=progress)
+
+                        if self.mirror is not None:
+                            for address, word in words:
+                                self.mirror.set(address=address, word=word)
+                        self._record_written(words=chunk)
+
+                    else:
+                        for address, word in chunk:
+                            self.write_word(address=address, value=word)
+                            if progress is not None:
+                                progress(1)
+
+                    if journal is not None:
+                        journal.confirm(count=offset + len(chunk))
+            finally:
+                if journal is not None:
+                    journal.close()
+
+            if journal is not None:
+                journal.finish()
+
+            # Words a resumed flash skipped were written by the interrupted one
+            self._record_written(words=items[:done])
+            if self.manifest is not None:
+                self.manifest.image_hash = image_hash(image=image)
+
+            op.words -= done
+            elapsed: int = self.backend.clock_ns() - start
+            self.write_throughput = (len(items) - done) / (elapsed / 1e9) if elapsed else 0.0
+
+            from termcolor import colored
+            logger.info(colored("INTEL HEX FILE DUMP SUCCESSFUL", "blue"))
+            logger.info(f"Write throughput: {self.write_throughput:.1f} words/s")
+            return image
 
 
-    @bulk_read_status_pbar
     def bulk_read(
         self,
         *,
         lower_addr: str,
         upper_addr: str,
-        progress_bar: Union[ContextManager, None]=None,
+        image: Optional[MemoryImage]=None,
+        progress: Optional[Progress]=None,
     ) -> str:
         """Prints the RAM/Memory contents in formatted manner for given address range.
+        Only the given addresses are read; the rest of the first and last rows
+        is left blank. Words already in `image` are not read again; words
+        read are added to it. Use `hexdump` to stream large ranges instead.
         Example lower_addr: '0x0001'
         Example upper_addr: '0x000a'
 
         :param lower_addr: The starting address value in hex (type string).
         :param upper_addr: The end address value in hex (type string).
+        :param image: Image to render from and read into (type MemoryImage).
         :return: Returns a string representating RAM/Memory contents in formatted manner (type string)
         """
 
-        desired_range = range(
-            Hex(hexString=lower_addr).hex_to_dec, Hex(hexString=upper_addr).hex_to_dec + 1
+        lower: int = int(lower_addr, 16)
+        upper: int = int(upper_addr, 16)
+
+        if image is None:
+            words: Iterable[int] = self.read_range(lower=lower, upper=upper, progress=progress)
+        else:
+            self.read_image(lower_addr=lower_addr, upper_addr=upper_addr, image=image, progress=progress)
+            words = (image[address] for address in range(lower, upper + 1))
+
+        out = io.StringIO()
+        render_hexdump(start=lower, words=words, out=out, color="red")
+
+        logger.info("BULK READ SUCCESSFUL")
+        return out.getvalue().rstrip("\n")
+
+
+    def read_range(
+        self,
+        *,
+        lower: int,
+        upper: int,
+        use_mirror: bool=True,
+        progress: Optional[Progress]=None,
+    ) -> Iterator[int]:
+        """Reads an address range, both ends inclusive, yielding each word as
+        it is read. Stopping the iteration early stops reading. Like
+        `read_words`, words the mirror can serve are not read from hardware
+        unless `use_mirror` is False; each run of the others is streamed on
+        one timeline.
+        Example lower: 0x0010
+        Example upper: 0x001f
+
+        :param lower: First address (type integer).
+        :param upper: Last address (type integer).
+        :param use_mirror: Serve words from a trusted mirror (type bool).
+        :return: Iterator of data words in ascending address order (type Iterator[int]).
+        """
+
+        assert 0 <= lower <= upper < 1 << self.address_width, f"bad address range {lower:#x} - {upper:#x}"
+
+        mirror: Optional[RAMMirror] = self.mirror if use_mirror and self.mirror is not None and self.mirror.trust else None
+        address: int = lower
+
+        with self._operation("read_range") as op:
+            try:
+                while address <= upper:
+                    if mirror is not None:
+                        word: Optional[int] = mirror.cached(address=address)
+                        if word is not None:
+                            if progress is not None:
+                                progress(1)
+                            address += 1
+                            with op.paused():
+                                yield word
+                            continue
+
+                    # Run of addresses up to the next one the mirror holds
+                    end: int = upper if mirror is None else address
+                    while end < upper and mirror.get(address=end + 1) is None:
+                        end += 1
+
+                    for word in self._read_stream(addresses=range(address, end + 1), progress=progress):
+                        if self.mirror is not None:
+                            self.mirror.set(address=address, word=word)
+                        address += 1
+                        with op.paused():
+                            yield word
+            finally:
+                op.words = address - lower
+
+
+    def hexdump(
+        self,
+        *,
+        out: TextIO,
+        lower_addr: str="0x0000",
+        upper_addr: str="0x7fff",
+        color: Optional[str]=None,
+    ) -> int:
+        """Streams an address range as hexdump rows to a file or stdout, reading
+        each word once and holding at most one row in memory.
+
+        :param out: Text stream to write to (type TextIO).
+        :param lower_addr: The starting address value in hex (type string).
+        :param upper_addr: The end address value in hex (type string).
+        :param color: termcolor color of the words, plain if not given (type string).
+        :return: Number of words written (type integer).
+        """
+
+        lower: int = int(lower_addr, 16)
+        count: int = render_hexdump(
+            start=lower, words=self.read_range(lower=lower, upper=int(upper_addr, 16)), out=out, color=color
         )
 
-        l, u = RAM_Interface._get_addr_range(start_addr=lower_addr, end_addr=upper_addr)
-        # print(l, u)
-        l_dec: int = Hex(hexString=l).hex_to_dec
-        u_dec: int = Hex(hexString=u).hex_to_dec
+        logger.info("HEXDUMP SUCCESSFUL")
+        return count
+
 
-        out_string: str = l[2:] + " " + self.color_inrange(counter=l_dec, des_range=desired_range) + " "
-        l_dec += 1
-        progress_bar.update(1)
+    def read_image(
+        self,
+        *,
+        lower_addr: str="0x0000",
+        upper_addr: str="0x7fff",
+        image: Optional[MemoryImage]=None,
+        progress: Optional[Progress]=None,
+    ) -> MemoryImage:
+        """Reads an address range into a memory image. Addresses the image
+        already holds are skipped.
+        Example lower_addr: '0x0000'
+        Example upper_addr: '0x00ff'
 
-        while l_dec <= u_dec:
-            if l_dec % 8 == 0:
-                out_string += "\n" + dec_to_hex(dec=l_dec)[2:] + " " \
-                    + self.color_inrange(counter=l_dec, des_range=desired_range) + " "
-            else:
-                out_string += self.color_inrange(counter=l_dec, des_range=desired_range) + " "
-            l_dec += 1
+        :param lower_addr: The starting address value in hex (type string).
+        :param upper_addr: The end address value in hex (type string).
+        :param image: Image to read into, a new one if not given (type MemoryImage).
+        :return: The image holding the range (type MemoryImage).
+        """
 
-            progress_bar.update(1)
+        image = MemoryImage() if image is None else image
+        wanted: List[int] = [
+            address for address in range(Hex(hexString=lower_addr).hex_to_dec, Hex(hexString=upper_addr).hex_to_dec + 1)
+            if address not in image
+        ]
 
-        logger.info("BULK READ SUCCESSFUL")
-        return out_string
+        if progress is not None:
+            progress(Hex(hexString=upper_addr).hex_to_dec - Hex(hexString=lower_addr).hex_to_dec + 1 - len(wanted))
+
+        image.update(zip(wanted, self.read_words(addresses=wanted, progress=progress)))
+        return image
 
 
-    def color_inrange(self, *, counter: int, des_range: range) -> str:
+    def color_inrange(self, *, counter: int, des_range: range, data: Optional[str]=None) -> str:
         """Colors the string in red.
 
         :param counter: An integer value (type int).
         :param des_range: An range object (type range).
+        :param data: Data already read from the address, read from RAM if not given (type string).
         :return: Colored data value from RAM if the corresponding address in desired address space.
         """
 
-        hex_addr: str = dec_to_hex(dec=counter)
-        data: str = self.read_single_address(hex_address=hex_addr)
-        return colored(data, "red") if counter in des_range else data
+        if data is None:
+            data = f"0x{self.read_words(addresses=[counter])[0]:06x}"
+        if counter not in des_range:
+            return data
+
+        from termcolor import colored
+        return colored(data, "red")
+
+
+    def _blink_notifier(self) -> None:
+        # Blink the checksum verification led 4 times
+        for x in range(1, 5):
+            self.checksum_notifier.write(x % 2)
+            self.backend.delay(self.blink_period)
 
 
-    @checksum_status_pbar
     def verify_checksum(
         self,
-        addr_checksum_mappings: Dict[str, str],
+        addr_checksum_mappings: Union[Dict[str, str], MemoryImage],
         byte_count: Optional[str]="0x03",
         record_type: Optional[str]="0x00",
-        progress_bar: Union[ContextManager, None]=None,
+        progress: Optional[Progress]=None,
     ) -> str:
-        """Verifies the checksum for addresses passed.
+        """Verifies the checksum for addresses passed. A memory image is
+        verified in bulk by `verify_image`.
 
-        :param addr_checksum_mappings: A dictionary containing address and corressponding checksum to be verified (type Dict[str:str]).
+        :param addr_checksum_mappings: A dictionary containing address and corressponding checksum to be verified, or the memory image written (type Dict[str:str] or MemoryImage).
         :param byte_count: Byte count of data in hex (type string).
         :param record_type: Record type in hex (type string).
         :retrun: Returns a string having indivitual address checksum verification status (type string).
         """
 
-        checksum_verified_status = []
-        checksum_status_log = ""
-
-        for addr, checksum in addr_checksum_mappings.items():
-            data: str = self.read_single_address(hex_address=addr)
-            read_record_without_checksum_string: str = "0x" + byte_count[2:] + addr[2:] \
-                + record_type[2:] + data[2:]
+        if isinstance(addr_checksum_mappings, MemoryImage):
+            mismatch, _ = self.verify_image(image=addr_checksum_mappings, progress=progress)
+            failed: Set[int] = set(mismatch)
+            checksum_verified_status = [not failed]
+            checksum_status_log = "".join(
+                f"Checksum {('verified', 'verification failed')[address in failed]} for address: 0x{address:04x}\n"
+                for address in addr_checksum_mappings
+            )
+        else:
+            checksum_verified_status = []
+            checksum_status_log = ""
 
-            read_record_checksum: str = (
-                # Converting to Hex instance
-                Hex(hexString=read_record_without_checksum_string)
-                # Checksum computation
-                .checksum
+            words: List[str] = self.read_batch(
+                hex_addresses=list(addr_checksum_mappings), use_mirror=False, progress=progress
             )
 
-            checksum_verified: bool = checksum == read_record_checksum
-            checksum_verified_status.append(checksum_verified)
+            for (addr, checksum), data in zip(addr_checksum_mappings.items(), words):
+                read_record_without_checksum_string: str = "0x" + byte_count[2:] + addr[2:] \
+                    + record_type[2:] + data[2:]
 
-            checksum_status_log += f"Checksum {('verification failed', 'verified')[checksum_verified]} for address: {addr}\n"
+                read_record_checksum: str = (
+                    # Converting to Hex instance
+                    Hex(hexString=read_record_without_checksum_string)
+                    # Checksum computation
+                    .checksum
+                )
+
+                checksum_verified: bool = checksum == read_record_checksum
+                checksum_verified_status.append(checksum_verified)
 
-            progress_bar.update(1)
+                checksum_status_log += f"Checksum {('verification failed', 'verified')[checksum_verified]} for address: {addr}\n"
 
         if all(checksum_verified_status):
-            # Blink the checksum verification led 4 times
-            for x in range(1, 5):
-               self.checksum_notifier.set_value(value=x % 2)
-               time.sleep(.5)
+            self._blink_notifier()
 
         logger.info("CHECKSUM VERIFICATION DONE")
         return checksum_status_log
 
 
+    def verify_image(
+        self,
+        *,
+        image: MemoryImage,
+        by_checksum: bool=False,
+        progress: Optional[Progress]=None,
+    ) -> Tuple[array, str]:
+        """Reads back every word of an image and compares the whole image at
+        once, see `image_compare.mismatches`.
+
+        :param image: Image that was written (type MemoryImage).
+        :param by_checksum: Compare record checksums instead of words (type bool).
+        :return: Mismatching addresses and the rendered diff of them (type Tuple[array('I'), str]).
+        """
+
+        with self._operation("verify_image") as op:
+            op.words = len(image)
+            addresses: List[int] = list(image)
+            actual = MemoryImage(words=image.size)
+            actual.update(zip(addresses, self._read_pipelined(addresses=addresses, progress=progress)))
+
+            if self.mirror is not None:
+                for address, word in actual.items():
+                    self.mirror.set(address=address, word=word)
+
+            mismatch: array = mismatches(expected=image, actual=actual, by_checksum=by_checksum)
+            diff: str = render_diff(expected=image, actual=actual, addresses=mismatch)
+
+            logger.info(f"IMAGE VERIFIED: {len(mismatch)} of {len(addresses)} words differ")
+            return mismatch, diff
+
+
+    def snapshot(
+        self,
+        *,
+        snapshot: Snapshot,
+        progress: Optional[Progress]=None,
+    ) -> int:
+        """Reads the blocks of the snapshot not read yet, committing each block
+        to disk as it completes. Interrupting loses at most the block being
+        read; calling again resumes from there. Words always come from the
+        board, never from the mirror.
+
+        :param snapshot: Open snapshot files (type Snapshot).
+        :return: Number of blocks read (type integer).
+        """
+
+        with self._operation("snapshot") as op:
+            pending: List[int] = snapshot.pending_blocks()
+            op.words = len(pending) * SNAPSHOT_BLOCK_WORDS
+
+            if progress is not None:
+                progress((snapshot.blocks - len(pending)) * SNAPSHOT_BLOCK_WORDS)
+
+            for block in pending:
+                lower: int = block * SNAPSHOT_BLOCK_WORDS
+                snapshot.write_block(
+                    block=block,
+                    words=self.read_range(
+                        lower=lower, upper=lower + SNAPSHOT_BLOCK_WORDS - 1, use_mirror=False, progress=progress
+                    ),
+                )
+
+            logger.info(f"SNAPSHOT SUCCESSFUL: {len(pending)} blocks read, {snapshot}")
+            return len(pending)
+
+
+    def verify_and_repair(self, *, image: MemoryImage, retries: int=3, blink: bool=False) -> RepairResult:
+        """Verifies an image, then re-writes and re-verifies only the words that
+        failed, each up to `retries` times. With `blink` the checksum LED
+        blinks if every word ends up correct, which takes 4 blink periods.
+
+        :param image: Image that was written (type MemoryImage).
+        :param retries: Re-writes allowed per failing word (type integer).
+        :param blink: Blink the checksum LED on success (type bool).
+        :return: Addresses repaired and still failing (type RepairResult).
+        """
+
+        with self._operation("verify_and_repair") as op:
+            op.words = len(image)
+            assert retries >= 0, "`retries` should not be negative."
+
+            mismatch, diff = self.verify_image(image=image)
+            failing: List[int] = list(mismatch)
+            first_failures: int = len(failing)
+            attempts: Dict[int, int] = {}
+
+            for _ in range(retries):
+                if not failing:
+                    break
+
+                for address in failing:
+                    # The mirror must not let the re-write be skipped
+                    if self.mirror is not None:
+                        self.mirror.invalidate(lower=address, upper=address)
+                    self.write_word(address=address, value=image[address])
+                    attempts[address] = attempts.get(address, 0) + 1
+
+                if self.metrics is not None:
+                    self.metrics.retries += len(failing)
+
+                retry = MemoryImage(words=image.size)
+                retry.update((address, image[address]) for address in failing)
+                mismatch, diff = self.verify_image(image=retry)
+                failing = list(mismatch)
+
+            still_failing: Set[int] = set(failing)
+            result = RepairResult(
+                verified=len(image) - first_failures,
+                repaired=[address for address in attempts if address not in still_failing],
+                failing=failing,
+                attempts=attempts,
+                diff=diff if failing else "",
+            )
+
+            if result.ok and blink:
+                self._blink_notifier()
+
+            logger.info(f"VERIFY AND REPAIR DONE: {result}")
+            return result
+
+
+    def sweep_read(
+        self,
+        *,
+        lower_addr: str="0x0000",
+        upper_addr: str="0x7fff",
+        progress: Optional[Progress]=None,
+    ) -> Dict[str, str]:
+        """Reads an address range, visiting the addresses in De Bruijn order.
+        Example lower_addr: '0x0000'
+        Example upper_addr: '0x7fff'
+
+        :param lower_addr: The starting address value in hex (type string).
+        :param upper_addr: The end address value in hex (type string).
+        :return: Address to data mappings in ascending address order (type Dict[str:str]).
+        """
+
+        with self._operation("sweep_read") as op:
+            RI, RI_CLK = self.W_Pins
+            RI.write(0)
+
+            addresses = range(Hex(hexString=lower_addr).hex_to_dec, Hex(hexString=upper_addr).hex_to_dec + 1)
+            words: Dict[int, int] = {}
+            op.words = len(addresses)
+
+            for address in self._sweep(addresses=addresses):
+                words[address] = self._read_latched()
+                if self.mirror is not None:
+                    self.mirror.set(address=address, word=words[address])
+                if progress is not None:
+                    progress(1)
+
+            logger.info("SWEEP READ SUCCESSFUL")
+            return {dec_to_hex(dec=address): f"0x{words[address]:06x}" for address in addresses}
+
+
+    def sweep_fill(
+        self,
+        *,
+        hex_data: str,
+        lower_addr: str="0x0000",
+        upper_addr: str="0x7fff",
+        progress: Optional[Progress]=None,
+    ) -> None:
+        """Writes the same word to an address range. The data shifter is loaded
+        once and the addresses are visited in De Bruijn order, so each word
+        costs one address shifter clock and a write strobe.
+        Example hex_data: '0x000000'
+
+        :param hex_data: Hex representation of data to be written (type string).
+        :param lower_addr: The starting address value in hex (type string).
+        :param upper_addr: The end address value in hex (type string).
+        :return: None.
+        """
+
+        with self._operation("sweep_fill") as op:
+            addresses = range(Hex(hexString=lower_addr).hex_to_dec, Hex(hexString=upper_addr).hex_to_dec + 1)
+            op.words = len(addresses)
+
+            word: int = int(hex_data, 16)
+
+            self.data_shifter.shift_word(word=word)
+            for address in self._sweep(addresses=addresses):
+                self._write_latched()
+                if self.mirror is not None:
+                    self.mirror.set(address=address, word=word)
+                if progress is not None:
+                    progress(1)
+
+            self._record_written(words=((address, word) for address in addresses))
+
+            logger.info("SWEEP FILL SUCCESSFUL")
+
+
+    def sweep_dump_intel_hexfile(
+        self,
+        *,
+        record_list: Union[List[HexRecord], MemoryImage],
+        progress: Optional[Progress]=None,
+    ) -> MemoryImage:
+        """Writes the intel hex file to RAM, visiting the addresses in De Bruijn
+        order instead of record order. Only worth it for images of more than
+        about 2K words; smaller ones are written in ascending address order.
+
+        :param record_list: A list of HexRecord objects from the ihex file, or a memory image (type List[HexRecord] or MemoryImage).
+        :return: The image written (type MemoryImage).
+        """
+
+        with self._operation("sweep_dump_intel_hexfile") as op:
+            image: MemoryImage = MemoryImage.coerce(record_list)
+            op.words = len(image)
+
+            for address in self._sweep(addresses=set(image)):
+                self.data_shifter.shift_word(word=image[address])
+                self._write_latched()
+                if self.mirror is not None:
+                    self.mirror.set(address=address, word=image[address])
+                if progress is not None:
+                    progress(1)
+
+            self._record_written(words=image.items())
+            if self.manifest is not None:
+                self.manifest.image_hash = image_hash(image=image)
+
+            from termcolor import colored
+            logger.info(colored("INTEL HEX FILE SWEEP DUMP SUCCESSFUL", "blue"))
+            return image
+
+
+    def invalidate_mirror(self, *, lower_addr: str="0x0000", upper_addr: str="0x7fff") -> None:
+        """Forgets the mirrored words of an address range, e.g. after the PB224
+        CPU has run and may have written to it.
+
+        :param lower_addr: The starting address value in hex (type string).
+        :param upper_addr: The end address value in hex (type string).
+        :return: None.
+        """
+
+        if self.mirror is not None:
+            self.mirror.invalidate(
+                lower=Hex(hexString=lower_addr).hex_to_dec, upper=Hex(hexString=upper_addr).hex_to_dec
+            )
+
+
+    def refresh_mirror(self, *, lower_addr: str="0x0000", upper_addr: str="0x7fff") -> None:
+        """Re-reads an address range from hardware into the mirror.
+
+        :param lower_addr: The starting address value in hex (type string).
+        :param upper_addr: The end address value in hex (type string).
+        :return: None.
+        """
+
+        if self.mirror is None:
+            return
+
+        lower: int = Hex(hexString=lower_addr).hex_to_dec
+        upper: int = Hex(hexString=upper_addr).hex_to_dec
+
+        if (upper - lower + 1) * self.addr_shifter.shifterWidth >= 1 << self.address_width:
+            self.sweep_read(lower_addr=lower_addr, upper_addr=upper_addr)
+        else:
+            self.read_words(addresses=list(range(lower, upper + 1)), use_mirror=False)
+
+        logger.info(f"MIRROR REFRESHED: {lower_addr} - {upper_addr}")
+
+
+    def flash_differential(
+        self,
+        *,
+        record_list: Union[List[HexRecord], MemoryImage],
+        manifest: ImageManifest,
+        pipelined: bool=True,
+        journal: Optional[FlashJournal]=None,
+        progress: Optional[Progress]=None,
+    ) -> MemoryImage:
+        """Writes only the words of the intel hex file that differ from the
+        board's manifest, then records the new contents in the manifest.
+
+        :param record_list: A list of HexRecord objects from the ihex file, or a memory image (type List[HexRecord] or MemoryImage).
+        :param manifest: Record of what the board holds (type ImageManifest).
+        :param pipelined: Use the pipelined write mode (type bool).
+        :param journal: Progress journal of the board, see `dump_intel_hexfile` (type FlashJournal).
+        :return: The whole image, to pass on to verify_checksum (type MemoryImage).
+        """
+
+        with self._operation("flash_differential") as op:
+            image: MemoryImage = MemoryImage.coerce(record_list)
+
+            changed: List[Tuple[int, int]] = manifest.diff(image=image)
+            op.words = len(changed)
+
+            to_write = MemoryImage()
+            to_write.update(changed)
+            if changed:
+                self.dump_intel_hexfile(record_list=to_write, pipelined=pipelined, journal=journal, progress=progress)
+
+            manifest.record(words=changed)
+            manifest.image_hash = image_hash(image=image)
+            manifest.save()
+
+            logger.info(
+                f"DIFFERENTIAL FLASH: wrote {len(changed)} of {len(image)} words, "
+                f"saved {len(image) - len(changed)} writes"
+            )
+            return image
+
+
+    def revalidate_manifest(self, *, manifest: ImageManifest) -> int:
+        """Reads back every address recorded in the manifest, e.g. after a power
+        cycle, and stores what the board actually holds.
+
+        :param manifest: Record of what the board holds (type ImageManifest).
+        :return: Number of addresses that did not match the manifest (type integer).
+        """
+
+        with self._operation("revalidate_manifest") as op:
+            addresses: List[int] = manifest.known_addresses()
+            op.words = len(addresses)
+            actual: List[Tuple[int, int]] = list(zip(addresses, self.read_words(addresses=addresses, use_mirror=False)))
+            differed: int = sum(1 for address, word in actual if manifest.words[address] != word)
+
+            manifest.record(words=actual)
+            manifest.save()
+
+            logger.info(f"MANIFEST REVALIDATED: {differed} of {len(addresses)} words differed")
+            return differed
+
+
     def clear_addr_reg(self) -> None:
         """Clears the address shifter.
 
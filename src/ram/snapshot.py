@@ -0,0 +1,224 @@
+#!/usr/bin/python3
+
+# Module for resumable snapshots of the whole RAM
+#
+# A snapshot is two files: `<path>` holds a header and then the 32K words
+# as native uint32, memory-mapped while reading, and `<path>.progress` holds
+# one bit per block of 256 words. A block's bit is set and fsynced only
+# after its words have been flushed, so after Ctrl-C or a crash a new run
+# reads just the blocks whose bits are clear. Intel HEX is produced from the
+# files alone.
+#
+# The header holds a magic, the word count and the board id. An existing
+# file is only resumed if its header matches; anything else at the path is
+# left alone unless the caller asks for a restart.
+
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+
+from array import array
+from src.utilities.memory_image import MemoryImage
+from typing import Iterable, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+BLOCK_WORDS = 256
+
+MAGIC = b"PB224SNP"
+FORMAT = 1
+# magic, format, words, board id; padded to HEADER_BYTES
+HEADER = struct.Struct("<8sII32s")
+HEADER_BYTES = 64
+
+
+class SnapshotError(RuntimeError):
+    """Raised when the file at a snapshot path is not a snapshot of this board."""
+
+
+class Snapshot:
+    """Memory-mapped word file with a block progress bitmap."""
+
+    def __init__(
+        self,
+        *,
+        path: str,
+        words: int=32768,
+        board_id: Optional[str]=None,
+        restart: bool=False,
+    ) -> None:
+        """Opens the snapshot at `path`, creating it if there is none. An
+        existing snapshot is resumed only if it has the same word count and
+        board id; any other file raises SnapshotError unless `restart` is
+        True, which also forgets the progress of a matching snapshot.
+        Example path: 'ram_snapshot.bin'
+
+        :param path: Snapshot file (type string).
+        :param words: Words of the RAM (type integer).
+        :param board_id: Board the snapshot is taken on, that of the file if None (type string).
+        :param restart: Overwrite a mismatching file and read every block again (type bool).
+        """
+
+        assert words % BLOCK_WORDS == 0, f"`words` should be a multiple of {BLOCK_WORDS}."
+
+        self.path = path
+        self.size = words
+        self.blocks = words // BLOCK_WORDS
+        progress_bytes: int = (self.blocks + 7) // 8
+
+        create: bool = not os.path.exists(path)
+        if not create:
+            problem: Optional[str] = self._mismatch(board_id=board_id)
+            if problem is not None:
+                if not restart:
+                    raise SnapshotError(f"`{path}` {problem}, pass restart to overwrite it")
+                logger.warning(f"Overwriting `{path}`: {problem}")
+                create = True
+
+        if create:
+            with open(file=path, mode="wb") as new_file:
+                new_file.write(HEADER.pack(MAGIC, FORMAT, words, (board_id or "").encode()).ljust(HEADER_BYTES, b"\0"))
+                new_file.truncate(HEADER_BYTES + 4 * words)
+
+        # A missing or damaged progress file only costs reading again
+        if create or restart or not (
+            os.path.exists(self.progress_path) and os.path.getsize(self.progress_path) == progress_bytes
+        ):
+            with open(file=self.progress_path, mode="wb") as new_file:
+                new_file.truncate(progress_bytes)
+
+        self._file = open(file=path, mode="r+b")
+        self._map = mmap.mmap(self._file.fileno(), HEADER_BYTES + 4 * words)
+        self.board_id: str = HEADER.unpack_from(self._map)[3].rstrip(b"\0").decode()
+        self.words = memoryview(self._map)[HEADER_BYTES:].cast("I")
+
+        self._progress = open(file=self.progress_path, mode="r+b")
+        self.done = bytearray(self._progress.read())
+
+
+    def _mismatch(self, *, board_id: Optional[str]) -> Optional[str]:
+        """Why the existing file at `path` cannot be resumed, None if it can."""
+
+        with open(file=self.path, mode="rb") as old_file:
+            header: bytes = old_file.read(HEADER.size)
+
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            return "is not a pb224 snapshot"
+
+        _, file_format, words, file_board = HEADER.unpack(header)
+        file_board = file_board.rstrip(b"\0").decode()
+
+        if file_format != FORMAT:
+            return f"has snapshot format {file_format}, expected {FORMAT}"
+        if words != self.size or os.path.getsize(self.path) != HEADER_BYTES + 4 * words:
+            return f"holds {words} words, expected {self.size}"
+        if board_id is not None and file_board != board_id:
+            return f"was taken on board `{file_board}`, not `{board_id}`"
+        return None
+
+
+    @property
+    def progress_path(self) -> str:
+        return self.path + ".progress"
+
+
+    def __enter__(self) -> Snapshot:
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def is_done(self, block: int) -> bool:
+        return bool(self.done[block >> 3] & (1 << (block & 7)))
+
+
+    def pending_blocks(self) -> List[int]:
+        """Blocks not read yet.
+
+        :return: Ascending block numbers (type List[int]).
+        """
+
+        return [block for block in range(self.blocks) if not self.is_done(block)]
+
+
+    @property
+    def complete(self) -> bool:
+        return not self.pending_blocks()
+
+
+    def write_block(self, *, block: int, words: Iterable[int]) -> None:
+        """Stores the words of a block and marks it done once they are on disk.
+
+        :param block: Block number (type integer).
+        :param words: The block's BLOCK_WORDS words (type Iterable[int]).
+        :return: None.
+        """
+
+        base: int = block * BLOCK_WORDS
+        count = 0
+        for count, word in enumerate(words, start=1):
+            self.words[base + count - 1] = word
+        assert count == BLOCK_WORDS, f"block {block} got {count} of {BLOCK_WORDS} words"
+
+        self._map.flush()
+
+        self.done[block >> 3] |= 1 << (block & 7)
+        self._progress.seek(block >> 3)
+        self._progress.write(self.done[block >> 3:(block >> 3) + 1])
+        self._progress.flush()
+        os.fsync(self._progress.fileno())
+
+
+    def reset(self) -> None:
+        """Forgets all progress, so the next run reads every block.
+
+        :return: None.
+        """
+
+        self.done = bytearray(len(self.done))
+        self._progress.seek(0)
+        self._progress.write(self.done)
+        self._progress.flush()
+        os.fsync(self._progress.fileno())
+
+
+    def to_image(self) -> MemoryImage:
+        """Image of the words of the blocks read so far.
+
+        :return: image object (type MemoryImage).
+        """
+
+        image = MemoryImage(words=self.size)
+        for block in range(self.blocks):
+            if self.is_done(block):
+                base: int = block * BLOCK_WORDS
+                image.words[base:base + BLOCK_WORDS] = array("I", self.words[base:base + BLOCK_WORDS].tobytes())
+                image.valid[base >> 3:(base + BLOCK_WORDS) >> 3] = b"\xff" * (BLOCK_WORDS // 8)
+        return image
+
+
+    def close(self) -> None:
+        """Releases the memory map and the files.
+
+        :return: None.
+        """
+
+        self.words.release()
+        self._map.close()
+        self._file.close()
+        self._progress.close()
+
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(path={self.path}, '
+            f'blocks_done={self.blocks - len(self.pending_blocks())}/{self.blocks})'
+        )
@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+
+# Module for De Bruijn ordered address sweeps
+#
+# The address shifter already holds the previous address, so shifting in
+# one more bit gives a new one. Shifter.shift sends the LSB first, so the
+# new bit enters at the top of the chain and the rest move down:
+#   chain = (chain >> 1) | (bit << (chain_bits - 1))
+# Walking a binary De Bruijn sequence of order `address_bits` through the
+# chain latches every address exactly once at one SRCLK + RCLK per address,
+# instead of a full 16 clock shift. Chain stages above the RAM address
+# lines only delay the bit, so they just hold the next bits of the sequence.
+
+
+from __future__ import annotations
+
+from typing import Iterator, List, Tuple
+
+
+# MS62256A: 32K words, address lines A0-A14
+ADDRESS_BITS = 15
+
+# Two cascaded 74HC595s in the address shifter
+ADDRESS_CHAIN_BITS = 16
+
+
+def de_bruijn_bits(*, order: int) -> List[int]:
+    """Binary De Bruijn sequence, every `order` bit window appears once (cyclic).
+    Example de_bruijn_bits(order=2) returns [0, 0, 1, 1].
+
+    :param order: Window length in bits (type integer).
+    :return: Sequence of 2**order bits (type List[int]).
+    """
+
+    word = [0] * (order + 1)
+    sequence: List[int] = []
+
+    # Lyndon word construction (Fredricksen, Kessler, Maiorana)
+    def extend(t: int, p: int) -> None:
+        if t > order:
+            if order % p == 0:
+                sequence.extend(word[1:p + 1])
+        else:
+            word[t] = word[t - p]
+            extend(t + 1, p)
+            if word[t - p] == 0:
+                word[t] = 1
+                extend(t + 1, t)
+
+    extend(1, 1)
+    return sequence
+
+
+class DeBruijnWalk:
+    """Chain contents for a full De Bruijn sweep of the address space.
+
+    `initial_chain` is shifted in whole first. Iterating then yields
+    (address, next_bit) for each of the 2**address_bits addresses: the
+    address currently latched and the bit to shift in to reach the next.
+    """
+
+    def __init__(self, *, address_bits: int=ADDRESS_BITS, chain_bits: int=ADDRESS_CHAIN_BITS) -> None:
+        assert chain_bits >= address_bits, "`chain_bits` should not be less than `address_bits`."
+
+        self.address_bits = address_bits
+        self.chain_bits = chain_bits
+        self.bits: List[int] = de_bruijn_bits(order=address_bits)
+
+
+    @property
+    def initial_chain(self) -> int:
+        """Chain value that latches the first address of the walk.
+
+        :return: Value to shift in with Shifter.shift (type integer).
+        """
+
+        size: int = len(self.bits)
+        return sum(self.bits[j % size] << j for j in range(self.chain_bits))
+
+
+    def __len__(self) -> int:
+        return len(self.bits)
+
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        bits: List[int] = self.bits
+        size: int = len(bits)
+        top: int = self.chain_bits - 1
+        address_mask: int = (1 << self.address_bits) - 1
+        chain: int = self.initial_chain
+
+        for k in range(size):
+            next_bit: int = bits[(k + self.chain_bits) % size]
+            yield chain & address_mask, next_bit
+            chain = (chain >> 1) | (next_bit << top)
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+
+# Module for rendering RAM words as a hexdump
+#
+# Rows hold 8 words and start at a multiple of 8, as bulk_read has always
+# printed them. Words are consumed from any iterable and each row is
+# written out as soon as it is complete, so a dump of the whole RAM never
+# holds more than one row. Addresses outside the rendered range are left
+# blank instead of being read.
+
+
+from __future__ import annotations
+
+from typing import Iterable, Optional, TextIO
+
+
+ROW_WORDS = 8
+BLANK = " " * 8
+
+
+def render_hexdump(
+    *,
+    start: int,
+    words: Iterable[int],
+    out: TextIO,
+    color: Optional[str]=None,
+    row_words: int=ROW_WORDS,
+) -> int:
+    """Writes words as hexdump rows, one line per row.
+    Example output row: '0010          0x6a2821 0x6b9924 ...'
+
+    :param start: Address of the first word (type integer).
+    :param words: Words in ascending address order from `start` (type Iterable[int]).
+    :param out: Text stream to write to, e.g. a file or sys.stdout (type TextIO).
+    :param color: termcolor color of the words, plain if not given (type string).
+    :param row_words: Words per row (type integer).
+    :return: Number of words written (type integer).
+    """
+
+    if color:
+        from termcolor import colored
+
+    address: int = start
+    row_start: int = start - start % row_words
+    cells = [BLANK] * (start - row_start)
+
+    for word in words:
+        cell: str = f"0x{word:06x}"
+        cells.append(colored(cell, color) if color else cell)
+        address += 1
+
+        if len(cells) == row_words:
+            out.write(f"{row_start:04x} " + " ".join(cells) + " \n")
+            row_start += row_words
+            cells = []
+
+    if cells:
+        cells += [BLANK] * (row_words - len(cells))
+        out.write(f"{row_start:04x} " + " ".join(cells) + " \n")
+
+    return address - start
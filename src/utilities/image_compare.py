@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+
+# Module for bulk comparison of memory images
+#
+# Checksums and word comparisons for a whole MemoryImage are computed in one
+# pass of map() over the byte columns of the word array and lookup tables,
+# so the per address work is done by the interpreter's C loops instead of
+# Python code. Only the mismatching addresses are ever looked at one by one.
+
+
+from __future__ import annotations
+
+import operator
+import sys
+
+from array import array
+from itertools import compress
+from src.utilities.memory_image import MemoryImage, record_checksum
+from typing import Iterable
+
+
+# Byte columns of an array('I') item, least significant byte first
+_COLUMNS = (0, 1, 2) if sys.byteorder == "little" else (3, 2, 1)
+
+# Largest sum of the address byte sum (mod 256) and 3 data bytes is 4 * 0xff
+_NEGATED = bytes(-total & 0xff for total in range(4 * 0xff + 1))
+
+# Bitmap byte to one 0/1 byte per address
+_BITS = [bytes((byte >> bit) & 1 for bit in range(8)) for byte in range(256)]
+
+_address_sums: bytes = b""
+
+
+def _record_sums(*, words: int) -> bytes:
+    """Sum of byte count and address bytes, mod 256, of the one word record of every address."""
+
+    global _address_sums
+    if len(_address_sums) < words:
+        _address_sums = bytes((3 + (address >> 8) + (address & 0xff)) & 0xff for address in range(words))
+    return _address_sums[:words]
+
+
+def _unpack(*, valid: bytearray) -> bytes:
+    """Expands a validity bitmap to one 0/1 byte per address."""
+
+    return b"".join(map(_BITS.__getitem__, valid))
+
+
+def record_checksums(*, image: MemoryImage) -> bytes:
+    """Intel hex checksums of the one word records of all addresses, set or not.
+    Example record_checksums(image=image)[0x15] is 0x35 if image[0x15] is 0x6a2821.
+
+    :param image: Memory image (type MemoryImage).
+    :return: One checksum byte per address (type bytes).
+    """
+
+    raw: bytes = image.words.tobytes()
+    low, mid, high = (raw[column::4] for column in _COLUMNS)
+
+    totals: Iterable[int] = map(operator.add, _record_sums(words=image.size), low)
+    totals = map(operator.add, totals, mid)
+    totals = map(operator.add, totals, high)
+    return bytes(map(_NEGATED.__getitem__, totals))
+
+
+def mismatches(*, expected: MemoryImage, actual: MemoryImage, by_checksum: bool=False) -> array:
+    """Addresses set in `expected` whose word is missing from or different in
+    `actual`. With `by_checksum` only the record checksums are compared, as
+    the checksum verification of an ihex file does.
+
+    :param expected: Image that was written (type MemoryImage).
+    :param actual: Image read back (type MemoryImage).
+    :param by_checksum: Compare record checksums instead of words (type bool).
+    :return: Ascending mismatching addresses (type array('I')).
+    """
+
+    assert expected.size == actual.size, "images of different sizes"
+
+    if by_checksum:
+        expected_words: Iterable = record_checksums(image=expected)
+        actual_words: Iterable = record_checksums(image=actual)
+    else:
+        expected_words, actual_words = expected.words, actual.words
+
+    # Fast path: same words everywhere and every expected word was read
+    if expected_words == actual_words and all(map(operator.eq, map(operator.and_, expected.valid, actual.valid), expected.valid)):
+        return array("I")
+
+    # expected set > (actual set and equal) is 1 exactly for the mismatches
+    agree = map(operator.and_, _unpack(valid=actual.valid), map(operator.eq, expected_words, actual_words))
+    differs = map(operator.gt, _unpack(valid=expected.valid), agree)
+    return array("I", compress(range(expected.size), differs))
+
+
+def render_diff(*, expected: MemoryImage, actual: MemoryImage, addresses: Iterable[int]) -> str:
+    """Renders expected against actual values of the given addresses.
+    Example line: '0x0015  expected 0x6a2821 (0x35)  actual 0x6a2020 (0x36)'
+
+    :param expected: Image that was written (type MemoryImage).
+    :param actual: Image read back (type MemoryImage).
+    :param addresses: Addresses to render, e.g. from `mismatches` (type Iterable[int]).
+    :return: One line per address (type string).
+    """
+
+    lines = []
+
+    for address in addresses:
+        want: int = expected[address]
+        got = actual.get(address)
+        read: str = "-------- (----)" if got is None else f"0x{got:06x} (0x{record_checksum(address=address, word=got):02x})"
+        lines.append(
+            f"0x{address:04x}  expected 0x{want:06x} (0x{record_checksum(address=address, word=want):02x})  actual {read}"
+        )
+
+    return "\n".join(lines)
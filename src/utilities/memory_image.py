@@ -0,0 +1,250 @@
+#!/usr/bin/python3
+
+# Module for the MemoryImage type
+#
+# A MemoryImage is the contents of the PB224 RAM as a flat array('I') of
+# 32768 24 bit words plus a bitmap of which words are set. It is what gets
+# dumped, verified and snapshotted, and it converts to and from Intel HEX
+# and raw binary (3 big endian bytes per word).
+
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+if TYPE_CHECKING:
+    from src.utilities.record import HexRecord
+
+
+WORD_BYTES = 3
+
+
+def record_checksum(*, address: int, word: int) -> int:
+    """Intel hex checksum of the one word data record holding `word`.
+    Example record_checksum(address=0x15, word=0x6a2821) returns 0x35.
+
+    :param address: Word address (type integer).
+    :param word: 24 bit data word (type integer).
+    :return: Checksum byte (type integer).
+    """
+
+    total: int = WORD_BYTES + (address >> 8) + (address & 0xff) + (word >> 16) + ((word >> 8) & 0xff) + (word & 0xff)
+    return -total & 0xff
+
+
+class MemoryImage:
+    """24 bit words of the PB224 RAM with a validity bitmap."""
+
+    WORDS: int = 32768
+
+
+    def __init__(self, *, words: int=WORDS) -> None:
+        self.size = words
+        self.words = array("I", bytes(4 * words))
+        self.valid = bytearray((words + 7) // 8)
+
+
+    @classmethod
+    def from_intel_hex(cls, *, source: Union[str, TextIO]) -> MemoryImage:
+        """Loads an image from an ihex file.
+
+        :param source: Path of ihex file, '-' for stdin, or an open text file (type string or TextIO).
+        :return: image object (type MemoryImage).
+        """
+
+        from src.parsers.ihexfile_parser import iter_words
+
+        image = cls()
+        image.update(iter_words(source=source, words=image.size))
+        return image
+
+
+    @classmethod
+    def from_records(cls, *, record_list: List[HexRecord]) -> MemoryImage:
+        """Builds an image from parsed HexRecord objects.
+
+        :param record_list: A list of HexRecord objects from the ihex file (type List[HexRecord]).
+        :return: image object (type MemoryImage).
+        """
+
+        image = cls()
+        image.update(
+            (int(ihex_record.addr_field, 16), int(ihex_record.data_field, 16)) for ihex_record in record_list
+        )
+        return image
+
+
+    @classmethod
+    def from_binary(cls, *, filename: str, base: int=0) -> MemoryImage:
+        """Loads an image from a raw binary file of 3 byte big endian words.
+
+        :param filename: Path of binary file (type string).
+        :param base: Address of the first word in the file (type integer).
+        :return: image object (type MemoryImage).
+        """
+
+        with open(file=filename, mode="rb") as binfile:
+            data: bytes = binfile.read()
+
+        image = cls()
+        image.update(
+            (base + offset // WORD_BYTES, int.from_bytes(data[offset:offset + WORD_BYTES], "big"))
+            for offset in range(0, len(data) - len(data) % WORD_BYTES, WORD_BYTES)
+        )
+        return image
+
+
+    @classmethod
+    def coerce(cls, value: Union[MemoryImage, List[HexRecord], Dict[str, str]]) -> MemoryImage:
+        """Returns `value` as an image. HexRecord lists are converted; address
+        to checksum mappings give an image of the addresses only.
+
+        :param value: Image, HexRecord list or address to checksum mappings (type MemoryImage, List or Dict).
+        :return: image object (type MemoryImage).
+        """
+
+        if isinstance(value, MemoryImage):
+            return value
+        if isinstance(value, dict):
+            raise TypeError("address to checksum mappings carry no data words, pass a MemoryImage")
+        return cls.from_records(record_list=value)
+
+
+    def update(self, words: Iterable[Tuple[int, int]]) -> None:
+        """Sets several words.
+
+        :param words: (address, word) pairs (type Iterable[Tuple[int, int]]).
+        :return: None.
+        """
+
+        for address, word in words:
+            self[address] = word
+
+
+    def __setitem__(self, address: int, word: int) -> None:
+        self.words[address] = word
+        self.valid[address >> 3] |= 1 << (address & 7)
+
+
+    def __getitem__(self, address: int) -> int:
+        if address not in self:
+            raise KeyError(address)
+        return self.words[address]
+
+
+    def __contains__(self, address: int) -> bool:
+        return 0 <= address < self.size and bool(self.valid[address >> 3] & (1 << (address & 7)))
+
+
+    def get(self, address: int, default: Optional[int]=None) -> Optional[int]:
+        return self.words[address] if address in self else default
+
+
+    def __len__(self) -> int:
+        return sum(bin(byte).count("1") for byte in self.valid)
+
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterates over the set addresses in ascending order."""
+
+        for index, byte in enumerate(self.valid):
+            while byte:
+                bit: int = (byte & -byte).bit_length() - 1
+                yield (index << 3) | bit
+                byte &= byte - 1
+
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        """Iterates over (address, word) pairs of the set words in ascending order."""
+
+        words: array = self.words
+        for address in self:
+            yield address, words[address]
+
+
+    def runs(self) -> Iterator[Tuple[int, array]]:
+        """Iterates over runs of consecutive set words.
+
+        :return: Iterator of (first address, words) tuples (type Iterator[Tuple[int, array]]).
+        """
+
+        start: Optional[int] = None
+        previous: int = -2
+
+        for address in self:
+            if address != previous + 1:
+                if start is not None:
+                    yield start, self.words[start:previous + 1]
+                start = address
+            previous = address
+
+        if start is not None:
+            yield start, self.words[start:previous + 1]
+
+
+    def checksum(self, address: int) -> int:
+        """Intel hex checksum of the one word record for an address.
+
+        :param address: Word address (type integer).
+        :return: Checksum byte (type integer).
+        """
+
+        return record_checksum(address=address, word=self[address])
+
+
+    def checksum_mappings(self) -> Dict[str, str]:
+        """Address to checksum mappings in the form dump_intel_hexfile used to return.
+
+        :return: Address and corresponding checksum value mappings (type Dict[str:str]).
+        """
+
+        return {f"0x{address:04x}": f"0x{record_checksum(address=address, word=word):02x}" for address, word in self.items()}
+
+
+    def to_intel_hex(self, *, filename: str, words_per_record: int=1) -> None:
+        """Writes the image as an ihex file, one record per run chunk.
+
+        :param filename: Path of ihex file (type string).
+        :param words_per_record: Words in each data record, at most 85 (type integer).
+        :return: None.
+        """
+
+        with open(file=filename, mode="w") as ihexfile:
+            for start, words in self.runs():
+                for offset in range(0, len(words), words_per_record):
+                    chunk = words[offset:offset + words_per_record]
+                    address: int = start + offset
+                    raw = bytes([len(chunk) * WORD_BYTES, address >> 8, address & 0xff, 0x00])
+                    raw += b"".join(word.to_bytes(WORD_BYTES, "big") for word in chunk)
+                    ihexfile.write(":" + raw.hex() + f"{-sum(raw) & 0xff:02x}\n")
+            ihexfile.write(":00000001ff\n")
+
+
+    def to_binary(self, *, filename: str) -> int:
+        """Writes the words from the lowest to the highest set address as raw
+        3 byte big endian words. Unset words in between are written as 0.
+
+        :param filename: Path of binary file (type string).
+        :return: Address of the first word in the file, for `from_binary` (type integer).
+        """
+
+        addresses: List[int] = list(self)
+        base: int = addresses[0] if addresses else 0
+        top: int = addresses[-1] if addresses else -1
+
+        with open(file=filename, mode="wb") as binfile:
+            binfile.write(b"".join(
+                self.words[address].to_bytes(WORD_BYTES, "big") for address in range(base, top + 1)
+            ))
+        return base
+
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MemoryImage):
+            return NotImplemented
+        return self.valid == other.valid and all(self.words[a] == other.words[a] for a in self)
+
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(words={len(self)}, runs={sum(1 for _ in self.runs())})'
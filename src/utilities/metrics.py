@@ -0,0 +1,280 @@
+#!/usr/bin/python3
+
+# Module for operation metrics of the RAM interface
+#
+# Metrics counts words per operation, words shifted per shifter, pin edges
+# per pin and repair retries, and keeps a latency histogram per operation.
+# The time of each operation is split into sleeping (backend delays),
+# bit-banging (backend pin writes and reads) and host processing (the
+# rest), using the totals a MeteredBackend adds up. Only the outermost
+# operation is recorded, so a dump is not counted again as its word writes.
+# The running operation is kept in a context variable, so each thread or
+# task has its own, and an operation suspended at a yield, like read_range,
+# is paused: whatever its caller does meanwhile is neither nested in it nor
+# counted in its time.
+#
+# Metrics are exported as JSON or in the Prometheus text format, e.g. for
+# the textfile collector of node_exporter.
+
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# Upper bounds of the latency buckets in secs, the last bucket is +Inf
+LATENCY_BUCKETS = (1e-5, 3e-5, 1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0)
+
+TIME_KINDS = ("sleep", "bitbang", "host")
+
+
+class Histogram:
+    """Latency histogram over LATENCY_BUCKETS, with a count per bucket."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self.counts)),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class _Operation:
+    """Times one operation, see `Metrics.operation`. Set `words` to the
+    number of words the operation processed."""
+
+    __slots__ = (
+        "metrics", "name", "words", "outer",
+        "start", "sleep_start", "bitbang_start", "elapsed", "sleep_ns", "bitbang_ns",
+    )
+
+    def __init__(self, *, metrics: Metrics, name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.words = 0
+        self.elapsed = self.sleep_ns = self.bitbang_ns = 0
+
+
+    def _resume(self) -> None:
+        self.sleep_start = self.metrics.sleep_ns
+        self.bitbang_start = self.metrics.bitbang_ns
+        self.start = time.perf_counter_ns()
+
+
+    def _pause(self) -> None:
+        self.elapsed += time.perf_counter_ns() - self.start
+        self.sleep_ns += self.metrics.sleep_ns - self.sleep_start
+        self.bitbang_ns += self.metrics.bitbang_ns - self.bitbang_start
+
+
+    def __enter__(self) -> _Operation:
+        self.outer = self.metrics._running.get() is None
+        if self.outer:
+            self.metrics._running.set(self)
+            self._resume()
+        return self
+
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Stops the clock while the operation is suspended, e.g. around the
+        yield of a generator, so its caller runs outside of it.
+
+        :return: None.
+        """
+
+        if not self.outer:
+            yield
+            return
+
+        self._pause()
+        self.metrics._running.set(None)
+        try:
+            yield
+        finally:
+            self.metrics._running.set(self)
+            self._resume()
+
+
+    def __exit__(self, *exc_info) -> None:
+        if not self.outer:
+            return
+
+        self._pause()
+        metrics: Metrics = self.metrics
+        metrics._running.set(None)
+
+        split: Dict[str, int] = metrics.time_ns.setdefault(self.name, dict.fromkeys(TIME_KINDS, 0))
+        split["sleep"] += self.sleep_ns
+        split["bitbang"] += self.bitbang_ns
+        split["host"] += max(self.elapsed - self.sleep_ns - self.bitbang_ns, 0)
+
+        metrics.words[self.name] = metrics.words.get(self.name, 0) + self.words
+        metrics.latency.setdefault(self.name, Histogram()).observe(self.elapsed / 1e9)
+
+
+class _Unmeasured:
+    """Stands in for `_Operation` when metrics are off."""
+
+    words = 0
+
+    def __enter__(self) -> _Unmeasured:
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+    def paused(self) -> _Unmeasured:
+        return self
+
+
+UNMEASURED = _Unmeasured()
+
+
+class Metrics:
+    """Counters, latency histograms and time split of a RAM interface."""
+
+    def __init__(self, *, board_id: str="pb224", pin_names: Optional[Dict[int, str]]=None) -> None:
+        self.board_id = board_id
+        self.pin_names: Dict[int, str] = pin_names or {}
+        self.words: Dict[str, int] = {}
+        self.shifted: Dict[str, int] = {}
+        self.edges: Dict[int, int] = {}
+        self.retries = 0
+        self.latency: Dict[str, Histogram] = {}
+        self.time_ns: Dict[str, Dict[str, int]] = {}
+        # Totals added up by MeteredBackend
+        self.sleep_ns = 0
+        self.bitbang_ns = 0
+        # Outermost operation running in the current context, None between operations
+        self._running: ContextVar[Optional[_Operation]] = ContextVar(f"pb224_operation_{id(self)}", default=None)
+
+
+    def operation(self, name: str) -> _Operation:
+        """Context manager timing one operation.
+        Example:
+            with metrics.operation("dump_intel_hexfile") as op:
+                ...
+                op.words = len(image)
+
+        :param name: Operation name (type string).
+        :return: Operation timer (type _Operation).
+        """
+
+        return _Operation(metrics=self, name=name)
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns all metrics as JSON serializable values.
+
+        :return: Metrics (type Dict[str, Any]).
+        """
+
+        return {
+            "boardId": self.board_id,
+            "words": self.words,
+            "shiftedWords": self.shifted,
+            "pinEdges": {self.pin_names.get(pin, str(pin)): count for pin, count in sorted(self.edges.items())},
+            "retries": self.retries,
+            "latency": {name: histogram.to_dict() for name, histogram in self.latency.items()},
+            "timeSeconds": {
+                name: {kind: ns / 1e9 for kind, ns in split.items()} for name, split in self.time_ns.items()
+            },
+        }
+
+
+    def to_prometheus(self) -> str:
+        """Returns all metrics in the Prometheus text format.
+
+        :return: Metrics text (type string).
+        """
+
+        board: str = f'board="{self.board_id}"'
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("pb224_words_total", "counter", "Words processed, per operation.")
+        for name, count in self.words.items():
+            lines.append(f'pb224_words_total{{{board},operation="{name}"}} {count}')
+
+        family("pb224_shifted_words_total", "counter", "Words shifted into each 74HC595 chain.")
+        for name, count in self.shifted.items():
+            lines.append(f'pb224_shifted_words_total{{{board},shifter="{name}"}} {count}')
+
+        family("pb224_pin_edges_total", "counter", "Level changes driven on each pin.")
+        for pin, count in sorted(self.edges.items()):
+            signal: str = self.pin_names.get(pin, "")
+            lines.append(f'pb224_pin_edges_total{{{board},pin="{pin}",signal="{signal}"}} {count}')
+
+        family("pb224_retries_total", "counter", "Words re-written by verify and repair.")
+        lines.append(f"pb224_retries_total{{{board}}} {self.retries}")
+
+        family("pb224_operation_seconds", "histogram", "Latency of each operation.")
+        for name, histogram in self.latency.items():
+            labels: str = f'{board},operation="{name}"'
+            cumulative = 0
+            for bound, count in zip([*map(str, LATENCY_BUCKETS), "+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f'pb224_operation_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"pb224_operation_seconds_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"pb224_operation_seconds_count{{{labels}}} {histogram.count}")
+
+        family("pb224_operation_time_seconds_total", "counter", "Operation time spent sleeping, bit-banging and on the host.")
+        for name, split in self.time_ns.items():
+            for kind, ns in split.items():
+                lines.append(f'pb224_operation_time_seconds_total{{{board},operation="{name}",kind="{kind}"}} {ns / 1e9}')
+
+        return "\n".join(lines) + "\n"
+
+
+    def write(self, *, filename: str) -> None:
+        """Writes the metrics to a file, JSON if it ends in `.json` and the
+        Prometheus text format otherwise. The file is replaced atomically,
+        so a collector never reads it half written.
+        Example filename: '/var/lib/node_exporter/textfile/pb224.prom'
+
+        :param filename: Path of the metrics file (type string).
+        :return: None.
+        """
+
+        if filename.endswith(".json"):
+            text: str = json.dumps(self.to_dict(), indent=2)
+        else:
+            text = self.to_prometheus()
+
+        with open(file=filename + ".tmp", mode="w") as tmp_file:
+            tmp_file.write(text)
+        os.replace(filename + ".tmp", filename)
+
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(words={sum(self.words.values())}, "
+            f"edges={sum(self.edges.values())}, retries={self.retries})"
+        )
@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+
+# Module for progress reporting
+#
+# Long RAM operations take an optional progress callback, called with the
+# number of words done since its previous call. Nothing wraps the
+# operations themselves: without a callback they report nothing, and any
+# display plugs in as a callable, tqdm through the `update` of its bar.
+
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+# Progress callback, called with the number of words just done
+Progress = Callable[[int], Any]
+
+
+@contextmanager
+def tqdm_progress(*, desc: str, total: int) -> Iterator[Progress]:
+    """Shows a tqdm bar while the with block runs.
+    Example:
+        with tqdm_progress(desc="Dumping Intel Hex File", total=len(image)) as progress:
+            ram_OP.dump_intel_hexfile(record_list=image, progress=progress)
+
+    :param desc: Label of the bar (type string).
+    :param total: Words in total (type integer).
+    :return: Progress callback updating the bar (type Progress).
+    """
+
+    from tqdm import tqdm
+
+    with tqdm(total=total, desc=desc) as pbar:
+        yield pbar.update
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+
+# Module for the high resolution pulse scheduler
+#
+# time.sleep on Linux overshoots by tens to hundreds of microseconds, which
+# is far longer than any 74HC timing. The scheduler sleeps only for the part
+# of a wait that is above the spin threshold and busy-waits on
+# perf_counter_ns for the rest. The sleep and the spin of one wait share a
+# single deadline, so oversleeping is absorbed by a shorter spin. Every wait
+# starts when it is called, never at an earlier deadline: the timings are
+# datasheet minimums, and host time spent between a deadline and the next
+# pin edge must not come out of the pulse, setup or hold that follows.
+
+
+from __future__ import annotations
+
+import threading
+import time
+
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+
+@dataclass(kw_only=True)
+class PulseStats:
+    """Requested and observed widths of the pulses on one pin, in ns."""
+    count: int=0
+    requested_ns: int=0
+    observed_ns: int=0
+    min_error_ns: int=0
+    max_error_ns: int=0
+
+
+    def record(self, *, requested_ns: int, observed_ns: int) -> None:
+        """Adds one pulse to the stats.
+
+        :param requested_ns: Requested pulse width (type integer).
+        :param observed_ns: Measured pulse width (type integer).
+        :return: None.
+        """
+
+        error: int = observed_ns - requested_ns
+
+        if self.count == 0:
+            self.min_error_ns = self.max_error_ns = error
+        else:
+            self.min_error_ns = min(self.min_error_ns, error)
+            self.max_error_ns = max(self.max_error_ns, error)
+
+        self.count += 1
+        self.requested_ns += requested_ns
+        self.observed_ns += observed_ns
+
+
+    @property
+    def mean_error_ns(self) -> float:
+        """Mean of observed minus requested width.
+
+        :return: Mean error in ns (type float).
+        """
+
+        return (self.observed_ns - self.requested_ns) / self.count if self.count else 0.0
+
+
+class PulseScheduler:
+    """Deadline based waits on perf_counter_ns.
+
+    The deadline is kept per thread. `begin` anchors it to the current time
+    and should be called at the start of every pin sequence. A wait ends
+    `seconds` after the later of the previous deadline and the time of the
+    call, so it is never shortened by time the host spent before it.
+    """
+
+    def __init__(
+        self,
+        *,
+        spin_threshold_ns: int=200_000,
+        clock: Callable[[], int]=time.perf_counter_ns,
+        sleep: Callable[[float], None]=time.sleep,
+    ) -> None:
+        self.spin_threshold_ns = spin_threshold_ns
+        self.clock = clock
+        self.sleep = sleep
+        self.pulses: Dict[int, PulseStats] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+
+    def begin(self) -> None:
+        """Anchors the deadline of the calling thread to now.
+
+        :return: None.
+        """
+
+        self._local.deadline = self.clock()
+
+
+    def wait(self, seconds: float) -> None:
+        """Waits `seconds` from now, or from the previous deadline if it is
+        still ahead.
+
+        :param seconds: Time to wait in secs (type float).
+        :return: None.
+        """
+
+        now: int = self.clock()
+        deadline: int = getattr(self._local, "deadline", now)
+
+        self.wait_until(max(deadline, now) + round(seconds * 1e9))
+
+
+    def wait_until(self, deadline: int) -> None:
+        """Waits until the clock reaches `deadline`, which becomes the
+        deadline for the next wait.
+
+        :param deadline: Absolute time on the scheduler clock in ns (type integer).
+        :return: None.
+        """
+
+        self._local.deadline = deadline
+
+        remaining: int = deadline - self.clock()
+        if remaining > self.spin_threshold_ns:
+            self.sleep((remaining - self.spin_threshold_ns) / 1e9)
+
+        while self.clock() < deadline:
+            pass
+
+
+    def record_pulse(self, *, pin: int, requested_ns: int, observed_ns: int) -> None:
+        """Adds a measured pulse to the report of its pin.
+
+        :param pin: BCM pin number (type integer).
+        :param requested_ns: Requested pulse width (type integer).
+        :param observed_ns: Measured pulse width (type integer).
+        :return: None.
+        """
+
+        with self._lock:
+            self.pulses.setdefault(pin, PulseStats()).record(
+                requested_ns=requested_ns, observed_ns=observed_ns
+            )
+
+
+    def report(self) -> str:
+        """Formats the observed versus requested pulse widths per pin.
+
+        :return: One line per pin (type string).
+        """
+
+        lines = []
+        with self._lock:
+            for pin, stats in sorted(self.pulses.items()):
+                lines.append(
+                    f"pin {pin}: {stats.count} pulses, requested {stats.requested_ns / stats.count:.0f} ns, "
+                    f"observed {stats.observed_ns / stats.count:.0f} ns "
+                    f"(error min {stats.min_error_ns} / mean {stats.mean_error_ns:.0f} / max {stats.max_error_ns} ns)"
+                )
+        return "\n".join(lines)
@@ -53,7 +53,7 @@ class HexRecord(BaseModel):
         :return: Returns data field of record (type string).
         """
 
-        return "0x" + self.record_string[9:15]
+        return "0x" + self.record_string[9:9 + 2 * int(self.record_string[1:3], 16)]
 
 
     @property
@@ -63,7 +63,7 @@ class HexRecord(BaseModel):
         :return: Returns checksum field of record (type string).
         """
 
-        return "0x" + self.record_string[15:17]
+        return "0x" + self.record_string[-2:]
 
 
     def __repr__(self) -> str:
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+
+# Module for profiling the startup of main.py
+#
+# Startup is split into named phases. For each phase the wall time is
+# recorded, along with the third-party packages imported during it, so a
+# slow phase can be traced to the dependency it pulled in.
+
+
+from __future__ import annotations
+
+import sys
+import time
+
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+
+# When this module was first imported, the origin of the total: main.py
+# imports it first, so the total covers the imports of main.py too
+IMPORTED_AT: float = time.perf_counter()
+
+
+class StartupProfile:
+    """Wall time and new third-party imports of each startup phase."""
+
+    def __init__(self) -> None:
+        self.origin: float = IMPORTED_AT
+        self.phases: List[Tuple[str, float, List[str]]] = []
+
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Records the time and the imports of the code run inside it.
+        Example: with profile.phase("parse config"): ...
+
+        :param name: Name of the phase (type string).
+        """
+
+        modules = set(sys.modules)
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed: float = time.perf_counter() - start
+            imported = sorted(
+                {name.split(".")[0] for name in set(sys.modules) - modules}
+                - set(sys.stdlib_module_names) - {"src"}
+                - {name for name in sys.modules if name.startswith("_")}
+            )
+            self.phases.append((name, elapsed, imported))
+
+
+    def report(self) -> str:
+        """Returns the startup breakdown, one line per phase.
+
+        :return: startup breakdown (type string).
+        """
+
+        lines = ["STARTUP PROFILE"]
+        for name, elapsed, imported in self.phases:
+            lines.append(f"  {name:<28} {elapsed * 1e3:8.1f} ms  {' '.join(imported)}")
+        lines.append(f"  {'total':<28} {(time.perf_counter() - self.origin) * 1e3:8.1f} ms")
+        return "\n".join(lines)
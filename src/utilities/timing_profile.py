@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+
+# Module for the datasheet timing profiles
+#
+# Every wait between pin operations comes from one of these profiles. The
+# values are given in nanoseconds in pb224_config.yaml, taken from the
+# datasheets of the 74HC595, 74HC165 and MS62256A, and are converted here to
+# seconds and multiplied by the configured timing margin.
+
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Dict, Any
+
+
+NS = 1e-9
+
+
+def _from_config(cls, *, timing: Dict[str, Any], margin: float):
+    """Builds a timing profile from a `timing` block of the config file.
+
+    :param timing: Mapping of timing name to nanoseconds (type Dict[str, Any]).
+    :param margin: Multiplier applied to every value (type float).
+    :return: timing profile instance (type cls).
+    """
+
+    assert margin >= 1, "`timingMargin` should not be less than `1`."
+
+    values = {}
+    for f in fields(cls):
+        assert f.name in timing, f"`{f.name}` missing in `{cls.__name__}` timing config."
+        assert timing[f.name] >= 0, f"`{f.name}` should be a non negative number of nanoseconds."
+        values[f.name] = timing[f.name] * NS * margin
+
+    return cls(**values)
+
+
+@dataclass(kw_only=True)
+class SIPOTiming:
+    """74HC595 timings in secs."""
+    serSetup: float         # SER stable before SRCLK rises
+    serHold: float          # SER stable after SRCLK rises
+    srclkPulseWidth: float  # SRCLK high time
+    rclkSetup: float        # Last SRCLK rise before RCLK rises
+    rclkPulseWidth: float   # RCLK high time
+    srclrPulseWidth: float  # SRCLR low time
+
+    from_config = classmethod(_from_config)
+
+
+@dataclass(kw_only=True)
+class PISOTiming:
+    """74HC165 timings in secs."""
+    ldPulseWidth: float     # SH/LD low time
+    ldToClk: float          # SH/LD high before CLK rises
+    clkPulseWidth: float    # CLK high time
+    clkToOutput: float      # CLK rise to QH valid
+
+    from_config = classmethod(_from_config)
+
+
+@dataclass(kw_only=True)
+class SRAMTiming:
+    """MS62256A timings in secs."""
+    accessTime: float       # Address stable to data valid
+    addressSetup: float     # Address stable before write strobe
+    dataSetup: float        # Data stable before end of write strobe
+    dataHold: float         # Data stable after end of write strobe
+    writePulseWidth: float  # Write strobe width
+    writeRecovery: float    # End of write strobe to next cycle
+
+    from_config = classmethod(_from_config)
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+
+# Fixtures of the pb224 tests
+#
+# Every test runs against the simulated board (the `sim` pin backend) wired
+# by the stock config file, so no Raspberry Pi or RPi.GPIO is needed.
+
+
+from __future__ import annotations
+
+import os
+import random
+import pytest
+
+from src.parsers.config_parser import parse_config
+from src.ram.ram_operations import RAM_Interface
+from src.utilities.memory_image import MemoryImage
+
+
+CONF_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "configs", "pb224_config.yaml")
+
+
+@pytest.fixture
+def ram_OP() -> RAM_Interface:
+    """RAM operations object on a fresh simulated board."""
+
+    return parse_config(conf_file=CONF_FILE, backend="sim", cache_dir=None)
+
+
+@pytest.fixture
+def image() -> MemoryImage:
+    """Image of 512 random words from 0x0100 on, in two runs with a gap."""
+
+    rng = random.Random(224)
+    image = MemoryImage()
+    for address in list(range(0x0100, 0x0200)) + list(range(0x0280, 0x0380)):
+        image[address] = rng.getrandbits(24)
+    return image
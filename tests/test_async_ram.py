@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+
+# Tests of the asyncio front end, in particular of cancellation
+#
+# Each test runs its own event loop with asyncio.run.
+
+
+from __future__ import annotations
+
+import asyncio
+import pytest
+
+from src.ram.async_ram import AsyncRAMInterface
+from src.ram.flash_journal import FlashJournal
+from src.ram.image_manifest import image_hash
+
+
+def idle(ram_OP) -> bool:
+    """RI and its write strobe are low, as between operations."""
+
+    levels = ram_OP.backend.levels
+    return all(levels[pin.pinNo] == 0 for pin in ram_OP.W_Pins)
+
+
+def written(ram_OP, image) -> int:
+    return sum(ram_OP.backend.board.sram.read(address=address) == word for address, word in image.items())
+
+
+def test_cancelled_dump_stops_at_a_word_boundary(ram_OP, image, tmp_path):
+    journal = FlashJournal(directory=str(tmp_path), board_id="pb224", every=64)
+
+    async def main():
+        async with AsyncRAMInterface(ram_OP=ram_OP) as aram:
+            def on_progress(done, total):
+                if done >= 100:
+                    task.cancel()
+
+            task = asyncio.create_task(aram.dump(image=image, journal=journal, on_progress=on_progress))
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            # The worker is free again once the cancellation has propagated
+            assert await aram.read_word(address=0x0100) == image[0x0100]
+
+    asyncio.run(main())
+
+    assert 100 <= written(ram_OP, image) < len(image)
+    assert idle(ram_OP)
+    assert journal._file is None
+    assert journal.resume_point(image_hash=image_hash(image=image), words=len(image)) >= 64
+
+
+def test_cancelled_verify(ram_OP, image):
+    ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+    seen = []
+
+    async def main():
+        async with AsyncRAMInterface(ram_OP=ram_OP) as aram:
+            def on_progress(done, total):
+                seen.append(done)
+                if done >= 50:
+                    task.cancel()
+
+            task = asyncio.create_task(aram.verify(image=image, on_progress=on_progress))
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(main())
+    assert 50 <= seen[-1] < len(image)
+
+
+def test_leaving_read_range_early(ram_OP, image):
+    ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+
+    async def main():
+        words = []
+        async with AsyncRAMInterface(ram_OP=ram_OP) as aram:
+            async for word in aram.read_range(lower=0x0100, upper=0x01ff):
+                words.append(word)
+                if len(words) == 8:
+                    break
+            # The reader has stopped and handed the worker back
+            words.append(await aram.read_word(address=0x0300))
+        return words
+
+    assert asyncio.run(main()) == [image[address] for address in [*range(0x0100, 0x0108), 0x0300]]
+
+
+def test_concurrent_tasks_are_serialized(ram_OP):
+    async def main():
+        async with AsyncRAMInterface(ram_OP=ram_OP) as aram:
+            await asyncio.gather(*(aram.write_word(address=address, value=address * 3) for address in range(64)))
+            return await asyncio.gather(*(aram.read_word(address=address) for address in range(64)))
+
+    assert asyncio.run(main()) == [address * 3 for address in range(64)]
+
+
+def test_run_on_the_worker(ram_OP):
+    async def main():
+        async with AsyncRAMInterface(ram_OP=ram_OP) as aram:
+            await aram.run(lambda ram_OP: ram_OP.sweep_fill(hex_data="0x00abcd", lower_addr="0x0000", upper_addr="0x000f"))
+            return [word async for word in aram.read_range(lower=0x0000, upper=0x000f)]
+
+    assert asyncio.run(main()) == [0x00abcd] * 16
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+
+# Tests of timing calibration and of writing the timings back
+#
+# The simulated board has no timing model, so a fault is injected: writes
+# strobed shorter than THRESHOLD store a corrupted word.
+
+
+from __future__ import annotations
+
+import math
+import shutil
+import pytest
+
+from src.parsers.config_parser import parse_config, write_timings
+from src.ram import calibration
+from tests.conftest import CONF_FILE
+
+
+THRESHOLD = 5e-9
+
+
+@pytest.fixture
+def marginal(ram_OP, monkeypatch):
+    """Board that corrupts words written with a strobe below THRESHOLD."""
+
+    sram = ram_OP.backend.board.sram
+    write = sram.write
+
+    def faulty_write(*, address: int, word: int) -> None:
+        write(address=address, word=word ^ (ram_OP.ram_timing.writePulseWidth < THRESHOLD))
+
+    monkeypatch.setattr(sram, "write", faulty_write)
+    return ram_OP
+
+
+def pattern_addresses(ram_OP):
+    return [address for address, _ in calibration.stress_patterns(
+        address_width=ram_OP.address_width, data_width=ram_OP.data_width
+    )]
+
+
+def fill(ram_OP, addresses):
+    # Written behind the pins, as a flashed program would be
+    for address in addresses:
+        ram_OP.backend.board.sram.write(address=address, word=(address * 0x010203) & 0xffffff)
+
+
+def holds_fill(ram_OP, addresses):
+    return all(ram_OP.backend.board.sram.read(address=address) == (address * 0x010203) & 0xffffff for address in addresses)
+
+
+def test_stress_patterns_cover_every_line():
+    patterns = calibration.stress_patterns(address_width=15, data_width=24)
+    addresses = [address for address, _ in patterns]
+    words = {word for _, word in patterns}
+
+    assert len(set(addresses)) == len(addresses)
+    assert all(1 << line in addresses and 0x7fff ^ (1 << line) in addresses for line in range(15))
+    assert all(1 << line in words and 0xffffff ^ (1 << line) in words for line in range(24))
+
+
+def test_calibrate_finds_threshold_and_restores(marginal):
+    addresses = pattern_addresses(marginal)
+    fill(marginal, addresses)
+    configured = marginal.ram_timing.writePulseWidth
+
+    [result] = calibration.calibrate(marginal, signals=["writePulseWidth"], rounds=1)
+
+    assert THRESHOLD <= result.fastest < 2 * THRESHOLD
+    assert result.configured == configured
+    assert result.setting == math.ceil(result.fastest * 1.5 * 1e9 / marginal.timing_margin)
+    assert marginal.ram_timing.writePulseWidth == result.setting * 1e-9 * marginal.timing_margin
+    assert holds_fill(marginal, addresses)
+
+
+def test_calibrate_refuses_failing_board(marginal, monkeypatch):
+    addresses = pattern_addresses(marginal)
+    fill(marginal, addresses)
+    monkeypatch.setattr(__name__ + ".THRESHOLD", 1.0)
+
+    with pytest.raises(calibration.CalibrationError, match="configured timings"):
+        calibration.calibrate(marginal, signals=["writePulseWidth"], rounds=1)
+
+    # Restored at the configured timings, which this board fails too
+    assert not holds_fill(marginal, addresses)
+
+
+def test_calibrate_bypasses_and_invalidates_mirror(ram_OP):
+    from src.ram.ram_mirror import RAMMirror
+
+    ram_OP.mirror = mirror = RAMMirror(trust=True)
+    mirror.set(address=0, word=0x123456)
+    calibration.calibrate(ram_OP, signals=["ldPulseWidth"], rounds=1)
+
+    assert ram_OP.mirror is mirror and mirror.known == 0
+
+
+@pytest.fixture
+def config_copy(tmp_path) -> str:
+    path = str(tmp_path / "pb224_config.yaml")
+    shutil.copy(CONF_FILE, path)
+    return path
+
+
+def test_write_timings_changes_only_those_lines(config_copy):
+    with open(config_copy) as before_file:
+        before = before_file.readlines()
+
+    write_timings(conf_file=config_copy, timing={"srclkPulseWidth": 12, "writePulseWidth": 9})
+
+    with open(config_copy) as after_file:
+        after = after_file.readlines()
+    changed = [(old.strip(), new.strip()) for old, new in zip(before, after) if old != new]
+    assert len(after) == len(before)
+    assert changed == [("srclkPulseWidth: 20", "srclkPulseWidth: 12"), ("writePulseWidth: 15", "writePulseWidth: 9")]
+
+    ram_OP = parse_config(conf_file=config_copy, backend="sim", cache_dir=None)
+    assert ram_OP.ram_timing.writePulseWidth == pytest.approx(9e-9 * ram_OP.timing_margin)
+    assert ram_OP.data_shifter.shifterTiming.srclkPulseWidth == pytest.approx(12e-9 * ram_OP.timing_margin)
+
+
+def test_write_timings_unknown_name(config_copy):
+    with open(config_copy) as before_file:
+        before = before_file.read()
+
+    with pytest.raises(AssertionError, match="noSuchTiming"):
+        write_timings(conf_file=config_copy, timing={"noSuchTiming": 1})
+
+    with open(config_copy) as after_file:
+        assert after_file.read() == before
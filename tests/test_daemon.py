@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+
+# Tests of the daemon wire protocol, snapshot names and a daemon serving
+# a client over a Unix socket on the simulated board
+
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import time
+import pytest
+
+from array import array
+from src.daemon import protocol
+from src.daemon.client import PB224Client
+from src.daemon.server import PB224Daemon, snapshot_path
+from src.utilities.memory_image import MemoryImage
+
+
+def test_frame_header():
+    assert protocol.frame(b"\x01\x02") == b"\x00\x00\x00\x02\x01\x02"
+
+
+def test_image_round_trip(image):
+    assert protocol.unpack_image(protocol.pack_image(image)) == image
+    assert protocol.unpack_image(protocol.pack_image(MemoryImage())) == MemoryImage()
+
+
+@pytest.mark.parametrize("cut", [slice(None, -1), slice(None, 3), slice(None, -6)])
+def test_image_of_wrong_length(image, cut):
+    with pytest.raises(protocol.ProtocolError, match="does not match its word count"):
+        protocol.unpack_image(protocol.pack_image(image)[cut])
+
+
+def test_arrays_are_little_endian():
+    assert protocol.pack_array(array("H", [0x0102])) == b"\x02\x01"
+    assert list(protocol.unpack_array("I", b"\x04\x03\x02\x01")) == [0x01020304]
+
+
+def test_recv_frame_across_partial_sends():
+    left, right = socket.socketpair()
+    with left, right:
+        data = protocol.frame(b"x" * 1000)
+        for start in range(0, len(data), 7):
+            left.sendall(data[start:start + 7])
+        assert protocol.recv_frame(right) == b"x" * 1000
+
+
+def test_recv_frame_connection_closed_mid_frame():
+    left, right = socket.socketpair()
+    with right:
+        left.sendall(protocol.frame(b"abcdef")[:7])
+        left.close()
+        with pytest.raises(protocol.ProtocolError, match="closed mid frame"):
+            protocol.recv_frame(right)
+
+
+@pytest.mark.parametrize("name", ["", "/etc/passwd", "..", "../x", "a/../../x", "a/..", "x\0y"])
+def test_snapshot_path_rejects(tmp_path, name):
+    with pytest.raises(protocol.ProtocolError):
+        snapshot_path(snapshot_dir=str(tmp_path), name=name)
+
+
+def test_snapshot_path_rejects_symlink_out(tmp_path):
+    (tmp_path / "snapshots").mkdir()
+    os.symlink("/tmp", tmp_path / "snapshots" / "out")
+
+    with pytest.raises(protocol.ProtocolError, match="leaves the snapshot directory"):
+        snapshot_path(snapshot_dir=str(tmp_path / "snapshots"), name="out/x.bin")
+
+
+def test_snapshot_path_inside(tmp_path):
+    root = os.path.realpath(tmp_path)
+
+    assert snapshot_path(snapshot_dir=str(tmp_path), name="a.bin") == os.path.join(root, "a.bin")
+    assert snapshot_path(snapshot_dir=str(tmp_path), name="board/a..bin") == os.path.join(root, "board", "a..bin")
+
+
+@pytest.fixture
+def daemon(ram_OP):
+    """Daemon serving the simulated board on its own event loop thread."""
+
+    # Unix socket paths are limited to about 100 bytes
+    directory = tempfile.mkdtemp(prefix="pb224")
+    server = PB224Daemon(
+        ram_OP=ram_OP,
+        socket_path=os.path.join(directory, "run", "pb224.sock"),
+        snapshot_dir=os.path.join(directory, "snapshots"),
+    )
+
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(server.serve())
+    thread = threading.Thread(target=lambda: loop.run_until_complete(asyncio.wait([task])))
+    thread.start()
+
+    for _ in range(500):
+        if os.path.exists(server.socket_path):
+            break
+        time.sleep(0.01)
+
+    yield server
+
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join()
+    loop.close()
+    shutil.rmtree(directory)
+
+
+def test_socket_is_owner_only(daemon):
+    assert stat.S_IMODE(os.stat(daemon.socket_path).st_mode) == 0o600
+
+
+def test_client_requests(daemon, image):
+    with PB224Client(socket_path=daemon.socket_path) as client:
+        assert client.status().startswith("pb224 sim")
+
+        client.write_word(address=0x1004, value=0xc28155)
+        assert client.read_word(address=0x1004) == 0xc28155
+
+        client.dump(image=image)
+        assert client.verify(image=image) == []
+        assert list(client.read_range(lower=0x0100, upper=0x010f)) == [image[address] for address in range(0x0100, 0x0110)]
+
+        daemon.ram_OP.backend.board.sram.write(address=0x0105, word=0)
+        assert client.verify(image=image) == [0x0105]
+
+
+def test_client_snapshot(daemon):
+    with PB224Client(socket_path=daemon.socket_path) as client:
+        assert client.snapshot(name="first.bin") == 128
+        assert client.snapshot(name="first.bin") == 0
+
+        with pytest.raises(protocol.ProtocolError, match="bad snapshot name"):
+            client.snapshot(name="../escape.bin")
+
+    assert os.path.exists(os.path.join(daemon.snapshot_dir, "first.bin"))
+
+
+def test_errors_keep_the_connection(daemon):
+    with PB224Client(socket_path=daemon.socket_path) as client:
+        with pytest.raises(protocol.ProtocolError, match="unknown opcode"):
+            client._request(0x7f)
+        with pytest.raises(protocol.ProtocolError):
+            client._request(protocol.READ, b"\x01")
+        assert client.status().endswith("requests=3")
+
+
+def test_truncated_request_does_not_stop_the_daemon(daemon):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as raw:
+        raw.connect(daemon.socket_path)
+        raw.sendall(protocol.frame(b"\x01\x00\x10")[:5])
+
+    with PB224Client(socket_path=daemon.socket_path) as client:
+        assert client.status().startswith("pb224")
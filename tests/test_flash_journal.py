@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+
+# Tests of the flash journal and of resuming an interrupted dump
+
+
+from __future__ import annotations
+
+import json
+import os
+import pytest
+
+from src.ram.flash_journal import FlashJournal
+from src.ram.image_manifest import image_hash
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def journal(tmp_path) -> FlashJournal:
+    return FlashJournal(directory=str(tmp_path), board_id="pb224", every=64)
+
+
+def test_interrupted_dump_resumes(ram_OP, image, journal):
+    written = []
+
+    def interrupt(count):
+        written.append(count)
+        if sum(written) >= 150:
+            raise Interrupted
+
+    with pytest.raises(Interrupted):
+        ram_OP.dump_intel_hexfile(record_list=image, pipelined=True, journal=journal, progress=interrupt)
+
+    assert journal._file is None
+    assert journal.resume_point(image_hash=image_hash(image=image), words=len(image)) == 128
+
+    with ram_OP.backend.measure() as bus:
+        ram_OP.dump_intel_hexfile(record_list=image, pipelined=True, journal=journal)
+    with ram_OP.backend.measure() as full:
+        ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+
+    assert bus.edges < full.edges * (len(image) - 100) / len(image)
+    assert all(ram_OP.backend.board.sram.read(address=address) == word for address, word in image.items())
+    assert not os.path.exists(journal.path)
+
+
+def test_torn_last_line_is_ignored(journal):
+    with open(journal.path, "w") as journal_file:
+        journal_file.write(json.dumps({"boardId": "pb224", "imageHash": "abc", "words": 512}) + "\n64\n128\n19")
+
+    assert journal.resume_point(image_hash="abc", words=512) == 128
+
+
+@pytest.mark.parametrize("image_hash, words", [("other", 512), ("abc", 256)])
+def test_journal_of_another_image(journal, image_hash, words):
+    journal.start(image_hash="abc", words=512)
+    journal.confirm(count=64)
+    journal.close()
+
+    assert journal.resume_point(image_hash=image_hash, words=words) == 0
+
+
+def test_damaged_header(journal):
+    with open(journal.path, "w") as journal_file:
+        journal_file.write("{not json\n64\n")
+
+    assert journal.resume_point(image_hash="abc", words=512) == 0
+
+
+def test_start_closes_previous_handle(journal):
+    journal.start(image_hash="abc", words=512)
+    previous = journal._file
+    journal.confirm(count=64)
+
+    assert journal.start(image_hash="abc", words=512) == 64
+    assert previous.closed
+    journal.finish()
@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+
+# Tests of the streaming Intel HEX parser
+
+
+from __future__ import annotations
+
+import io
+import pytest
+
+from src.parsers.ihexfile_parser import IntelHexError, iter_records, iter_words, parse_intel_hexfile
+
+
+def record(record_type: int, address: int, data: bytes) -> str:
+    """One ihex line with a correct checksum."""
+
+    raw = bytes([len(data), address >> 8, address & 0xff, record_type]) + data
+    return ":" + raw.hex() + f"{-sum(raw) & 0xff:02x}\n"
+
+
+def words_of(*lines: str):
+    return list(iter_words(source=io.StringIO("".join(lines) + ":00000001ff\n")))
+
+
+def test_records_stop_at_eof():
+    text = record(0, 0x15, bytes.fromhex("6a2821")) + ":00000001ff\n" + record(0, 0x16, b"\0\0\0")
+
+    assert list(iter_records(source=io.StringIO(text))) == [(0, 0x15, bytes.fromhex("6a2821"))]
+
+
+def test_multi_word_data_record():
+    assert words_of(record(0, 0x0100, bytes.fromhex("000001000002000003"))) == [
+        (0x0100, 0x000001), (0x0101, 0x000002), (0x0102, 0x000003)
+    ]
+
+
+def test_extended_segment_address_moves_base_in_words():
+    lines = (
+        record(2, 0, bytes.fromhex("0010")),
+        record(0, 0x0005, bytes.fromhex("abcdef")),
+        record(2, 0, bytes.fromhex("0000")),
+        record(0, 0x0005, bytes.fromhex("123456")),
+    )
+
+    assert words_of(*lines) == [(0x0105, 0xabcdef), (0x0005, 0x123456)]
+
+
+def test_extended_linear_address_zero_base():
+    assert words_of(record(4, 0, b"\0\0"), record(0, 0x7fff, bytes.fromhex("010203"))) == [(0x7fff, 0x010203)]
+
+
+def test_extended_linear_address_beyond_ram():
+    with pytest.raises(IntelHexError, match="beyond the 32768 word RAM"):
+        words_of(record(4, 0, bytes.fromhex("0001")), record(0, 0, bytes.fromhex("010203")))
+
+
+def test_start_address_records_are_skipped():
+    lines = (record(3, 0, bytes(4)), record(5, 0, bytes(4)), record(0, 0x0001, bytes.fromhex("000007")))
+
+    assert words_of(*lines) == [(0x0001, 0x000007)]
+
+
+@pytest.mark.parametrize("line, message", [
+    ("030015006a282136", "record does not start with ':'"),
+    (":03001500zz282136", "record is not hexadecimal"),
+    (":0300150000", "byte count does not match"),
+    (":030015006a282136", "checksum mismatch"),
+    (record(6, 0, b""), "unknown record type 0x06"),
+])
+def test_malformed_records(line, message):
+    with pytest.raises(IntelHexError, match=f"line 2: {message}"):
+        list(iter_records(source=io.StringIO(record(0, 0, bytes(3)) + line)))
+
+
+def test_data_record_not_whole_words():
+    with pytest.raises(IntelHexError, match="not a whole number of 3 byte words"):
+        words_of(record(0, 0x0010, bytes(4)))
+
+
+def test_data_record_beyond_ram():
+    with pytest.raises(IntelHexError, match="reaches word 0x8000"):
+        words_of(record(0, 0x7fff, bytes(6)))
+
+
+def test_extended_address_record_of_wrong_length():
+    with pytest.raises(IntelHexError, match="holds 3 bytes"):
+        words_of(record(2, 0, bytes(3)))
+
+
+def test_parse_intel_hexfile_splits_words(tmp_path):
+    path = tmp_path / "image.hex"
+    path.write_text(record(0, 0x0015, bytes.fromhex("6a28216b9924")) + ":00000001ff\n")
+
+    records = parse_intel_hexfile(filename=str(path))
+    assert [r.record_string for r in records] == [":030015006a282135", ":030016006b9924bf"]
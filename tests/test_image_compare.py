@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+
+# Tests of the bulk image comparison
+
+
+from __future__ import annotations
+
+import pytest
+
+from src.utilities.image_compare import mismatches, record_checksums, render_diff
+from src.utilities.memory_image import MemoryImage, record_checksum
+
+
+def copy_of(image: MemoryImage) -> MemoryImage:
+    copy = MemoryImage(words=image.size)
+    copy.update(image.items())
+    return copy
+
+
+def test_identical_images(image):
+    assert list(mismatches(expected=image, actual=copy_of(image))) == []
+
+
+def test_empty_images():
+    assert list(mismatches(expected=MemoryImage(), actual=MemoryImage())) == []
+
+
+def test_differing_words_at_both_ends():
+    expected, actual = MemoryImage(), MemoryImage()
+    for address in (0x0000, 0x0001, 0x7ffe, 0x7fff):
+        expected[address] = actual[address] = 0x123456
+    actual[0x0000] = 0x123457
+    actual[0x7fff] = 0x000000
+
+    assert list(mismatches(expected=expected, actual=actual)) == [0x0000, 0x7fff]
+
+
+def test_word_missing_from_actual(image):
+    actual = copy_of(image)
+    actual.valid[0x0100 >> 3] &= ~1
+
+    assert list(mismatches(expected=image, actual=actual)) == [0x0100]
+
+
+def test_missing_zero_word_is_a_mismatch():
+    expected = MemoryImage()
+    expected[0x0040] = 0
+
+    # The word arrays are equal, only the validity differs
+    assert list(mismatches(expected=expected, actual=MemoryImage())) == [0x0040]
+
+
+def test_extra_words_in_actual_are_ignored(image):
+    actual = copy_of(image)
+    actual[0x0000] = 0xffffff
+
+    assert list(mismatches(expected=image, actual=actual)) == []
+
+
+def test_by_checksum_misses_compensating_changes():
+    expected, actual = MemoryImage(), MemoryImage()
+    expected[0x0015] = 0x6a2821
+    actual[0x0015] = 0x6a2128  # same byte sum, same checksum
+
+    assert list(mismatches(expected=expected, actual=actual)) == [0x0015]
+    assert list(mismatches(expected=expected, actual=actual, by_checksum=True)) == []
+
+
+def test_record_checksums_match_scalar(image):
+    checksums = record_checksums(image=image)
+
+    assert all(checksums[address] == record_checksum(address=address, word=word) for address, word in image.items())
+    assert checksums[0x0000] == record_checksum(address=0, word=0)
+
+
+def test_images_of_different_sizes():
+    with pytest.raises(AssertionError):
+        mismatches(expected=MemoryImage(words=256), actual=MemoryImage())
+
+
+def test_render_diff():
+    expected, actual = MemoryImage(), MemoryImage()
+    expected[0x0015] = 0x6a2821
+    expected[0x0016] = 0x000001
+    actual[0x0015] = 0x6a2020
+
+    assert render_diff(expected=expected, actual=actual, addresses=[0x0015, 0x0016]).splitlines() == [
+        "0x0015  expected 0x6a2821 (0x35)  actual 0x6a2020 (0x3e)",
+        f"0x0016  expected 0x000001 (0x{record_checksum(address=0x16, word=1):02x})  actual -------- (----)",
+    ]
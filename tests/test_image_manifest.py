@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+# Tests of the image manifest kept by the RAM operations
+#
+# Every path that writes words must leave the manifest holding what the
+# board holds, or a later differential flash skips words it has to write.
+
+
+from __future__ import annotations
+
+import pytest
+
+from src.ram.image_manifest import ImageManifest
+from src.utilities.memory_image import MemoryImage
+
+
+@pytest.fixture
+def flashed(ram_OP, image):
+    """The image flashed differentially, with an in-memory manifest attached."""
+
+    ram_OP.manifest = ImageManifest(directory=None, board_id="pb224")
+    ram_OP.flash_differential(record_list=image, manifest=ram_OP.manifest)
+    return ram_OP
+
+
+def board_holds(ram_OP, image):
+    return all(ram_OP.backend.board.sram.read(address=address) == word for address, word in image.items())
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_full_flash_then_differential_flash(flashed, image, pipelined):
+    other = MemoryImage()
+    other.update((address, word ^ 0x000100) for address, word in image.items())
+
+    flashed.dump_intel_hexfile(record_list=other, pipelined=pipelined)
+    assert flashed.manifest.diff(image=other) == []
+
+    flashed.flash_differential(record_list=image, manifest=flashed.manifest)
+    assert board_holds(flashed, image)
+
+
+def test_single_writes_and_fills_are_recorded(flashed, image):
+    flashed.write_single_address(hex_address="0x0100", hex_data="0x000000")
+    flashed.sweep_fill(hex_data="0xffffff", lower_addr="0x0300", upper_addr="0x033f")
+    assert flashed.manifest.image_hash == ""
+
+    assert len(flashed.flash_differential(record_list=image, manifest=flashed.manifest)) == len(image)
+    assert board_holds(flashed, image)
+    assert flashed.manifest.diff(image=image) == []
+
+
+def test_in_memory_manifest_is_never_saved(tmp_path, image):
+    manifest = ImageManifest(directory=None, board_id="pb224")
+    manifest.record(words=image.items())
+    manifest.save()
+
+    assert ImageManifest.load(directory=None, board_id="pb224").known_addresses() == []
+
+
+def test_saved_manifest_loads_back(tmp_path, image):
+    manifest = ImageManifest(directory=str(tmp_path), board_id="pb224")
+    manifest.record(words=image.items())
+    manifest.save()
+
+    loaded = ImageManifest.load(directory=str(tmp_path), board_id="pb224")
+    assert loaded.known_addresses() == list(image)
+    assert loaded.diff(image=image) == []
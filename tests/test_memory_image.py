@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+
+# Tests of the MemoryImage type and its Intel HEX and binary round trips
+
+
+from __future__ import annotations
+
+import pytest
+
+from src.parsers.ihexfile_parser import parse_intel_hexfile
+from src.utilities.memory_image import MemoryImage, record_checksum
+
+
+def test_set_words_iterate_in_address_order():
+    image = MemoryImage()
+    image.update([(0x7fff, 3), (0x0000, 1), (0x0015, 2)])
+
+    assert list(image.items()) == [(0x0000, 1), (0x0015, 2), (0x7fff, 3)]
+    assert len(image) == 3 and 0x0016 not in image and image.get(0x0016) is None
+    with pytest.raises(KeyError):
+        image[0x0016]
+
+
+def test_runs_split_at_gaps(image):
+    assert [(start, len(words)) for start, words in image.runs()] == [(0x0100, 256), (0x0280, 256)]
+
+
+@pytest.mark.parametrize("words_per_record", [1, 16, 85])
+def test_intel_hex_round_trip(image, tmp_path, words_per_record):
+    path = str(tmp_path / "image.hex")
+    image.to_intel_hex(filename=path, words_per_record=words_per_record)
+
+    assert MemoryImage.from_intel_hex(source=path) == image
+
+
+def test_intel_hex_one_word_records(tmp_path):
+    image = MemoryImage()
+    image[0x0015] = 0x6a2821
+    path = tmp_path / "image.hex"
+    image.to_intel_hex(filename=str(path))
+
+    assert path.read_text() == ":030015006a282135\n:00000001ff\n"
+
+
+def test_binary_round_trip(image, tmp_path):
+    path = str(tmp_path / "image.bin")
+    base = image.to_binary(filename=path)
+
+    loaded = MemoryImage.from_binary(filename=path, base=base)
+    assert base == 0x0100
+    assert all(loaded[address] == word for address, word in image.items())
+    # The gap between the runs comes back as zero words
+    assert len(loaded) == 0x0380 - 0x0100 and loaded[0x0200] == 0
+
+
+def test_records_round_trip(image, tmp_path):
+    path = str(tmp_path / "image.hex")
+    image.to_intel_hex(filename=path)
+
+    assert MemoryImage.coerce(parse_intel_hexfile(filename=path)) == image
+
+
+def test_checksum_mappings(image):
+    mappings = image.checksum_mappings()
+
+    assert mappings["0x0100"] == f"0x{record_checksum(address=0x0100, word=image[0x0100]):02x}"
+    assert len(mappings) == len(image)
+    assert record_checksum(address=0x15, word=0x6a2821) == 0x35
+
+
+def test_coerce_refuses_checksum_mappings(image):
+    with pytest.raises(TypeError):
+        MemoryImage.coerce(image.checksum_mappings())
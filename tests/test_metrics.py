@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+
+# Tests of the operation metrics and the metered backend
+
+
+from __future__ import annotations
+
+import json
+import pytest
+
+from src.parsers.config_parser import parse_config
+from src.utilities.metrics import Metrics
+from tests.conftest import CONF_FILE
+
+
+@pytest.fixture
+def metrics() -> Metrics:
+    return Metrics(board_id="pb224")
+
+
+@pytest.fixture
+def metered(metrics):
+    """RAM operations object on a simulated board, counting into `metrics`."""
+
+    return parse_config(conf_file=CONF_FILE, backend="sim", cache_dir=None, metrics=metrics)
+
+
+def test_edges_are_level_changes(metered, metrics, image):
+    metrics.edges.clear()
+    with metered.backend.measure() as bus:
+        metered.dump_intel_hexfile(record_list=image, pipelined=True)
+        metered.read_words(addresses=list(image))
+        metered.write_single_address(hex_address="0x1004", hex_data="0xc28155")
+
+    # The simulated board sees every level change on its pins
+    assert metrics.edges == bus.pin_edges
+    assert sum(metrics.edges.values()) == bus.edges
+
+
+def test_outer_operation_counts_its_words(metered, metrics, image):
+    metered.dump_intel_hexfile(record_list=image)
+
+    # The word writes of the dump are not counted again
+    assert metrics.words == {"dump_intel_hexfile": len(image)}
+    assert metrics.latency["dump_intel_hexfile"].count == 1
+    assert set(metrics.time_ns["dump_intel_hexfile"]) == {"sleep", "bitbang", "host"}
+
+
+def test_paused_read_range_leaves_caller_unmeasured(metered, metrics):
+    for word in metered.read_range(lower=0x0000, upper=0x0003):
+        metered.write_word(address=0x0100 + word, value=0x000001)
+
+    assert metrics.words == {"read_range": 4, "write_word": 4}
+    assert metrics.latency["write_word"].count == 4
+
+
+def test_paused_outside_an_operation(metrics):
+    with metrics.operation("outer") as op:
+        op.words = 2
+        with op.paused():
+            with metrics.operation("inner") as inner:
+                inner.words = 1
+
+    assert metrics.words == {"outer": 2, "inner": 1}
+
+
+def test_json_export(metered, metrics, tmp_path):
+    metered.write_single_address(hex_address="0x0001", hex_data="0x000001")
+    path = tmp_path / "pb224.json"
+    metrics.write(filename=str(path))
+
+    exported = json.loads(path.read_text())
+    assert exported["boardId"] == "pb224"
+    assert exported["words"] == {"write_word": 1}
+    assert exported["pinEdges"]["ramInCLK"] == 2
+    assert exported["latency"]["write_word"]["count"] == 1
+
+
+def test_prometheus_export(metered, metrics, tmp_path):
+    metered.write_single_address(hex_address="0x0001", hex_data="0x000001")
+    path = tmp_path / "pb224.prom"
+    metrics.write(filename=str(path))
+
+    lines = path.read_text().splitlines()
+    assert 'pb224_words_total{board="pb224",operation="write_word"} 1' in lines
+    assert 'pb224_operation_seconds_count{board="pb224",operation="write_word"} 1' in lines
+    assert 'pb224_operation_seconds_bucket{board="pb224",operation="write_word",le="+Inf"} 1' in lines
+    assert any(line.startswith('pb224_pin_edges_total{board="pb224",pin="26",signal="ramInCLK"} ') for line in lines)
+    assert "# TYPE pb224_operation_seconds histogram" in lines
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+
+# Tests of the direct register GPIO backend against a plain file
+#
+# A plain file has no set/clear semantics, so each test reads back the
+# register words the backend stored.
+
+
+from __future__ import annotations
+
+import pytest
+
+from array import array
+from src.backends.mmio_backend import BLOCK_SIZE, GPCLR0, GPFSEL0, GPLEV0, GPSET0, MMIOGPIOBackend
+
+
+@pytest.fixture
+def gpiomem(tmp_path) -> str:
+    path = tmp_path / "gpiomem"
+    path.write_bytes(bytes(BLOCK_SIZE))
+    return str(path)
+
+
+def registers(path: str) -> array:
+    words = array("I")
+    with open(path, "rb") as regs:
+        words.frombytes(regs.read())
+    return words
+
+
+def test_setup_selects_function_and_initial_level(gpiomem):
+    backend = MMIOGPIOBackend(path=gpiomem)
+    backend.setup(23, backend.OUT, initial=1)
+    backend.setup(12, backend.IN)
+
+    regs = registers(gpiomem)
+    assert (regs[GPFSEL0 + 2] >> 9) & 0b111 == 0b001
+    assert (regs[GPFSEL0 + 1] >> 6) & 0b111 == 0b000
+    assert regs[GPSET0] == 1 << 23
+    backend.cleanup()
+
+
+def test_function_select_keeps_other_pins(gpiomem):
+    backend = MMIOGPIOBackend(path=gpiomem)
+    backend.setup(24, backend.OUT)
+    backend.setup(26, backend.OUT)
+    backend.setup(24, backend.IN)
+
+    fsel = registers(gpiomem)[GPFSEL0 + 2]
+    assert (fsel >> 12) & 0b111 == 0b000
+    assert (fsel >> 18) & 0b111 == 0b001
+    backend.cleanup()
+
+
+def test_output_stores_one_bit_masks(gpiomem):
+    backend = MMIOGPIOBackend(path=gpiomem)
+    backend.output(17, 1)
+    backend.output(5, 0)
+
+    regs = registers(gpiomem)
+    assert (regs[GPSET0], regs[GPCLR0]) == (1 << 17, 1 << 5)
+    backend.cleanup()
+
+
+def test_write_masks_changes_several_pins_in_one_store(gpiomem):
+    backend = MMIOGPIOBackend(path=gpiomem)
+    backend.write_masks((1 << 23) | (1 << 17), (1 << 24) | (1 << 27))
+
+    regs = registers(gpiomem)
+    assert (regs[GPSET0], regs[GPCLR0]) == ((1 << 23) | (1 << 17), (1 << 24) | (1 << 27))
+    backend.cleanup()
+
+
+def test_input_reads_level_register(gpiomem):
+    backend = MMIOGPIOBackend(path=gpiomem)
+    backend._regs[GPLEV0] = 1 << 12
+
+    assert (backend.input(12), backend.input(13)) == (1, 0)
+    backend.cleanup()
+
+
+def test_cleanup_returns_pins_to_input(gpiomem):
+    backend = MMIOGPIOBackend(path=gpiomem)
+    backend.setup(4, backend.OUT)
+    backend.setup(13, backend.OUT)
+    backend.cleanup()
+
+    regs = registers(gpiomem)
+    assert (regs[GPFSEL0] >> 12) & 0b111 == 0b000
+    assert (regs[GPFSEL0 + 1] >> 9) & 0b111 == 0b000
+
+
+def test_ram_interface_runs_on_mmio(gpiomem):
+    from src.parsers.config_parser import parse_config
+    from tests.conftest import CONF_FILE
+
+    backend = MMIOGPIOBackend(path=gpiomem)
+    ram_OP = parse_config(conf_file=CONF_FILE, backend=backend, cache_dir=None)
+    ram_OP.write_single_address(hex_address="0x1004", hex_data="0xc28155")
+
+    # RI (pin 6) is the last pin a write brings low
+    regs = registers(gpiomem)
+    assert regs[GPCLR0] == 1 << 6
+    backend.cleanup()
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+
+# Tests of the compiled pin map and its cache
+
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import pytest
+
+from src.parsers import pin_map
+from tests.conftest import CONF_FILE
+
+
+@pytest.fixture
+def config_copy(tmp_path) -> str:
+    path = str(tmp_path / "pb224_config.yaml")
+    shutil.copy(CONF_FILE, path)
+    return path
+
+
+def cache_files(cache_dir):
+    return sorted(os.listdir(cache_dir)) if os.path.isdir(cache_dir) else []
+
+
+def test_cache_hit_skips_compiling(config_copy, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    compiled = pin_map.load_pin_map(conf_file=config_copy, cache_dir=cache_dir)
+    assert len(cache_files(cache_dir)) == 1
+
+    def no_compile(**kwargs):
+        raise AssertionError("compiled again")
+
+    monkeypatch.setattr(pin_map, "compile_pin_map", no_compile)
+    assert pin_map.load_pin_map(conf_file=config_copy, cache_dir=cache_dir) == compiled
+
+
+def test_changed_config_is_compiled_again(config_copy, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    pin_map.load_pin_map(conf_file=config_copy, cache_dir=cache_dir)
+
+    with open(config_copy) as config_file:
+        text = config_file.read()
+    with open(config_copy, "w") as config_file:
+        config_file.write(text.replace("timingMargin: 2", "timingMargin: 3"))
+
+    assert pin_map.load_pin_map(conf_file=config_copy, cache_dir=cache_dir)["timingMargin"] == 3
+    assert len(cache_files(cache_dir)) == 2
+
+
+def test_format_bump_invalidates(config_copy, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    pin_map.load_pin_map(conf_file=config_copy, cache_dir=cache_dir)
+
+    monkeypatch.setattr(pin_map, "PIN_MAP_FORMAT", pin_map.PIN_MAP_FORMAT + 1)
+    assert pin_map.load_pin_map(conf_file=config_copy, cache_dir=cache_dir)["format"] == pin_map.PIN_MAP_FORMAT
+    assert len(cache_files(cache_dir)) == 2
+
+
+def test_no_cache_writes_nothing(config_copy, tmp_path):
+    pin_map.load_pin_map(conf_file=config_copy, cache_dir=None)
+
+    assert sorted(os.listdir(tmp_path)) == ["pb224_config.yaml"]
+
+
+def test_cache_hit_does_not_import_yaml(config_copy, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    pin_map.load_pin_map(conf_file=config_copy, cache_dir=cache_dir)
+
+    code = (
+        "import sys\n"
+        "from src.parsers.pin_map import load_pin_map\n"
+        f"load_pin_map(conf_file={config_copy!r}, cache_dir={cache_dir!r})\n"
+        "print('yaml' in sys.modules)\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_pin_map_contents(config_copy):
+    compiled = pin_map.load_pin_map(conf_file=config_copy, cache_dir=None)
+
+    assert compiled["backend"] == "rpi" and compiled["boardId"] == "pb224"
+    assert set(compiled["pins"]) == {signal for signals in pin_map.PROFILE_SIGNALS.values() for signal in signals}
+    assert compiled["pins"]["serialDataIn"] == {"pin": 12, "input": True, "initValue": 0}
+
+
+def test_duplicate_pin_is_rejected(config_copy):
+    with open(config_copy) as config_file:
+        text = config_file.read()
+    with open(config_copy, "w") as config_file:
+        config_file.write(text.replace("pin: 26", "pin: 6"))
+
+    with pytest.raises(AssertionError, match="its own pin"):
+        pin_map.load_pin_map(conf_file=config_copy, cache_dir=None)
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+
+# Tests of the pulse scheduler on a fake clock
+#
+# The fake clock advances a little on every read, like perf_counter_ns
+# inside the spin loop, and `lag` stands for host time spent between waits.
+
+
+from __future__ import annotations
+
+import pytest
+
+from src.utilities.pulse_scheduler import PulseScheduler
+
+
+class FakeClock:
+    def __init__(self, *, step_ns: int=100) -> None:
+        self.now = 0
+        self.step_ns = step_ns
+        self.slept = []
+
+    def clock(self) -> int:
+        self.now += self.step_ns
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += round(seconds * 1e9)
+
+    def lag(self, ns: int) -> None:
+        self.now += ns
+
+
+@pytest.fixture
+def fake() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(fake) -> PulseScheduler:
+    return PulseScheduler(clock=fake.clock, sleep=fake.sleep)
+
+
+@pytest.mark.parametrize("lag_ns", [0, 20_000, 40_000, 500_000])
+def test_wait_is_never_shortened_by_host_lag(fake, scheduler, lag_ns):
+    scheduler.begin()
+    scheduler.wait(30e-6)
+
+    fake.lag(lag_ns)
+    edge: int = fake.now
+    scheduler.wait(30e-6)
+
+    assert fake.now >= edge + 30_000
+
+
+def test_wait_sleeps_above_the_spin_threshold(fake, scheduler):
+    scheduler.begin()
+    start: int = fake.now
+    scheduler.wait(1e-3)
+
+    assert fake.slept and sum(fake.slept) <= 1e-3
+    assert 1_000_000 <= fake.now - start < 1_000_000 + 2 * fake.step_ns
+
+
+def test_wait_until_sets_the_next_deadline(fake, scheduler):
+    scheduler.begin()
+    scheduler.wait_until(fake.now + 50_000)
+    deadline: int = fake.now
+
+    scheduler.wait(10e-6)
+    assert fake.now >= deadline + 10_000
+
+
+def test_pulse_stats(scheduler):
+    scheduler.record_pulse(pin=24, requested_ns=1000, observed_ns=1500)
+    scheduler.record_pulse(pin=24, requested_ns=1000, observed_ns=900)
+
+    stats = scheduler.pulses[24]
+    assert (stats.count, stats.min_error_ns, stats.max_error_ns, stats.mean_error_ns) == (2, -100, 500, 200)
+    assert scheduler.report().startswith("pin 24: 2 pulses")
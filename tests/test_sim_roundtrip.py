@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+
+# Round trip tests of the RAM operations on the simulated board
+#
+# Each test writes words through one path, reads them back through another
+# and compares them with what the simulated SRAM actually holds.
+
+
+from __future__ import annotations
+
+import pytest
+
+from src.ram.image_manifest import ImageManifest
+from src.ram.ram_mirror import RAMMirror
+from src.ram.snapshot import BLOCK_WORDS, Snapshot
+from src.utilities.memory_image import MemoryImage
+
+
+def board_words(ram_OP, addresses):
+    """Words the simulated SRAM holds at the addresses, read behind the pins."""
+
+    return [ram_OP.backend.board.sram.read(address=address) for address in addresses]
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_dump_then_verify(ram_OP, image, pipelined):
+    written = ram_OP.dump_intel_hexfile(record_list=image, pipelined=pipelined)
+
+    assert written == image
+    assert board_words(ram_OP, image) == [image[address] for address in image]
+    assert "verification failed" not in ram_OP.verify_checksum(image)
+    assert "verification failed" not in ram_OP.verify_checksum(image.checksum_mappings())
+
+
+def test_verify_and_repair_fixes_corrupted_word(ram_OP, image):
+    ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+    ram_OP.backend.board.sram.write(address=0x0290, word=image[0x0290] ^ 0xffffff)
+
+    mismatch, _ = ram_OP.verify_image(image=image)
+    assert list(mismatch) == [0x0290]
+
+    result = ram_OP.verify_and_repair(image=image)
+    assert result.ok and result.repaired == [0x0290]
+    assert board_words(ram_OP, [0x0290]) == [image[0x0290]]
+
+
+def test_pipelined_read_matches_single_reads(ram_OP, image):
+    ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+    addresses = list(image)[::-3]
+
+    assert ram_OP.read_words(addresses=addresses) == [image[address] for address in addresses]
+    assert [ram_OP.read_word(address=address) for address in addresses[:8]] == [image[address] for address in addresses[:8]]
+    assert list(ram_OP.read_range(lower=0x0100, upper=0x01ff)) == [image[address] for address in range(0x0100, 0x0200)]
+
+
+def test_single_write_then_read(ram_OP):
+    ram_OP.write_single_address(hex_address="0x1004", hex_data="0xc28155")
+
+    assert ram_OP.read_single_address(hex_address="0x1004") == "0xc28155"
+    assert board_words(ram_OP, [0x1004]) == [0xc28155]
+
+
+def test_sweep_fill_then_sweep_read(ram_OP):
+    ram_OP.sweep_fill(hex_data="0xa5a5a5", lower_addr="0x0040", upper_addr="0x00bf")
+
+    words = ram_OP.sweep_read(lower_addr="0x0030", upper_addr="0x00cf")
+    assert list(words) == [f"0x{address:04x}" for address in range(0x0030, 0x00d0)]
+    assert {words[f"0x{address:04x}"] for address in range(0x0040, 0x00c0)} == {"0xa5a5a5"}
+    assert board_words(ram_OP, [0x003f, 0x00c0]) == [0, 0]
+
+
+def test_sweep_dump_then_read(ram_OP, image):
+    written = ram_OP.sweep_dump_intel_hexfile(record_list=image)
+
+    assert written == image
+    assert board_words(ram_OP, image) == [image[address] for address in image]
+    assert ram_OP.read_words(addresses=list(image)) == [image[address] for address in image]
+
+
+def test_trusted_mirror_skips_hardware(ram_OP, image):
+    ram_OP.mirror = RAMMirror(trust=True)
+    ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+
+    with ram_OP.backend.measure() as stats:
+        words = list(ram_OP.read_range(lower=0x0100, upper=0x01ff))
+    assert words == [image[address] for address in range(0x0100, 0x0200)]
+    assert stats.edges == 0
+
+    # Rewriting words the mirror already holds costs no bus traffic
+    with ram_OP.backend.measure() as stats:
+        ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+    assert stats.edges == 0
+
+
+def test_trusted_mirror_until_refreshed(ram_OP, image):
+    ram_OP.mirror = RAMMirror(trust=True)
+    ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+
+    # The PB224 CPU writes behind the mirror's back
+    ram_OP.backend.board.sram.write(address=0x0115, word=0x123456)
+    assert ram_OP.read_single_address(hex_address="0x0115") == f"0x{image[0x0115]:06x}"
+    assert ram_OP.read_words(addresses=[0x0115], use_mirror=False) == [0x123456]
+
+    ram_OP.refresh_mirror(lower_addr="0x0110", upper_addr="0x011f")
+    assert ram_OP.read_single_address(hex_address="0x0115") == "0x123456"
+
+
+def test_untrusted_mirror_reads_hardware(ram_OP, image):
+    ram_OP.mirror = RAMMirror(trust=False)
+    ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+    ram_OP.backend.board.sram.write(address=0x0115, word=0x123456)
+
+    assert ram_OP.read_single_address(hex_address="0x0115") == "0x123456"
+
+
+def test_differential_flash_writes_only_changes(ram_OP, image, tmp_path):
+    manifest = ImageManifest.load(directory=str(tmp_path), board_id="pb224")
+    with ram_OP.backend.measure() as first:
+        ram_OP.flash_differential(record_list=image, manifest=manifest)
+    assert board_words(ram_OP, image) == [image[address] for address in image]
+
+    changed = MemoryImage()
+    changed.update(image.items())
+    changed[0x0105] ^= 0x000001
+    changed[0x0300] ^= 0x800000
+
+    manifest = ImageManifest.load(directory=str(tmp_path), board_id="pb224")
+    assert manifest.diff(image=changed) == [(0x0105, changed[0x0105]), (0x0300, changed[0x0300])]
+
+    with ram_OP.backend.measure() as second:
+        ram_OP.flash_differential(record_list=changed, manifest=manifest)
+    assert board_words(ram_OP, changed) == [changed[address] for address in changed]
+    assert 0 < second.edges < first.edges / 100
+
+    assert ImageManifest.load(directory=str(tmp_path), board_id="pb224").diff(image=changed) == []
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_snapshot_resumes_after_interruption(ram_OP, image, tmp_path):
+    ram_OP.dump_intel_hexfile(record_list=image, pipelined=True)
+    path = str(tmp_path / "ram_snapshot.bin")
+    words = 4 * BLOCK_WORDS
+    read = []
+
+    def interrupt(count):
+        read.append(count)
+        if sum(read) > BLOCK_WORDS + BLOCK_WORDS // 2:
+            raise Interrupted
+
+    with Snapshot(path=path, words=words, board_id="pb224") as snapshot:
+        with pytest.raises(Interrupted):
+            ram_OP.snapshot(snapshot=snapshot, progress=interrupt)
+
+    with Snapshot(path=path, words=words, board_id="pb224") as snapshot:
+        assert snapshot.pending_blocks() == [1, 2, 3]
+        assert ram_OP.snapshot(snapshot=snapshot) == 3
+        assert snapshot.complete
+        taken = snapshot.to_image()
+
+    assert [taken[address] for address in range(words)] == board_words(ram_OP, range(words))
+    assert all(taken[address] == image[address] for address in image)